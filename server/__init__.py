@@ -11,6 +11,8 @@ from server.resources.post_processors import *
 def main():
     declare_api(app)
     start_up()
+    EXECUTION_SCHEDULER.start()
+    PIPELINE_WATCHER.start()
     if len(sys.argv) > 1:
         port = sys.argv[1]
         try:
@@ -24,3 +26,5 @@ def main():
 
 
 from server.startup_validation import start_up
+from server.resources.helpers.execution_scheduler import EXECUTION_SCHEDULER
+from server.resources.helpers.pipeline_watcher import PIPELINE_WATCHER
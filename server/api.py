@@ -15,12 +15,18 @@ def declare_api(app):
     from server.resources.execution_stderr import ExecutionStdErr
     from server.resources.execution_stdout import ExecutionStdOut
     from server.resources.execution_results import ExecutionResults
+    from server.resources.execution_status_poll import ExecutionStatusPoll
     from server.resources.executions_count import ExecutionsCount
+    from server.resources.executions_batch import ExecutionsBatch
     from server.resources.path import Path
     from server.resources.pipeline import Pipeline
     from server.resources.pipelines import Pipelines
+    from server.resources.pipelines_reload import PipelinesReload
     from server.resources.pipeline_boutiquesdescriptor import PipelineBoutiquesDescriptor
     from server.resources.platform import Platform
+    from server.resources.upload_sessions import UploadSessions
+    from server.resources.upload_session import UploadSession
+    from server.resources.upload_session_finalize import UploadSessionFinalize
 
     api.add_resource(Platform, '/platform')
     api.add_resource(Authenticate, '/authenticate')
@@ -28,6 +34,7 @@ def declare_api(app):
     api.add_resource(Edit, '/users/edit')
     api.add_resource(Executions, '/executions')
     api.add_resource(ExecutionsCount, '/executions/count')
+    api.add_resource(ExecutionsBatch, '/executions/batch')
     api.add_resource(Execution, '/executions/<string:execution_identifier>')
     api.add_resource(ExecutionResults,
                      '/executions/<string:execution_identifier>/results')
@@ -35,13 +42,20 @@ def declare_api(app):
                      '/executions/<string:execution_identifier>/stdout')
     api.add_resource(ExecutionStdErr,
                      '/executions/<string:execution_identifier>/stderr')
+    api.add_resource(ExecutionStatusPoll,
+                     '/executions/<string:execution_identifier>/status')
     api.add_resource(ExecutionPlay,
                      '/executions/<string:execution_identifier>/play')
     api.add_resource(ExecutionKill,
                      '/executions/<string:execution_identifier>/kill')
     api.add_resource(Pipelines, '/pipelines')
+    api.add_resource(PipelinesReload, '/pipelines/reload')
     api.add_resource(Pipeline, '/pipelines/<string:pipeline_identifier>')
     api.add_resource(
         PipelineBoutiquesDescriptor,
         '/pipelines/<string:pipeline_identifier>/boutiquesdescriptor')
     api.add_resource(Path, '/path/<path:complete_path>', '/path/')
+    api.add_resource(UploadSessions, '/uploads')
+    api.add_resource(UploadSession, '/uploads/<string:upload_identifier>')
+    api.add_resource(UploadSessionFinalize,
+                     '/uploads/<string:upload_identifier>/finalize')
@@ -101,4 +101,45 @@ CORRUPTED_EXECUTION = ErrorCodeAndMessage(
 )
 UNSUPPORTED_DESCRIPTOR_TYPE = ErrorCodeAndMessage(
     165, "The descriptor type '{}' is not supported.")
+MD5_MISMATCH = ErrorCodeAndMessage(
+    170,
+    "The md5 of the uploaded content '{}' does not match the expected md5 '{}'."
+)
+INVALID_UPLOAD_OFFSET = ErrorCodeAndMessage(
+    175,
+    "Invalid offset '{}'. It must be between 0 and the current size of the file ({} bytes)."
+)
+UPLOAD_SESSION_NOT_FOUND = ErrorCodeAndMessage(
+    180, "Upload session '{}' not found.")
+INVALID_CONTENT_RANGE = ErrorCodeAndMessage(
+    185,
+    "Invalid Content-Range '{}'. Expected 'bytes <first>-<last>/<size>', within the size of the upload ({} bytes)."
+)
+UPLOAD_INCOMPLETE = ErrorCodeAndMessage(
+    190, "The upload is not complete. Missing byte ranges: {}")
+UPLOAD_RANGE_TRUNCATED = ErrorCodeAndMessage(
+    195,
+    "Only {} of the {} bytes of the range were received. The received bytes were kept."
+)
+UNSUPPORTED_COMPRESSION = ErrorCodeAndMessage(
+    200, "Unsupported compression '{}'. Supported compressions are: {}.")
+UNSUPPORTED_CHECKSUM_ALGORITHM = ErrorCodeAndMessage(
+    205,
+    "Unsupported checksum algorithm '{}'. Supported algorithms are: {}.")
+CHECKSUM_ON_DIR = ErrorCodeAndMessage(
+    210, "Invalid input: cannot generate checksum from directory")
+EXECUTION_EXCEEDS_QUOTA = ErrorCodeAndMessage(
+    215, "The execution cannot be run within the quota of user '{}': {}.")
+EXECUTION_EXCEEDS_HOST_CAPACITY = ErrorCodeAndMessage(
+    220, "The execution cannot be run on the execution host: {}.")
+UPLOAD_SESSIONS_SIZE_EXCEEDED = ErrorCodeAndMessage(
+    225,
+    "The upload of {} bytes exceeds the {} bytes left for the pending upload sessions of user '{}'."
+)
+INSUFFICIENT_STORAGE = ErrorCodeAndMessage(
+    230, "There is not enough free space on the server for {} bytes.")
+EXECUTION_BATCH_TOO_LARGE = ErrorCodeAndMessage(
+    235,
+    "The batch has {} input values, more than the maximum of {} executions per batch."
+)
 PAGE_NOT_FOUND = ErrorCodeAndMessage(404, "Page Not Found")
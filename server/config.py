@@ -13,6 +13,103 @@ class Config(object):
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     DATA_DIRECTORY = os.environ.get('DATA_DIRECTORY')
     PIPELINE_DIRECTORY = os.environ.get('PIPELINE_DIRECTORY')
+    # Directory of the temporary files of the upload sessions, out of reach of
+    # the users. It should be on the file system of the data directory, where
+    # the completed uploads are moved.
+    UPLOAD_SESSIONS_DIRECTORY = (os.environ.get('UPLOAD_SESSIONS_DIRECTORY')
+                                 or os.path.join(basedir, 'database/uploads'))
+    # Maximum total size, in bytes, of the upload sessions of a user that are
+    # not finalized yet, and number of seconds after which an upload session
+    # that was not finalized is deleted, with its temporary file.
+    MAX_UPLOAD_SESSIONS_SIZE = int(
+        os.environ.get('MAX_UPLOAD_SESSIONS_SIZE') or 100 * 1024**3)
+    UPLOAD_SESSION_EXPIRATION = int(
+        os.environ.get('UPLOAD_SESSION_EXPIRATION') or 7 * 24 * 3600)
+    # Minimum delay, in seconds, between two checks of the pipeline directory
+    # for added or modified pipelines.
+    PIPELINE_CATALOG_REFRESH_INTERVAL = int(
+        os.environ.get('PIPELINE_CATALOG_REFRESH_INTERVAL') or 10)
+    # Delay, in seconds, between two checks of the descriptor directories for
+    # added or modified descriptors to export while the server is running. A
+    # delay of 0 disables the checks.
+    PIPELINE_WATCH_INTERVAL = int(
+        os.environ.get('PIPELINE_WATCH_INTERVAL') or 10)
+    # Number of processes exporting the descriptors to CARMIN pipelines at
+    # start up. By default, one per CPU core.
+    PIPELINE_EXPORT_PROCESSES = int(
+        os.environ.get('PIPELINE_EXPORT_PROCESSES') or 0)
+    # Maximum number of API keys kept in the authentication cache, and
+    # number of seconds before a cached API key is checked again against the
+    # database. A TTL of 0 disables the cache.
+    API_KEY_CACHE_SIZE = int(os.environ.get('API_KEY_CACHE_SIZE') or 1024)
+    API_KEY_CACHE_TTL = int(os.environ.get('API_KEY_CACHE_TTL') or 60)
+    # Maximum number of executions running at the same time. Executions
+    # played beyond this limit wait in the queue with the 'Ready' status, and
+    # are started in FIFO order, or by decreasing priority if the queue policy
+    # is 'priority'.
+    MAX_CONCURRENT_EXECUTIONS = int(
+        os.environ.get('MAX_CONCURRENT_EXECUTIONS') or 4)
+    EXECUTION_QUEUE_POLICY = os.environ.get('EXECUTION_QUEUE_POLICY') or 'fifo'
+    # Maximum number of executions created by a single request to
+    # /executions/batch.
+    MAX_EXECUTION_BATCH_SIZE = int(
+        os.environ.get('MAX_EXECUTION_BATCH_SIZE') or 1000)
+    # Maximum delay, in seconds, before executions queued by another server
+    # process are noticed.
+    EXECUTION_SCHEDULER_POLL_INTERVAL = int(
+        os.environ.get('EXECUTION_SCHEDULER_POLL_INTERVAL') or 5)
+    # Maximum delay, in seconds, during which a request to
+    # /executions/<id>/status waits for the status of the execution to change.
+    EXECUTION_STATUS_MAX_WAIT = int(
+        os.environ.get('EXECUTION_STATUS_MAX_WAIT') or 60)
+    # Delay, in seconds, between two reads of the standard output or error of
+    # a running execution followed by a client.
+    STD_FILE_FOLLOW_INTERVAL = int(
+        os.environ.get('STD_FILE_FOLLOW_INTERVAL') or 1)
+    # JSON file of per-user execution quotas: maximum running executions, CPU
+    # cores and RAM, and fair-share weight. It is loaded at startup into
+    # EXECUTION_QUOTAS. Without it, users have no quota and equal weights.
+    EXECUTION_QUOTAS_FILE = os.environ.get('EXECUTION_QUOTAS_FILE')
+    EXECUTION_QUOTAS = {}
+    # CPU cores and RAM, in GB, that running executions may use on the host,
+    # according to the suggested resources of their descriptors. By default,
+    # all the cores and RAM of the host.
+    EXECUTION_HOST_CPU_CORES = float(
+        os.environ.get('EXECUTION_HOST_CPU_CORES') or 0)
+    EXECUTION_HOST_RAM = float(os.environ.get('EXECUTION_HOST_RAM') or 0)
+    # Backend running the command lines of the executions: 'local', as child
+    # processes of the server, 'worker', on the nodes running a worker agent,
+    # or 'batch', through the batch scheduler 'slurm', or 'local' for testing.
+    EXECUTION_BACKEND = os.environ.get('EXECUTION_BACKEND') or 'local'
+    BATCH_SCHEDULER = os.environ.get('BATCH_SCHEDULER') or 'local'
+    # Delays, in seconds, between two checks of the state of a batch job, and
+    # between two checks of the database by the worker agents and by the
+    # server waiting for them. A job whose worker agent did not report it as
+    # running for WORKER_AGENT_HEARTBEAT_TIMEOUT seconds is considered lost.
+    BATCH_POLL_INTERVAL = int(os.environ.get('BATCH_POLL_INTERVAL') or 5)
+    WORKER_AGENT_POLL_INTERVAL = int(
+        os.environ.get('WORKER_AGENT_POLL_INTERVAL') or 2)
+    WORKER_AGENT_HEARTBEAT_TIMEOUT = int(
+        os.environ.get('WORKER_AGENT_HEARTBEAT_TIMEOUT') or 60)
+    # Maximum number of jobs run at the same time by each worker agent
+    WORKER_AGENT_MAX_JOBS = int(os.environ.get('WORKER_AGENT_MAX_JOBS') or 4)
+    # Maximum number of directories whose recursive size is cached, and number
+    # of seconds before a cached size is recomputed to account for changes
+    # made outside of the server.
+    DIRECTORY_SIZE_INDEX_SIZE = int(
+        os.environ.get('DIRECTORY_SIZE_INDEX_SIZE') or 100000)
+    DIRECTORY_SIZE_INDEX_TTL = int(
+        os.environ.get('DIRECTORY_SIZE_INDEX_TTL') or 300)
+    # Comma separated checksum algorithms computed as soon as a file is
+    # uploaded, in the background, so that later checksum requests are
+    # answered from the checksum cache.
+    PRECOMPUTED_CHECKSUM_ALGORITHMS = (
+        os.environ.get('PRECOMPUTED_CHECKSUM_ALGORITHMS') or 'md5').split(',')
+    # Comma separated checksum algorithms of the output files recorded in the
+    # outputs manifest of an execution when it completes. None by default, as
+    # computing them reads every output file.
+    OUTPUTS_MANIFEST_CHECKSUM_ALGORITHMS = (
+        os.environ.get('OUTPUTS_MANIFEST_CHECKSUM_ALGORITHMS') or '').split(',')
 
 
 class ProductionConfig(Config):
@@ -21,5 +118,7 @@ class ProductionConfig(Config):
 
 class TestConfig(Config):
     TESTING = True
+    PIPELINE_CATALOG_REFRESH_INTERVAL = 0
+    BATCH_POLL_INTERVAL = 0
     SQLALCHEMY_DATABASE_URI = os.environ.get('TEST_DATABASE_URI') or \
         'sqlite:///' + os.path.join(basedir, 'test/database/app.db')
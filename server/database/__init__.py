@@ -7,4 +7,13 @@ def init_db(database):
     from server.database.models.user import User
     from server.database.models.execution import Execution
     from server.database.models.execution_process import ExecutionProcess
+    from server.database.models.execution_queue_entry import ExecutionQueueEntry
+    from server.database.models.execution_resources import ExecutionResources
+    from server.database.models.execution_inputs import ExecutionInputs
+    from server.database.models.execution_job import ExecutionJob
+    from server.database.models.upload_session import UploadSession, UploadSessionRange
+    from server.database.models.file_checksum import FileChecksum
+    from server.database.models.schema_migration import SchemaMigration
+    from server.database.migrations import migrate
     database.create_all()
+    migrate(database.engine)
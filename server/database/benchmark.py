@@ -0,0 +1,133 @@
+"""Benchmark of the hot execution queries, before and after the migrations.
+
+Usage: python -m server.database.benchmark [rows]
+
+A SQLite database of `rows` executions, 1,000,000 by default, is created in a
+temporary directory, with the execution table of a database created before
+its indexes. The query plan and duration of each query are printed, then the
+migrations are applied and the queries are run again.
+"""
+import os
+import sys
+import time
+import random
+import tempfile
+from sqlalchemy import create_engine, and_, or_, func, select
+from server.database import db
+from server.database.models.user import User, Role
+from server.database.models.execution import Execution, ExecutionStatus
+from server.database.models.schema_migration import SchemaMigration
+from server.database.migrations import migrate
+
+USERS = 1000
+INSERT_CHUNK_SIZE = 10000
+REPEATS = 20
+
+execution_table = Execution.__table__
+USERNAME = 'user42'
+LAST_PAGE_CREATED_AT = 10**12 + 900000
+LAST_PAGE_IDENTIFIER = 'execution'
+
+QUERIES = [
+    ("First page of the executions of a user",
+     select([execution_table]).where(
+         execution_table.c.creator_username == USERNAME).order_by(
+             execution_table.c.created_at.desc(),
+             execution_table.c.identifier.desc()).limit(20)),
+    ("Page of the executions of a user after a cursor",
+     select([execution_table]).where(
+         and_(
+             execution_table.c.creator_username == USERNAME,
+             or_(
+                 execution_table.c.created_at < LAST_PAGE_CREATED_AT,
+                 and_(
+                     execution_table.c.created_at == LAST_PAGE_CREATED_AT,
+                     execution_table.c.identifier < LAST_PAGE_IDENTIFIER)))
+     ).order_by(execution_table.c.created_at.desc(),
+                execution_table.c.identifier.desc()).limit(20)),
+    ("Finished executions of a user",
+     select([execution_table]).where(
+         and_(execution_table.c.creator_username == USERNAME,
+              execution_table.c.status == ExecutionStatus.Finished.name)).
+     order_by(execution_table.c.created_at.desc()).limit(20)),
+    ("Execution count of a user",
+     select([func.count()]).where(
+         execution_table.c.creator_username == USERNAME)),
+    ("Running executions",
+     select([execution_table]).where(
+         execution_table.c.status == ExecutionStatus.Running.name)),
+    ("Running execution count",
+     select([func.count()]).where(
+         execution_table.c.status == ExecutionStatus.Running.name)),
+]
+
+
+def create_database(engine, rows: int):
+    db.Model.metadata.create_all(
+        engine,
+        tables=[
+            User.__table__, Execution.__table__, SchemaMigration.__table__
+        ])
+    for index in execution_table.indexes:
+        index.drop(engine)
+
+    engine.execute(User.__table__.insert(), [{
+        'username': 'user{}'.format(u),
+        'password': '',
+        'role': Role.user.name
+    } for u in range(USERS)])
+
+    # Few executions are running at a time
+    statuses = [ExecutionStatus.Finished.name] * 90 + [
+        ExecutionStatus.ExecutionFailed.name
+    ] * 9 + [ExecutionStatus.Running.name]
+    random.seed(0)
+    for start in range(0, rows, INSERT_CHUNK_SIZE):
+        engine.execute(execution_table.insert(), [{
+            'identifier': 'execution{:08d}'.format(i),
+            'name': 'execution',
+            'pipeline_identifier': 'pipeline{}'.format(i % 10),
+            'descriptor': 'boutiques',
+            'status': random.choice(statuses),
+            'creator_username': 'user{}'.format(random.randrange(USERS)),
+            'created_at': 10**12 + i
+        } for i in range(start, min(start + INSERT_CHUNK_SIZE, rows))])
+    engine.execute('ANALYZE')
+
+
+def run_queries(engine):
+    for description, query in QUERIES:
+        sql = str(
+            query.compile(engine, compile_kwargs={"literal_binds": True}))
+        plan = [
+            row[-1] for row in engine.execute('EXPLAIN QUERY PLAN ' + sql)
+        ]
+        start = time.perf_counter()
+        for _ in range(REPEATS):
+            engine.execute(query).fetchall()
+        duration = (time.perf_counter() - start) / REPEATS
+        print("{}: {:.2f} ms".format(description, duration * 1000))
+        for step in plan:
+            print("    {}".format(step))
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine('sqlite:///{}'.format(
+            os.path.join(directory, 'benchmark.db')))
+        print("Creating {} executions...".format(rows))
+        create_database(engine, rows)
+
+        print("\nBefore the migrations\n")
+        run_queries(engine)
+        start = time.perf_counter()
+        versions = migrate(engine)
+        print("\nMigrations {} applied in {:.1f} s\n".format(
+            versions,
+            time.perf_counter() - start))
+        run_queries(engine)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+from typing import Callable, List
+from sqlalchemy import Table, inspect, select
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import DBAPIError
+from server.database.models.execution import Execution
+from server.database.models.schema_migration import SchemaMigration
+
+
+class Migration():
+    """Migration is a change to the schema of the databases created before
+    the change.
+
+    `create_all` creates the missing tables, with their indexes, but does not
+    change existing tables: migrations do. They are applied once, by
+    increasing version, when the server starts. As `create_all` already
+    created the current schema of a new database, migrations skip the
+    changes that are already made.
+
+    Attributes:
+        version (int):
+        description (str):
+        upgrade (Callable[[Connection], None]): Applies the migration.
+    """
+
+    def __init__(self, version: int, description: str,
+                 upgrade: Callable[[Connection], None]):
+        self.version = version
+        self.description = description
+        self.upgrade = upgrade
+
+
+def create_indexes(table: Table,
+                   index_names: List[str]) -> Callable[[Connection], None]:
+    """create_indexes returns the upgrade creating the indexes of a table, as
+    declared by its model, that do not exist yet."""
+
+    def upgrade(connection: Connection):
+        existing = {
+            index['name']
+            for index in inspect(connection).get_indexes(table.name)
+        }
+        for index in table.indexes:
+            if index.name in index_names and index.name not in existing:
+                index.create(connection)
+
+    return upgrade
+
+
+# Number of times a migration is attempted before its error is raised. See
+# `apply_migration`.
+MIGRATION_ATTEMPTS = 3
+
+MIGRATIONS = [
+    Migration(
+        1, "Index the executions of each user by date, status, pipeline and "
+        "study",
+        create_indexes(Execution.__table__, [
+            'ix_execution_creator_created',
+            'ix_execution_creator_status_created',
+            'ix_execution_creator_pipeline_created',
+            'ix_execution_creator_study_created'
+        ])),
+    Migration(2, "Index the executions by status",
+              create_indexes(Execution.__table__, ['ix_execution_status'])),
+]
+
+
+def migrate(engine: Engine,
+            migrations: List[Migration] = MIGRATIONS) -> List[int]:
+    """migrate applies the migrations that were not applied to the database
+    yet, each in its own transaction, and returns their versions."""
+    migration_table = SchemaMigration.__table__
+    applied = {
+        version
+        for version, in engine.execute(select([migration_table.c.version]))
+    }
+    versions = []
+    for migration in sorted(migrations, key=lambda m: m.version):
+        if migration.version in applied:
+            continue
+        if apply_migration(engine, migration):
+            versions.append(migration.version)
+    return versions
+
+
+def apply_migration(engine: Engine, migration: Migration) -> bool:
+    """apply_migration applies a migration and records its version in a single
+    transaction. It returns False if another server process applied it in the
+    meantime.
+
+    When several server processes start at the same time, they may apply the
+    same migration concurrently. All but one then fail, either on a change
+    already made by another process or on the version it recorded. The
+    version is then checked again, and the migration is attempted again if it
+    is still not applied, as upgrades skip the changes that are already made.
+    """
+    migration_table = SchemaMigration.__table__
+    for attempt in range(1, MIGRATION_ATTEMPTS + 1):
+        try:
+            with engine.begin() as connection:
+                migration.upgrade(connection)
+                connection.execute(migration_table.insert().values(
+                    version=migration.version,
+                    description=migration.description))
+            return True
+        except DBAPIError:
+            if is_applied(engine, migration.version):
+                return False
+            if attempt == MIGRATION_ATTEMPTS:
+                raise
+
+
+def is_applied(engine: Engine, version: int) -> bool:
+    version_column = SchemaMigration.__table__.c.version
+    query = select([version_column]).where(version_column == version)
+    return engine.execute(query).first() is not None
@@ -2,7 +2,8 @@ import enum
 import uuid
 import time
 from flask_restful import fields
-from sqlalchemy import Column, String, Enum, Integer, BigInteger, ForeignKey
+from sqlalchemy import (Column, String, Enum, Integer, BigInteger, ForeignKey,
+                        Index)
 from server.database import db
 from server.resources.models.execution import ExecutionStatus
 
@@ -44,6 +45,21 @@ class Execution(db.Model):
         creator_username (str):
     """
 
+    # Executions are listed by user, from the most recent, optionally
+    # filtered by status, pipeline or study. Running executions are looked up
+    # by status.
+    __table_args__ = (
+        Index('ix_execution_creator_created', 'creator_username',
+              'created_at', 'identifier'),
+        Index('ix_execution_creator_status_created', 'creator_username',
+              'status', 'created_at'),
+        Index('ix_execution_creator_pipeline_created', 'creator_username',
+              'pipeline_identifier', 'created_at'),
+        Index('ix_execution_creator_study_created', 'creator_username',
+              'study_identifier', 'created_at'),
+        Index('ix_execution_status', 'status'),
+    )
+
     identifier = Column(String, primary_key=True, default=execution_uuid)
     name = Column(String, nullable=False)
     pipeline_identifier = Column(String, nullable=False)
@@ -0,0 +1,22 @@
+from sqlalchemy import Column, String, Text, ForeignKey
+from server.database import db
+
+
+class ExecutionInputs(db.Model):
+    """ExecutionInputs are the input values of an execution, as posted,
+    recorded when the execution is created so that listing executions does
+    not read their inputs file.
+
+    Args:
+        execution_identifier (str):
+        input_values (str): JSON object of the input values.
+
+    Attributes:
+        execution_identifier (str):
+        input_values (str):
+    """
+
+    execution_identifier = Column(String,
+                                  ForeignKey("execution.identifier"),
+                                  primary_key=True)
+    input_values = Column(Text, nullable=False)
@@ -0,0 +1,58 @@
+import enum
+from sqlalchemy import (Column, String, Integer, BigInteger, Boolean, Enum,
+                        ForeignKey)
+from server.database import db
+from server.database.models.execution import current_milli_time
+
+
+class JobState(enum.Enum):
+    queued = 1
+    running = 2
+    finished = 3
+
+
+class ExecutionJob(db.Model):
+    """ExecutionJob is the command line of an execution, as run by an
+    execution backend.
+
+    Args:
+        execution_identifier (str):
+        backend (str): Name of the backend running the job.
+        command (str): JSON list of the arguments of the command line.
+        working_directory (str):
+        stdout_path (str):
+        stderr_path (str):
+
+    Attributes:
+        execution_identifier (str):
+        backend (str):
+        command (str):
+        working_directory (str):
+        stdout_path (str):
+        stderr_path (str):
+        state (JobState):
+        job_identifier (str): Identifier of the job for the backend, such as
+        its pid or its batch job id.
+        worker (str): Name of the worker agent running the job.
+        heartbeat (int): Last time the worker agent reported the job as
+        running.
+        exit_code (int):
+        kill_requested (bool):
+        created_at (int):
+    """
+
+    execution_identifier = Column(String,
+                                  ForeignKey("execution.identifier"),
+                                  primary_key=True)
+    backend = Column(String, nullable=False)
+    command = Column(String, nullable=False)
+    working_directory = Column(String, nullable=False)
+    stdout_path = Column(String, nullable=False)
+    stderr_path = Column(String, nullable=False)
+    state = Column(Enum(JobState), nullable=False, default=JobState.queued)
+    job_identifier = Column(String)
+    worker = Column(String)
+    heartbeat = Column(BigInteger)
+    exit_code = Column(Integer)
+    kill_requested = Column(Boolean, nullable=False, default=False)
+    created_at = Column(BigInteger, default=current_milli_time)
@@ -0,0 +1,25 @@
+from sqlalchemy import Column, String, Integer, BigInteger, ForeignKey
+from server.database import db
+from server.database.models.execution import current_milli_time
+
+
+class ExecutionQueueEntry(db.Model):
+    """ExecutionQueueEntry is an execution waiting, with the `Ready` status,
+    for the execution scheduler to start it.
+
+    Args:
+        execution_identifier (str):
+        priority (int): Executions with a higher priority are started first
+        when the queue policy is 'priority'.
+
+    Attributes:
+        execution_identifier (str):
+        priority (int):
+        queued_at (int):
+    """
+
+    execution_identifier = Column(String,
+                                  ForeignKey("execution.identifier"),
+                                  primary_key=True)
+    priority = Column(Integer, nullable=False, default=0)
+    queued_at = Column(BigInteger, nullable=False, default=current_milli_time)
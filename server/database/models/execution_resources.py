@@ -0,0 +1,28 @@
+from sqlalchemy import Column, String, Float, ForeignKey
+from server.database import db
+
+
+class ExecutionResources(db.Model):
+    """ExecutionResources are the resources suggested by the descriptor of an
+    execution, recorded when the descriptor is copied to the execution
+    directory.
+
+    Args:
+        execution_identifier (str):
+        cpu_cores (float):
+        ram (float): RAM, in GB.
+        walltime (float): Estimated duration, in seconds.
+
+    Attributes:
+        execution_identifier (str):
+        cpu_cores (float):
+        ram (float):
+        walltime (float):
+    """
+
+    execution_identifier = Column(String,
+                                  ForeignKey("execution.identifier"),
+                                  primary_key=True)
+    cpu_cores = Column(Float, nullable=False)
+    ram = Column(Float, nullable=False)
+    walltime = Column(Float)
@@ -0,0 +1,39 @@
+from sqlalchemy import Column, String, Integer, BigInteger, Index
+from server.database import db
+
+
+class FileChecksum(db.Model):
+    """FileChecksum caches the checksum of a file. The checksum is valid for as
+    long as the file keeps the same device, inode, size and modification time.
+
+    Args:
+        path (str): Absolute path of the file when the checksum was computed.
+        device (int):
+        inode (int):
+        size (int):
+        mtime_ns (int):
+        algorithm (str):
+        checksum (str): Hexadecimal digest of the file.
+
+    Attributes:
+        identifier (int):
+        path (str):
+        device (int):
+        inode (int):
+        size (int):
+        mtime_ns (int):
+        algorithm (str):
+        checksum (str):
+    """
+
+    __table_args__ = (Index('ix_file_checksum_inode', 'inode', 'device',
+                            'algorithm'), )
+
+    identifier = Column(Integer, primary_key=True, autoincrement=True)
+    path = Column(String, nullable=False, index=True)
+    device = Column(BigInteger, nullable=False)
+    inode = Column(BigInteger, nullable=False)
+    size = Column(BigInteger, nullable=False)
+    mtime_ns = Column(BigInteger, nullable=False)
+    algorithm = Column(String, nullable=False)
+    checksum = Column(String, nullable=False)
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, String, Integer, BigInteger
+from server.database import db
+from server.database.models.execution import current_milli_time
+
+
+class SchemaMigration(db.Model):
+    """SchemaMigration is a migration applied to the database schema.
+
+    Args:
+        version (int):
+        description (str):
+
+    Attributes:
+        version (int):
+        description (str):
+        applied_at (int):
+    """
+
+    version = Column(Integer, primary_key=True, autoincrement=False)
+    description = Column(String, nullable=False)
+    applied_at = Column(BigInteger, nullable=False, default=current_milli_time)
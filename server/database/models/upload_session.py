@@ -0,0 +1,60 @@
+import uuid
+from sqlalchemy import Column, String, Integer, BigInteger, ForeignKey
+from server.database import db
+from server.database.models.execution import current_milli_time
+
+
+def upload_session_uuid() -> str:
+    return str(uuid.uuid4())
+
+
+class UploadSession(db.Model):
+    """UploadSession
+
+    Args:
+        identifier (str):
+        creator_username (str):
+        relative_path (str): Destination of the upload, relative to the data
+        directory.
+        size (int):
+        md5 (str):
+
+    Attributes:
+        identifier (str):
+        creator_username (str):
+        relative_path (str):
+        size (int):
+        md5 (str):
+        created_at (int):
+    """
+
+    identifier = Column(String, primary_key=True, default=upload_session_uuid)
+    creator_username = Column(
+        String, ForeignKey("user.username"), nullable=False)
+    relative_path = Column(String, nullable=False)
+    size = Column(BigInteger, nullable=False)
+    md5 = Column(String)
+    created_at = Column(BigInteger, default=current_milli_time)
+
+
+class UploadSessionRange(db.Model):
+    """UploadSessionRange is a byte range that was completely written to the
+    temporary file of an upload session.
+
+    Args:
+        session_identifier (str):
+        start (int): Offset of the first byte of the range.
+        end (int): Offset following the last byte of the range.
+
+    Attributes:
+        identifier (int):
+        session_identifier (str):
+        start (int):
+        end (int):
+    """
+
+    identifier = Column(Integer, primary_key=True, autoincrement=True)
+    session_identifier = Column(
+        String, ForeignKey("upload_session.identifier"), nullable=False)
+    start = Column(BigInteger, nullable=False)
+    end = Column(BigInteger, nullable=False)
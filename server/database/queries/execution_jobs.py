@@ -0,0 +1,52 @@
+from typing import List
+from server.database.models.execution import current_milli_time
+from server.database.models.execution_job import ExecutionJob, JobState
+
+
+def get_execution_job(execution_identifier: str, db_session) -> ExecutionJob:
+    return db_session.query(ExecutionJob).filter_by(
+        execution_identifier=execution_identifier).first()
+
+
+def get_queued_jobs(backend: str, limit: int,
+                    db_session) -> List[ExecutionJob]:
+    return db_session.query(ExecutionJob).filter_by(
+        backend=backend, state=JobState.queued, kill_requested=False).order_by(
+            ExecutionJob.created_at).limit(limit).all()
+
+
+def get_worker_jobs(worker: str, db_session) -> List[ExecutionJob]:
+    return db_session.query(ExecutionJob).filter_by(
+        worker=worker, state=JobState.running).all()
+
+
+def claim_job(execution_identifier: str, worker: str, db_session) -> bool:
+    """claim_job atomically assigns a queued job to a worker agent. It returns
+    False if another worker agent claimed it first."""
+    claimed = db_session.query(ExecutionJob).filter_by(
+        execution_identifier=execution_identifier,
+        state=JobState.queued).update(
+            {
+                ExecutionJob.state: JobState.running,
+                ExecutionJob.worker: worker,
+                ExecutionJob.heartbeat: current_milli_time()
+            },
+            synchronize_session=False)
+    db_session.commit()
+    return claimed == 1
+
+
+def finish_queued_job(execution_identifier: str, db_session) -> bool:
+    """finish_queued_job atomically finishes a job that no worker agent
+    claimed, without exit code. It returns False if a worker agent claimed it
+    first."""
+    finished = db_session.query(ExecutionJob).filter_by(
+        execution_identifier=execution_identifier,
+        state=JobState.queued).update(
+            {
+                ExecutionJob.state: JobState.finished,
+                ExecutionJob.exit_code: None
+            },
+            synchronize_session=False)
+    db_session.commit()
+    return finished == 1
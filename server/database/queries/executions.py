@@ -1,20 +1,64 @@
-from typing import List
-from server.database.models.execution import Execution
+from typing import List, Tuple
+from sqlalchemy import and_, or_
+from server.database.models.execution import Execution, ExecutionStatus
+from server.database.models.execution import current_milli_time
 from server.database.models.execution_process import ExecutionProcess
+from server.database.models.user import User, Role
+from server.database.models.execution_queue_entry import ExecutionQueueEntry
+from server.database.models.execution_resources import ExecutionResources
+from server.database.models.execution_inputs import ExecutionInputs
 
 
-def get_all_executions_for_user(username: str, limit: int, offset: int,
-                                db_session) -> List[Execution]:
-    return list(
-        db_session.query(Execution).filter(
-            Execution.creator_username == username).order_by(
-                Execution.created_at.desc()).offset(offset).limit(limit))
+def get_all_executions_for_user(username: str,
+                                limit: int,
+                                offset: int,
+                                db_session,
+                                cursor: Tuple[int, str] = None,
+                                statuses: List[ExecutionStatus] = None,
+                                pipeline_identifier: str = None,
+                                study_identifier: str = None,
+                                created_after: int = None,
+                                created_before: int = None) -> List[Execution]:
+    """get_all_executions_for_user returns the executions of a user, from the
+    most recent. `cursor` is the creation date and identifier of the last
+    execution of the previous page: the page starts right after it, found
+    with the indexes of the execution table instead of skipping `offset`
+    executions. Executions can be filtered by status, pipeline, study and
+    creation date, in milliseconds."""
+    query = db_session.query(Execution).filter(
+        Execution.creator_username == username)
+    if statuses:
+        query = query.filter(Execution.status.in_(statuses))
+    if pipeline_identifier is not None:
+        query = query.filter(
+            Execution.pipeline_identifier == pipeline_identifier)
+    if study_identifier is not None:
+        query = query.filter(Execution.study_identifier == study_identifier)
+    if created_after is not None:
+        query = query.filter(Execution.created_at >= created_after)
+    if created_before is not None:
+        query = query.filter(Execution.created_at < created_before)
+    if cursor:
+        created_at, identifier = cursor
+        query = query.filter(
+            or_(
+                Execution.created_at < created_at,
+                and_(Execution.created_at == created_at,
+                     Execution.identifier < identifier)))
+    return query.order_by(Execution.created_at.desc(),
+                          Execution.identifier.desc()).offset(offset).limit(
+                              limit).all()
 
 
 def get_execution(identifier: str, db_session) -> Execution:
     return db_session.query(Execution).filter_by(identifier=identifier).first()
 
 
+def get_execution_status(identifier: str, db_session) -> ExecutionStatus:
+    return db_session.query(
+        Execution.status).filter_by(identifier=identifier).scalar()
+
+
 def get_execution_count_for_user(username: str, db_session) -> int:
     return db_session.query(Execution).filter(
         Execution.creator_username == username).count()
@@ -24,3 +68,99 @@ def get_execution_processes(execution_identifier: str,
                             db_session) -> List[ExecutionProcess]:
     return db_session.query(ExecutionProcess).filter(
         ExecutionProcess.execution_identifier == execution_identifier).all()
+
+
+def get_execution_queue_entry(execution_identifier: str,
+                              db_session) -> ExecutionQueueEntry:
+    return db_session.query(ExecutionQueueEntry).filter_by(
+        execution_identifier=execution_identifier).first()
+
+
+def get_execution_resources(execution_identifier: str,
+                            db_session) -> ExecutionResources:
+    return db_session.query(ExecutionResources).filter_by(
+        execution_identifier=execution_identifier).first()
+
+
+def get_execution_inputs(execution_identifier: str,
+                         db_session) -> ExecutionInputs:
+    return db_session.query(ExecutionInputs).filter_by(
+        execution_identifier=execution_identifier).first()
+
+
+def get_executions_inputs(execution_identifiers: List[str],
+                          db_session) -> List[ExecutionInputs]:
+    return db_session.query(ExecutionInputs).filter(
+        ExecutionInputs.execution_identifier.in_(
+            execution_identifiers)).all()
+
+
+def get_queued_executions(by_priority: bool, db_session) -> List[Tuple[
+        ExecutionQueueEntry, Execution, Role, ExecutionResources]]:
+    """get_queued_executions returns all the queue entries, with their
+    execution, the role of its creator and its suggested resources, if they
+    were recorded. Entries are sorted by decreasing priority if `by_priority`
+    is set, then in the order they were queued."""
+    query = db_session.query(
+        ExecutionQueueEntry, Execution, User.role, ExecutionResources).join(
+            Execution, Execution.identifier ==
+            ExecutionQueueEntry.execution_identifier).join(
+                User, User.username == Execution.creator_username).outerjoin(
+                    ExecutionResources,
+                    ExecutionResources.execution_identifier ==
+                    Execution.identifier)
+    if by_priority:
+        query = query.order_by(ExecutionQueueEntry.priority.desc())
+    return query.order_by(ExecutionQueueEntry.queued_at).all()
+
+
+def get_running_executions(
+        db_session) -> List[Tuple[Execution, ExecutionResources]]:
+    return db_session.query(Execution, ExecutionResources).outerjoin(
+        ExecutionResources, ExecutionResources.execution_identifier ==
+        Execution.identifier).filter(
+            Execution.status == ExecutionStatus.Running).all()
+
+
+def get_running_execution_count(db_session) -> int:
+    return db_session.query(Execution).filter(
+        Execution.status == ExecutionStatus.Running).count()
+
+
+def claim_execution(execution_identifier: str, db_session) -> bool:
+    """claim_execution atomically moves a queued execution from `Ready` to
+    `Running`. It returns False if the execution was claimed by another
+    worker, or cancelled, in the meantime."""
+    claimed = db_session.query(Execution).filter(
+        Execution.identifier == execution_identifier,
+        Execution.status == ExecutionStatus.Ready).update(
+            {
+                Execution.status: ExecutionStatus.Running,
+                Execution.start_date: current_milli_time()
+            },
+            synchronize_session=False)
+    db_session.query(ExecutionQueueEntry).filter_by(
+        execution_identifier=execution_identifier).delete(
+            synchronize_session=False)
+    db_session.commit()
+    return claimed == 1
+
+
+def cancel_execution(execution_identifier: str, db_session) -> bool:
+    """cancel_execution atomically moves a queued execution from `Ready` to
+    `Killed`. It returns False if the execution was claimed by the scheduler
+    in the meantime."""
+    cancelled = db_session.query(Execution).filter(
+        Execution.identifier == execution_identifier,
+        Execution.status == ExecutionStatus.Ready).update(
+            {
+                Execution.status: ExecutionStatus.Killed,
+                Execution.end_date: current_milli_time()
+            },
+            synchronize_session=False)
+    if cancelled:
+        db_session.query(ExecutionQueueEntry).filter_by(
+            execution_identifier=execution_identifier).delete(
+                synchronize_session=False)
+    db_session.commit()
+    return cancelled == 1
@@ -0,0 +1,28 @@
+import os
+from typing import List
+from server.database.models.file_checksum import FileChecksum
+
+
+def get_file_checksum(st: os.stat_result, algorithm: str,
+                      db_session) -> FileChecksum:
+    return db_session.query(FileChecksum).filter_by(
+        inode=st.st_ino,
+        device=st.st_dev,
+        algorithm=algorithm,
+        size=st.st_size,
+        mtime_ns=st.st_mtime_ns).first()
+
+
+def get_file_checksums_for_inode(st: os.stat_result, algorithm: str,
+                                 db_session) -> List[FileChecksum]:
+    return db_session.query(FileChecksum).filter_by(inode=st.st_ino,
+                                                    device=st.st_dev,
+                                                    algorithm=algorithm).all()
+
+
+def get_file_checksums_under_path(path: str, db_session) -> List[FileChecksum]:
+    # The '%' and '_' of the path must not be LIKE wildcards
+    return db_session.query(FileChecksum).filter(
+        (FileChecksum.path == path)
+        | FileChecksum.path.startswith(os.path.join(path, ''),
+                                       autoescape=True)).all()
@@ -0,0 +1,28 @@
+from typing import List
+from sqlalchemy import func
+from server.database.models.upload_session import UploadSession, UploadSessionRange
+
+
+def get_upload_session(identifier: str, db_session) -> UploadSession:
+    return db_session.query(UploadSession).filter_by(
+        identifier=identifier).first()
+
+
+def get_upload_session_ranges(session_identifier: str,
+                              db_session) -> List[UploadSessionRange]:
+    return db_session.query(UploadSessionRange).filter(
+        UploadSessionRange.session_identifier == session_identifier).order_by(
+            UploadSessionRange.start).all()
+
+
+def get_upload_sessions_size(username: str, db_session) -> int:
+    """get_upload_sessions_size returns the total size of the upload sessions
+    of a user."""
+    return db_session.query(func.sum(UploadSession.size)).filter(
+        UploadSession.creator_username == username).scalar() or 0
+
+
+def get_expired_upload_sessions(created_before: int,
+                                db_session) -> List[UploadSession]:
+    return db_session.query(UploadSession).filter(
+        UploadSession.created_at < created_before).all()
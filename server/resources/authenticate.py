@@ -6,7 +6,7 @@ from server.database.models.user import User
 from .models.authentication import Authentication, AuthenticationSchema
 from .models.authentication_credentials import AuthenticationCredentialsSchema
 from .decorators import unmarshal_request, marshal_response
-from .helpers.authenticate import generate_api_key
+from .helpers.authenticate import generate_api_key, API_KEY_CACHE
 
 
 class Authenticate(Resource):
@@ -23,6 +23,7 @@ class Authenticate(Resource):
             user.api_key = generate_api_key()
             db.session.add(user)
             db.session.commit()
+            API_KEY_CACHE.invalidate_user(user.username)
 
         result = Authentication(
             http_header="apiKey", http_header_value=user.api_key)
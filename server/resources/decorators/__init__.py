@@ -8,6 +8,7 @@ from server.common.error_codes_and_messages import (
     ErrorCodeAndMessageFormatter, INVALID_MODEL_PROVIDED, MODEL_DUMPING_ERROR,
     MISSING_API_KEY, INVALID_API_KEY, UNAUTHORIZED, UNEXPECTED_ERROR)
 from server.database.models.user import User, Role
+from server.resources.helpers.authenticate import AuthenticatedUser, API_KEY_CACHE
 
 
 def unmarshal_request(schema, allow_none: bool = False, partial=False):
@@ -70,6 +71,23 @@ def marshal_response(schema=None):
     return decorator
 
 
+def authenticated_user(api_key: str) -> AuthenticatedUser:
+    """authenticated_user returns the identity of the owner of `api_key`, or None
+    if the key is unknown. Identities are looked up in `API_KEY_CACHE` before
+    querying the database."""
+    user = API_KEY_CACHE.get(api_key)
+    if user:
+        return user
+
+    user_db = db.session.query(User).filter_by(api_key=api_key).first()
+    if not user_db:
+        return None
+
+    user = AuthenticatedUser(username=user_db.username, role=user_db.role)
+    API_KEY_CACHE.put(api_key, user)
+    return user
+
+
 def login_required(func):
     @wraps(func)
     def wrapper(*args, **kwargs):
@@ -78,7 +96,7 @@ def login_required(func):
         if (apiKey is None):
             return ErrorCodeAndMessageMarshaller(MISSING_API_KEY), 401
 
-        user = db.session.query(User).filter_by(api_key=apiKey).first()
+        user = authenticated_user(apiKey)
 
         if not user:
             return ErrorCodeAndMessageMarshaller(INVALID_API_KEY), 401
@@ -96,7 +114,7 @@ def admin_only(func):
         if (apiKey is None):
             return ErrorCodeAndMessageMarshaller(MISSING_API_KEY), 401
 
-        user = db.session.query(User).filter_by(api_key=apiKey).first()
+        user = authenticated_user(apiKey)
 
         if not user:
             return ErrorCodeAndMessageMarshaller(INVALID_API_KEY), 401
@@ -7,6 +7,7 @@ from server.common.error_codes_and_messages import (
     ErrorCodeAndMessageFormatter, ErrorCodeAndMessageAdditionalDetails)
 from .models.authentication_credentials import AuthenticationCredentialsSchema
 from .decorators import marshal_response, login_required, unmarshal_request
+from .helpers.authenticate import API_KEY_CACHE
 
 
 class Edit(Resource):
@@ -31,6 +32,7 @@ class Edit(Resource):
                     username=user.username).first()
             edit_user.password = generate_password_hash(model.password)
             db.session.commit()
+            API_KEY_CACHE.invalidate_user(edit_user.username)
         else:
             # Password was not provided
             return ErrorCodeAndMessageAdditionalDetails(
@@ -1,7 +1,10 @@
 from flask_restful import Resource, request, inputs
 from server.database import db
 from server.database.models.execution import ExecutionStatus, current_milli_time
-from server.database.queries.executions import get_execution, get_execution_processes
+from server.database.queries.executions import (get_execution,
+                                                get_execution_resources,
+                                                get_execution_inputs)
+from server.database.queries.execution_jobs import get_execution_job
 from server.common.error_codes_and_messages import (
     ErrorCodeAndMessageFormatter, EXECUTION_NOT_FOUND, CANNOT_MODIFY_PARAMETER,
     UNAUTHORIZED, CANNOT_KILL_FINISHING_EXECUTION,
@@ -9,7 +12,9 @@ from server.common.error_codes_and_messages import (
 from server.resources.models.execution import ExecutionSchema, EXECUTION_COMPLETED_STATUSES
 from server.resources.helpers.executions import (
     get_execution_as_model, get_execution_dir, delete_execution_directory)
-from server.resources.helpers.execution_kill import kill_all_execution_processes
+from server.resources.helpers.execution_play import kill_execution_job
+from server.resources.helpers.execution_scheduler import EXECUTION_SCHEDULER
+from server.resources.helpers.execution_status import status_changed
 from server.resources.decorators import (login_required, marshal_response,
                                          unmarshal_request)
 
@@ -61,33 +66,40 @@ class Execution(Resource):
         deleteFiles = request.args.get(
             'deleteFiles', default=False, type=inputs.boolean)
 
-        # Get all the execution running processes
-        execution_processes = get_execution_processes(execution_identifier,
-                                                      db.session)
-
-        # Given delete is called to perform only a kill and encounter the same situation as kill, we do not kill the processes
-        # See execution_kill for more information
-        if execution_db.status == ExecutionStatus.Running and not execution_processes and not deleteFiles:
-            return CANNOT_KILL_FINISHING_EXECUTION
+        # A queued execution is simply removed from the queue, unless it was
+        # started in the meantime
+        if (execution_db.status == ExecutionStatus.Ready
+                and EXECUTION_SCHEDULER.cancel(execution_db)
+                and not deleteFiles):
+            return
 
         if execution_db.status != ExecutionStatus.Running and not deleteFiles:
             return ErrorCodeAndMessageFormatter(
                 CANNOT_KILL_NOT_RUNNING_EXECUTION, execution_db.status.name)
 
-        # Kill all the execution processed
-        kill_all_execution_processes(execution_processes)
-        for execution_process in execution_processes:
-            db.session.delete(execution_process)
-        # If the execution is not in a completed status, we mark it as killed
+        # Kill the execution job on its execution backend, and mark the
+        # execution as killed
         if execution_db.status == ExecutionStatus.Running:
+            # Given delete is called to perform only a kill and encounter the same situation as kill, we do not kill the execution
+            # See execution_kill for more information
+            if not kill_execution_job(execution_identifier) and not deleteFiles:
+                return CANNOT_KILL_FINISHING_EXECUTION
             execution_db.status = ExecutionStatus.Killed
             execution_db.end_date = current_milli_time()
-        db.session.commit()
+            db.session.commit()
+            status_changed(execution_identifier, ExecutionStatus.Killed)
 
         # Free all resources associated with the execution if delete files is True
         if deleteFiles:
             execution_dir = get_execution_dir(user.username,
                                               execution_identifier)
             delete_execution_directory(execution_dir)
+            for row in [
+                    get_execution_resources(execution_identifier, db.session),
+                    get_execution_inputs(execution_identifier, db.session),
+                    get_execution_job(execution_identifier, db.session)
+            ]:
+                if row:
+                    db.session.delete(row)
             db.session.delete(execution_db)
             db.session.commit()
@@ -4,10 +4,13 @@ from server.common.error_codes_and_messages import (
     EXECUTION_NOT_FOUND, UNAUTHORIZED, UNEXPECTED_ERROR,
     CANNOT_KILL_NOT_RUNNING_EXECUTION, CANNOT_KILL_FINISHING_EXECUTION)
 from server.database import db
-from server.database.queries.executions import get_execution, get_execution_processes
+from server.database.queries.executions import get_execution
 from server.database.models.execution import Execution, ExecutionStatus, current_milli_time
+from server.database.models.user import Role
 from server.resources.decorators import login_required, marshal_response
-from server.resources.helpers.execution_kill import kill_all_execution_processes
+from server.resources.helpers.execution_play import kill_execution_job
+from server.resources.helpers.execution_scheduler import EXECUTION_SCHEDULER
+from server.resources.helpers.execution_status import status_changed
 
 
 class ExecutionKill(Resource):
@@ -21,22 +24,23 @@ class ExecutionKill(Resource):
         if user.role != Role.admin and execution_db.creator_username != user.username:
             return UNAUTHORIZED
 
+        # A queued execution is simply removed from the queue, unless it was
+        # started in the meantime
+        if (execution_db.status == ExecutionStatus.Ready
+                and EXECUTION_SCHEDULER.cancel(execution_db)):
+            return
+
         if execution_db.status != ExecutionStatus.Running:
             return ErrorCodeAndMessageFormatter(
                 CANNOT_KILL_NOT_RUNNING_EXECUTION, execution_db.status.name)
 
-        # Look at its running processes
-        execution_processes = get_execution_processes(execution_identifier,
-                                                      db.session)
-
-        if not execution_processes:  # Most probably due to the execution being in termination process
+        # Kill its job on the execution backend
+        if not kill_execution_job(execution_identifier):
+            # Most probably due to the execution being in termination process
             return CANNOT_KILL_FINISHING_EXECUTION
 
-        kill_all_execution_processes(execution_processes)
-
-        # Mark the execution as "Killed" and delete the execution processes
+        # Mark the execution as "Killed"
         execution_db.status = ExecutionStatus.Killed
         execution_db.end_date = current_milli_time()
-        for execution_process in execution_processes:
-            db.session.delete(execution_process)
         db.session.commit()
+        status_changed(execution_identifier, ExecutionStatus.Killed)
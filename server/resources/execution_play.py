@@ -1,4 +1,5 @@
 import os
+import logging
 from flask_restful import Resource, request
 from jsonschema import ValidationError
 from server.database import db
@@ -10,8 +11,9 @@ from server.common.error_codes_and_messages import (
     EXECUTION_NOT_FOUND, UNAUTHORIZED, CORRUPTED_EXECUTION, UNEXPECTED_ERROR,
     CANNOT_REPLAY_EXECUTION, UNSUPPORTED_DESCRIPTOR_TYPE)
 from server.resources.helpers.executions import (
-    get_execution_as_model, get_descriptor_path, get_absolute_path_inputs_path)
-from server.resources.helpers.execution_play import start_execution
+    get_execution_as_model, get_descriptor_path, get_absolute_path_inputs_path,
+    query_converter)
+from server.resources.helpers.execution_scheduler import EXECUTION_SCHEDULER
 from server.resources.models.descriptor.descriptor_abstract import Descriptor
 
 
@@ -59,5 +61,7 @@ class ExecutionPlay(Resource):
                 descriptor_path))
             return UNEXPECTED_ERROR
 
-        # The execution is valid and we are now ready to start it
-        start_execution(user, execution, descriptor, modified_inputs_path)
+        # The execution is valid and is queued until a worker is available
+        priority = request.args.get(
+            'priority', default=0, type=query_converter) or 0
+        return EXECUTION_SCHEDULER.submit(execution_db, user, priority)
@@ -0,0 +1,44 @@
+from flask_restful import Resource, request
+from server import app
+from server.database import db
+from server.database.queries.executions import get_execution
+from server.common.error_codes_and_messages import (
+    ErrorCodeAndMessageFormatter, EXECUTION_NOT_FOUND, UNAUTHORIZED)
+from server.resources.decorators import login_required, marshal_response
+from server.resources.helpers.executions import (is_safe_for_get,
+                                                 query_converter)
+from server.resources.helpers.execution_status import EXECUTION_STATUS_WATCHER
+from server.resources.models.execution import (Execution, ExecutionSchema,
+                                               ExecutionStatus)
+
+
+def status_converter(value):
+    return ExecutionStatus(value)
+
+
+class ExecutionStatusPoll(Resource):
+    @login_required
+    @marshal_response(ExecutionSchema(
+        only=('identifier', 'status', 'error_code', 'start_date', 'end_date')))
+    def get(self, user, execution_identifier):
+        execution_db = get_execution(execution_identifier, db.session)
+        if not execution_db:
+            return ErrorCodeAndMessageFormatter(EXECUTION_NOT_FOUND,
+                                                execution_identifier)
+        if not is_safe_for_get(user, execution_db):
+            return UNAUTHORIZED
+
+        wait_for = request.args.getlist('waitFor', type=status_converter)
+        max_wait = app.config['EXECUTION_STATUS_MAX_WAIT']
+        timeout = request.args.get('timeout', type=query_converter)
+        timeout = max_wait if timeout is None else min(timeout, max_wait)
+        if wait_for and execution_db.status not in wait_for:
+            EXECUTION_STATUS_WATCHER.wait(execution_identifier, wait_for,
+                                          timeout)
+            db.session.refresh(execution_db)
+
+        return Execution(identifier=execution_db.identifier,
+                         status=execution_db.status,
+                         error_code=execution_db.error_code,
+                         start_date=execution_db.start_date,
+                         end_date=execution_db.end_date)
@@ -4,38 +4,88 @@ from sqlalchemy.exc import IntegrityError
 from server.database import db
 from server.database.models.execution import Execution, ExecutionStatus
 from server.platform_properties import PLATFORM_PROPERTIES
-from server.common.error_codes_and_messages import UNEXPECTED_ERROR, INVOCATION_INITIALIZATION_FAILED
+from server.common.error_codes_and_messages import (
+    ErrorCodeAndMessageFormatter, ErrorCodeAndMessageAdditionalDetails,
+    UNEXPECTED_ERROR, INVOCATION_INITIALIZATION_FAILED,
+    UNSUPPORTED_DESCRIPTOR_TYPE, INVALID_QUERY_PARAMETER)
+from server.common.utils import marshal
 from server.resources.helpers.pipelines import (
     get_original_descriptor_path_and_type)
 from server.resources.helpers.executions import (
     write_inputs_to_file, create_execution_directory, get_execution_as_model,
-    validate_request_model, delete_execution_directory,
-    copy_descriptor_to_execution_dir, create_absolute_path_inputs,
-    query_converter)
+    get_executions_as_models, validate_request_model,
+    delete_execution_directory, copy_descriptor_to_execution_dir,
+    create_absolute_path_inputs, record_execution_inputs, query_converter,
+    execution_fields, encode_cursor, cursor_converter, statuses_converter,
+    EXPANDABLE_FIELDS)
+from server.resources.helpers.execution_admission import record_execution_requirements
 from server.database.queries.executions import (get_all_executions_for_user,
                                                 get_execution)
 from .models.execution import ExecutionSchema
 from .decorators import unmarshal_request, marshal_response, login_required
 from server.resources.models.descriptor.descriptor_abstract import Descriptor
 
+# Query parameters of the execution list, with the argument of
+# `get_all_executions_for_user` they set and their converter
+LIST_PARAMETERS = [
+    ('cursor', 'cursor', cursor_converter),
+    ('status', 'statuses', statuses_converter),
+    ('pipelineIdentifier', 'pipeline_identifier', str),
+    ('studyIdentifier', 'study_identifier', str),
+    ('createdAfter', 'created_after', query_converter),
+    ('createdBefore', 'created_before', query_converter),
+]
+
 
 class Executions(Resource):
     @login_required
-    @marshal_response(ExecutionSchema(many=True))
     def get(self, user):
         offset = request.args.get('offset', type=query_converter)
         limit = request.args.get(
             'limit', type=query_converter) or PLATFORM_PROPERTIES.get(
                 'defaultLimitListExecutions')
-        user_executions = get_all_executions_for_user(user.username, limit,
-                                                      offset, db.session)
-        for i, execution in enumerate(user_executions):
-            exe, error = get_execution_as_model(user.username, execution)
-            if error:
-                return error
-            user_executions[i] = exe
+        requested_fields = {'fields': [], 'expand': []}
+        for parameter in requested_fields:
+            value = request.args.get(parameter)
+            if not value:
+                continue
+            try:
+                requested_fields[parameter] = execution_fields(value)
+            except ValueError:
+                error = ErrorCodeAndMessageFormatter(INVALID_QUERY_PARAMETER,
+                                                     value, parameter)
+                return marshal(error), 400
+        # Costly fields are only returned when they are requested, either
+        # with `expand` or in the explicit list of `fields`
+        fields = requested_fields['fields']
+        if fields:
+            fields.append('identifier')
+        else:
+            fields = [
+                field for field in ExecutionSchema().fields
+                if field not in EXPANDABLE_FIELDS
+            ] + requested_fields['expand']
+        filters = {}
+        for parameter, argument, converter in LIST_PARAMETERS:
+            value = request.args.get(parameter)
+            if value is None:
+                continue
+            try:
+                filters[argument] = converter(value)
+            except ValueError:
+                error = ErrorCodeAndMessageFormatter(INVALID_QUERY_PARAMETER,
+                                                     value, parameter)
+                return marshal(error), 400
 
-        return user_executions
+        user_executions = get_all_executions_for_user(
+            user.username, limit, offset, db.session, **filters)
+        # The token of the next page is only sent if this page is full
+        headers = {}
+        if user_executions and len(user_executions) == limit:
+            headers['X-Next-Cursor'] = encode_cursor(user_executions[-1])
+        return marshal(
+            get_executions_as_models(user.username, user_executions,
+                                     fields)), 200, headers
 
     @login_required
     @unmarshal_request(ExecutionSchema())
@@ -79,6 +129,8 @@ class Executions(Resource):
                 delete_execution_directory(execution_path)
                 db.session.rollback()
                 return error
+            record_execution_inputs(new_execution.identifier,
+                                    model.input_values)
 
             # Copying pipeline descriptor to execution folder
             error = copy_descriptor_to_execution_dir(carmin_files_path,
@@ -102,8 +154,13 @@ class Executions(Resource):
                 return ErrorCodeAndMessageFormatter(
                     UNSUPPORTED_DESCRIPTOR_TYPE, descriptor_type)
 
+            # Record the resources suggested by the descriptor, which decide
+            # when the execution can be started
+            record_execution_requirements(new_execution.identifier,
+                                          descriptor, descriptor_path)
+
             # Create a version of the inputs file with correct links
-            modified_inputs_path, error = create_absolute_path_inputs(
+            modified_inputs, error = create_absolute_path_inputs(
                 user.username, new_execution.identifier,
                 new_execution.pipeline_identifier, request.url_root)
             if error:
@@ -112,8 +169,8 @@ class Executions(Resource):
                 return UNEXPECTED_ERROR
 
             # We now validate the invocation
-            success, error = descriptor.validate(descriptor_path,
-                                                 modified_inputs_path)
+            success, error = descriptor.validate_input_values(
+                descriptor_path, modified_inputs)
             if not success:  # If this fails, we will change the execution status to InitializationFailed and return this error
                 new_execution.status = ExecutionStatus.InitializationFailed
                 db.session.commit()
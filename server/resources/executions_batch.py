@@ -0,0 +1,17 @@
+from flask_restful import Resource, request
+from server.resources.decorators import (login_required, unmarshal_request,
+                                         marshal_response)
+from server.resources.helpers.execution_batch import create_execution_batch
+from server.resources.models.execution_batch import (ExecutionBatchSchema,
+                                                     ExecutionBatchItemSchema)
+
+
+class ExecutionsBatch(Resource):
+    @login_required
+    @unmarshal_request(ExecutionBatchSchema())
+    @marshal_response(ExecutionBatchItemSchema(many=True))
+    def post(self, model, user):
+        items, error = create_execution_batch(model, user, request.url_root)
+        if error:
+            return error
+        return items
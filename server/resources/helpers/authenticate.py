@@ -1,8 +1,102 @@
+import time
+import threading
 from base64 import b64encode
+from collections import OrderedDict
 from os import urandom
+from server import app
+from server.database.models.user import Role
 
 
 def generate_api_key():
     random_bytes = urandom(16)
     key = b64encode(random_bytes).decode('utf-8')
     return key
+
+
+class AuthenticatedUser():
+    """AuthenticatedUser is the identity handed to the resources once a request
+    has been authenticated. Unlike the `User` database model, it is detached
+    from the database session and can safely be cached and shared between
+    requests.
+
+    Attributes:
+        username (str):
+        role (Role):
+    """
+
+    def __init__(self, username: str, role: Role):
+        self.username = username
+        self.role = role
+
+    def __eq__(self, other):
+        return self.__dict__ == other.__dict__
+
+
+class ApiKeyCache():
+    """ApiKeyCache maps API keys to the identity of their owner, so that
+    authenticated requests do not need a database round-trip.
+
+    The cache holds at most `API_KEY_CACHE_SIZE` keys, evicting the least
+    recently used ones first, and entries expire `API_KEY_CACHE_TTL` seconds
+    after being cached. A TTL of 0 disables the cache.
+
+    Attributes:
+        hits (int): Number of lookups answered by the cache.
+        misses (int): Number of lookups that fell through to the database.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, api_key: str) -> AuthenticatedUser:
+        with self._lock:
+            entry = self._entries.get(api_key)
+            if entry and entry[1] > time.monotonic():
+                self._entries.move_to_end(api_key)
+                self.hits += 1
+                return entry[0]
+            if entry:
+                del self._entries[api_key]
+            self.misses += 1
+            return None
+
+    def put(self, api_key: str, user: AuthenticatedUser):
+        ttl = app.config.get('API_KEY_CACHE_TTL', 0)
+        max_size = app.config.get('API_KEY_CACHE_SIZE', 0)
+        if ttl <= 0 or max_size <= 0:
+            return
+        with self._lock:
+            self._entries[api_key] = (user, time.monotonic() + ttl)
+            self._entries.move_to_end(api_key)
+            while len(self._entries) > max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate_user(self, username: str):
+        """invalidate_user drops every cached key belonging to `username`. It
+        must be called whenever the credentials of a user change."""
+        with self._lock:
+            for api_key in [
+                    k for k, (user, _) in self._entries.items()
+                    if user.username == username
+            ]:
+                del self._entries[api_key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._entries)
+            }
+
+
+API_KEY_CACHE = ApiKeyCache()
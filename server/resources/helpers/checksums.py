@@ -0,0 +1,135 @@
+import os
+import hashlib
+import logging
+import threading
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+from typing import Dict, List
+from server import app
+from server.database import db
+from server.database.models.file_checksum import FileChecksum
+from server.database.queries.file_checksums import (
+    get_file_checksum, get_file_checksums_for_inode,
+    get_file_checksums_under_path)
+
+# Size of the blocks read from disk when computing a checksum
+CHECKSUM_CHUNK_SIZE = 4 * 1024 * 1024
+
+CHECKSUM_ALGORITHMS = {
+    'md5': hashlib.md5,
+    'sha1': hashlib.sha1,
+    'sha256': hashlib.sha256,
+    'sha512': hashlib.sha512
+}
+if xxhash:
+    CHECKSUM_ALGORITHMS['xxh64'] = xxhash.xxh64
+
+
+def get_checksum(data_path: str, algorithm: str = 'md5') -> str:
+    """get_checksum returns the checksum of the file at `data_path`. Checksums
+    are cached in the database, keyed by the inode, size and modification time
+    of the file, so the file is only read again once it has been modified."""
+    st = os.stat(data_path)
+    cached = get_file_checksum(st, algorithm, db.session)
+    if cached:
+        return cached.checksum
+    checksum = compute_checksum(data_path, algorithm)
+    store_checksum(data_path, st, algorithm, checksum)
+    return checksum
+
+
+def compute_checksum(data_path: str, algorithm: str) -> str:
+    hash_object = CHECKSUM_ALGORITHMS[algorithm]()
+    buffer = bytearray(CHECKSUM_CHUNK_SIZE)
+    view = memoryview(buffer)
+    with open(data_path, 'rb', buffering=0) as f:
+        for length in iter(lambda: f.readinto(buffer), 0):
+            hash_object.update(view[:length])
+    return hash_object.hexdigest()
+
+
+def store_checksum(data_path: str, st: os.stat_result, algorithm: str,
+                   checksum: str):
+    """store_checksum caches `checksum`, computed from the file as described
+    by `st`. Nothing is cached if the file was modified in the meantime."""
+    try:
+        current_st = os.stat(data_path)
+    except OSError:
+        return
+    if (current_st.st_ino, current_st.st_dev, current_st.st_size,
+            current_st.st_mtime_ns) != (st.st_ino, st.st_dev, st.st_size,
+                                        st.st_mtime_ns):
+        return
+
+    # Checksums of previous versions of the file are never valid again
+    for stale in get_file_checksums_for_inode(st, algorithm, db.session):
+        db.session.delete(stale)
+    db.session.add(
+        FileChecksum(path=data_path,
+                     device=st.st_dev,
+                     inode=st.st_ino,
+                     size=st.st_size,
+                     mtime_ns=st.st_mtime_ns,
+                     algorithm=algorithm,
+                     checksum=checksum))
+    db.session.commit()
+
+
+def forget_checksums(data_path: str):
+    """forget_checksums drops the cached checksums of `data_path` and of
+    everything below it. It is called when files are deleted."""
+    for file_checksum in get_file_checksums_under_path(data_path, db.session):
+        db.session.delete(file_checksum)
+    db.session.commit()
+
+
+def precompute_checksums(data_path: str,
+                         known_checksums: Dict[str, str] = None):
+    """precompute_checksums caches the checksums of a freshly uploaded file, so
+    that the first checksum request does not have to read it.
+    `known_checksums` were computed while the file was written and are stored
+    as is. The other algorithms of `PRECOMPUTED_CHECKSUM_ALGORITHMS` are
+    computed in a background thread, or inline in testing mode."""
+    known_checksums = known_checksums or {}
+    try:
+        st = os.stat(data_path)
+    except OSError:
+        return
+    for algorithm, checksum in known_checksums.items():
+        store_checksum(data_path, st, algorithm, checksum)
+
+    algorithms = [
+        a for a in app.config.get('PRECOMPUTED_CHECKSUM_ALGORITHMS', [])
+        if a in CHECKSUM_ALGORITHMS and a not in known_checksums
+    ]
+    if not algorithms:
+        return
+    if app.config.get('TESTING'):
+        compute_and_store_checksums(data_path, algorithms)
+    else:
+        threading.Thread(target=compute_checksums_in_background,
+                         args=(data_path, algorithms),
+                         daemon=True).start()
+
+
+def compute_and_store_checksums(data_path: str, algorithms: List[str]):
+    for algorithm in algorithms:
+        st = os.stat(data_path)
+        if get_file_checksum(st, algorithm, db.session):
+            continue
+        store_checksum(data_path, st, algorithm,
+                       compute_checksum(data_path, algorithm))
+
+
+def compute_checksums_in_background(data_path: str, algorithms: List[str]):
+    with app.app_context():
+        try:
+            compute_and_store_checksums(data_path, algorithms)
+        except Exception:
+            logger = logging.getLogger('server-error')
+            logger.exception(
+                "Could not precompute the checksums of {}".format(data_path))
+        finally:
+            db.session.remove()
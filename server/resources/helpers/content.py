@@ -0,0 +1,287 @@
+import os
+import stat
+import zlib
+import uuid
+import tarfile
+import calendar
+import mimetypes
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+from datetime import datetime
+from typing import Iterator, List
+from flask import Response, request, send_file, stream_with_context
+
+# Size of the blocks read from disk when streaming content
+CONTENT_CHUNK_SIZE = 1024 * 1024
+
+# Range requests with more byte ranges than this are answered with the whole
+# file, as allowed by RFC 7233.
+MAX_BYTE_RANGES = 64
+
+# Supported compressions of directory archives, with the mimetype and the
+# file extension of the resulting archive.
+ARCHIVE_COMPRESSIONS = {
+    'gzip': ('application/gzip', '.tar.gz'),
+    'zstd': ('application/zstd', '.tar.zst'),
+    'none': ('application/x-tar', '.tar')
+}
+
+
+def supported_archive_compressions() -> list:
+    return [
+        c for c in ARCHIVE_COMPRESSIONS if c != 'zstd' or zstandard is not None
+    ]
+
+
+def get_file_content(data_path: str) -> Response:
+    """get_file_content sends the file at `data_path`, honoring the
+    conditional (If-None-Match, If-Modified-Since) and range (Range, If-Range)
+    headers of the request. Several byte ranges are sent as a
+    multipart/byteranges response."""
+    st = os.stat(data_path)
+    etag = file_etag(st)
+    last_modified = int(st.st_mtime)
+    mimetype, _ = mimetypes.guess_type(data_path)
+    mimetype = mimetype or 'application/octet-stream'
+
+    if not is_modified(etag, last_modified):
+        response = Response(status=304)
+    else:
+        ranges = requested_ranges(st.st_size, etag, last_modified)
+        if ranges is None:
+            response = send_file(data_path, mimetype=mimetype, add_etags=False)
+        elif not ranges:
+            response = Response(status=416)
+            response.headers['Content-Range'] = 'bytes */{}'.format(
+                st.st_size)
+        elif len(ranges) == 1:
+            response = single_range_response(data_path, mimetype, ranges[0],
+                                             st.st_size)
+        else:
+            response = multiple_ranges_response(data_path, mimetype, ranges,
+                                                st.st_size)
+
+    response.set_etag(etag)
+    response.last_modified = last_modified
+    response.accept_ranges = 'bytes'
+    return response
+
+
+def file_etag(st: os.stat_result) -> str:
+    """file_etag identifies a version of a file by its modification time and
+    size, which changes whenever the file is written to."""
+    return '{:x}-{:x}'.format(st.st_mtime_ns, st.st_size)
+
+
+def http_date_timestamp(date: datetime) -> int:
+    return calendar.timegm(date.utctimetuple())
+
+
+def is_modified(etag: str, last_modified: int) -> bool:
+    """is_modified returns False if the client already holds the current
+    version of the file. If-None-Match takes precedence over
+    If-Modified-Since, as required by RFC 7232."""
+    if request.if_none_match:
+        return not request.if_none_match.contains_weak(etag)
+    if request.if_modified_since:
+        return last_modified > http_date_timestamp(request.if_modified_since)
+    return True
+
+
+def requested_ranges(size: int, etag: str,
+                     last_modified: int) -> List[tuple]:
+    """requested_ranges returns the satisfiable [start, stop) byte ranges of
+    the Range header, or None if the whole file must be sent instead: no or
+    invalid Range header, too many ranges, or a stale If-Range."""
+    byte_range = request.range
+    if (not byte_range or byte_range.units != 'bytes'
+            or len(byte_range.ranges) > MAX_BYTE_RANGES):
+        return None
+
+    if_range = request.if_range
+    if if_range.etag and if_range.etag != etag:
+        return None
+    if if_range.date and http_date_timestamp(if_range.date) != last_modified:
+        return None
+
+    ranges = []
+    for start, stop in byte_range.ranges:
+        if start < 0:
+            # Suffix range: the last -start bytes of the file
+            start, stop = max(size + start, 0), size
+        else:
+            stop = size if stop is None else min(stop, size)
+        if start < stop:
+            ranges.append((start, stop))
+    return ranges
+
+
+def single_range_response(data_path: str, mimetype: str, byte_range: tuple,
+                          size: int) -> Response:
+    start, stop = byte_range
+    response = Response(
+        file_range_blocks(data_path, [(b'', start, stop)]),
+        status=206,
+        mimetype=mimetype)
+    response.headers['Content-Range'] = 'bytes {}-{}/{}'.format(
+        start, stop - 1, size)
+    response.content_length = stop - start
+    return response
+
+
+def multiple_ranges_response(data_path: str, mimetype: str,
+                             ranges: List[tuple], size: int) -> Response:
+    boundary = uuid.uuid4().hex
+    parts = []
+    for start, stop in ranges:
+        part_header = ('--{}\r\nContent-Type: {}\r\n'
+                       'Content-Range: bytes {}-{}/{}\r\n\r\n').format(
+                           boundary, mimetype, start, stop - 1, size)
+        # Every part but the first starts with the CRLF ending the previous one
+        if parts:
+            part_header = '\r\n' + part_header
+        parts.append((part_header.encode('ascii'), start, stop))
+    closing = '\r\n--{}--\r\n'.format(boundary).encode('ascii')
+
+    response = Response(
+        file_range_blocks(data_path, parts, closing),
+        status=206,
+        content_type='multipart/byteranges; boundary={}'.format(boundary))
+    response.content_length = len(closing) + sum(
+        len(header) + stop - start for header, start, stop in parts)
+    return response
+
+
+def file_range_blocks(data_path: str, parts: List[tuple],
+                      closing: bytes = b'') -> Iterator[bytes]:
+    """file_range_blocks generates the content of each (header, start, stop)
+    part: its header followed by the [start, stop) bytes of the file."""
+    with open(data_path, 'rb') as f:
+        for header, start, stop in parts:
+            if header:
+                yield header
+            f.seek(start)
+            remaining = stop - start
+            while remaining > 0:
+                chunk = f.read(min(CONTENT_CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+    if closing:
+        yield closing
+
+
+def get_directory_content(data_path: str,
+                          compression: str = 'gzip') -> Response:
+    """get_directory_content returns the directory at `data_path` as a tar
+    archive, built and compressed while it is sent. Nothing is written to
+    disk, and memory use does not depend on the size of the directory."""
+    mimetype, extension = ARCHIVE_COMPRESSIONS[compression]
+    filename = os.path.basename(data_path) + extension
+    return Response(
+        stream_with_context(compress(tar_stream(data_path), compression)),
+        mimetype=mimetype,
+        headers={
+            'Content-Disposition': 'attachment; filename="{}"'.format(
+                filename)
+        })
+
+
+def compress(chunks: Iterator[bytes], compression: str) -> Iterator[bytes]:
+    if compression == 'none':
+        yield from chunks
+        return
+    if compression == 'zstd':
+        compressor = zstandard.ZstdCompressor().compressobj()
+    else:
+        # wbits=31 produces a gzip container instead of a raw zlib stream
+        compressor = zlib.compressobj(wbits=31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def tar_stream(data_path: str) -> Iterator[bytes]:
+    """tar_stream generates the blocks of an uncompressed tar archive of
+    `data_path`, rooted at its basename, like `tarfile.add` would."""
+    written = 0
+    for path, arcname in walk(data_path, os.path.basename(data_path)):
+        tarinfo = tar_info(path, arcname)
+        if not tarinfo:
+            continue
+        header = tarinfo.tobuf(tarfile.PAX_FORMAT, 'utf-8', 'surrogateescape')
+        yield header
+        written += len(header)
+        if tarinfo.isreg():
+            for chunk in file_blocks(path, tarinfo.size):
+                yield chunk
+                written += len(chunk)
+
+    # The archive ends with two empty blocks, and is padded to a whole record
+    end_of_archive = 2 * tarfile.BLOCKSIZE
+    end_of_archive += -(written + end_of_archive) % tarfile.RECORDSIZE
+    yield tarfile.NUL * end_of_archive
+
+
+def walk(path: str, arcname: str) -> Iterator[tuple]:
+    """walk generates the (path, arcname) pairs of `path` and of everything
+    below it, in the same order as `tarfile.add`. Symbolic links to
+    directories are not followed."""
+    yield path, arcname
+    if os.path.isdir(path) and not os.path.islink(path):
+        for name in sorted(os.listdir(path)):
+            yield from walk(
+                os.path.join(path, name), os.path.join(arcname, name))
+
+
+def tar_info(path: str, arcname: str) -> tarfile.TarInfo:
+    try:
+        st = os.lstat(path)
+    except OSError:
+        # The file was removed while the archive was being sent
+        return None
+
+    tarinfo = tarfile.TarInfo(arcname)
+    tarinfo.mode = stat.S_IMODE(st.st_mode)
+    tarinfo.uid = st.st_uid
+    tarinfo.gid = st.st_gid
+    tarinfo.mtime = st.st_mtime
+    if stat.S_ISREG(st.st_mode):
+        tarinfo.type = tarfile.REGTYPE
+        tarinfo.size = st.st_size
+    elif stat.S_ISDIR(st.st_mode):
+        tarinfo.type = tarfile.DIRTYPE
+    elif stat.S_ISLNK(st.st_mode):
+        tarinfo.type = tarfile.SYMTYPE
+        tarinfo.linkname = os.readlink(path)
+    else:
+        # Sockets, fifos and devices are not archived
+        return None
+    return tarinfo
+
+
+def file_blocks(path: str, size: int) -> Iterator[bytes]:
+    """file_blocks generates exactly `size` bytes of content for the file at
+    `path`, padded to a whole number of tar blocks. If the file shrank since
+    its header was written, the missing content is replaced with zeros."""
+    remaining = size
+    try:
+        with open(path, 'rb') as f:
+            while remaining > 0:
+                chunk = f.read(min(CONTENT_CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+    except OSError:
+        pass
+    padding = remaining + (-size % tarfile.BLOCKSIZE)
+    while padding > 0:
+        zeros = min(CONTENT_CHUNK_SIZE, padding)
+        padding -= zeros
+        yield tarfile.NUL * zeros
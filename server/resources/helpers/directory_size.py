@@ -0,0 +1,105 @@
+import os
+try:
+    from os import scandir
+except ImportError:
+    from scandir import scandir
+import time
+import threading
+from collections import OrderedDict
+from server import app
+
+
+class DirectorySize():
+    """DirectorySize is the cached size of a directory.
+
+    Attributes:
+        mtime_ns (int): Modification time of the directory when its size was
+        computed.
+        size (int): Sum of the sizes of all the files below the directory.
+        computed_at (float): Monotonic time at which the size was computed.
+    """
+
+    def __init__(self, mtime_ns: int, size: int, computed_at: float):
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.computed_at = computed_at
+
+
+class DirectorySizeIndex():
+    """DirectorySizeIndex caches the recursive size of directories, so that
+    listing a directory does not walk the whole tree below each of its
+    entries.
+
+    The size of a directory is the size of its own files plus the cached sizes
+    of its subdirectories. A cached size is reused as long as the modification
+    time of the directory is unchanged, which covers files added, removed or
+    renamed directly inside it. Changes deeper in the tree do not update the
+    modification time of the ancestors: the server invalidates the ancestors
+    of every path it writes to, and sizes older than `DIRECTORY_SIZE_INDEX_TTL`
+    seconds are recomputed to catch up with changes made outside the server.
+    At most `DIRECTORY_SIZE_INDEX_SIZE` directories are kept, evicting the
+    least recently used ones first.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, absolute_path: str, st: os.stat_result = None) -> int:
+        """get returns the size of the directory at `absolute_path`, computing
+        only the parts of the tree that are not cached. `st` is the stat result
+        of the directory, if already known."""
+        absolute_path = os.path.normpath(absolute_path)
+        st = st or os.stat(absolute_path)
+        now = time.monotonic()
+        ttl = app.config.get('DIRECTORY_SIZE_INDEX_TTL', 0)
+        with self._lock:
+            entry = self._entries.get(absolute_path)
+            if (entry and entry.mtime_ns == st.st_mtime_ns
+                    and now - entry.computed_at < ttl):
+                self._entries.move_to_end(absolute_path)
+                return entry.size
+
+        size = 0
+        for f in scandir(absolute_path):
+            try:
+                if f.is_dir(follow_symlinks=False):
+                    size += self.get(f.path, f.stat(follow_symlinks=False))
+                elif f.is_file():
+                    size += f.stat().st_size
+            except OSError:
+                # The entry was removed while the directory was being sized
+                continue
+
+        self._put(absolute_path, DirectorySize(st.st_mtime_ns, size, now))
+        return size
+
+    def invalidate(self, absolute_path: str):
+        """invalidate drops the cached sizes of `absolute_path` and of all its
+        ancestors. It must be called after writing to, or deleting, any path
+        below the data directory."""
+        absolute_path = os.path.normpath(absolute_path)
+        with self._lock:
+            while True:
+                self._entries.pop(absolute_path, None)
+                parent = os.path.dirname(absolute_path)
+                if parent == absolute_path:
+                    break
+                absolute_path = parent
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _put(self, absolute_path: str, entry: DirectorySize):
+        max_size = app.config.get('DIRECTORY_SIZE_INDEX_SIZE', 0)
+        if max_size <= 0:
+            return
+        with self._lock:
+            self._entries[absolute_path] = entry
+            self._entries.move_to_end(absolute_path)
+            while len(self._entries) > max_size:
+                self._entries.popitem(last=False)
+
+
+DIRECTORY_SIZE_INDEX = DirectorySizeIndex()
@@ -4,8 +4,8 @@ from server import app
 from server.resources.helpers.pathnames import EXECUTIONS_DIRNAME
 
 
-def extract_execution_identifier_from_path(
-        absolute_path_to_resource: str) -> str:
+def extract_execution_identifier_from_path(absolute_path_to_resource: str,
+                                           is_directory: bool = None) -> str:
 
     rel_path = PurePath(
         os.path.relpath(absolute_path_to_resource,
@@ -27,7 +27,9 @@ def extract_execution_identifier_from_path(
             return None
         elif len(split_path) == actual_execution_folder_index + 1:
             # We have an execution folder
-            if os.path.isdir(absolute_path_to_resource):
+            if is_directory is None:
+                is_directory = os.path.isdir(absolute_path_to_resource)
+            if is_directory:
                 return split_path[actual_execution_folder_index]
             else:
                 return None
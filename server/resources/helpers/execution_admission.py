@@ -0,0 +1,152 @@
+import math
+import logging
+import psutil
+from typing import List, Tuple
+from server import app
+from server.database import db
+from server.database.models.execution_resources import ExecutionResources
+from server.platform_properties import PLATFORM_PROPERTIES
+from server.resources.helpers.executions import get_descriptor_path
+from server.resources.models.descriptor.descriptor_abstract import (
+    Descriptor, ResourceRequirements)
+
+
+def record_execution_requirements(execution_identifier: str,
+                                  descriptor: Descriptor,
+                                  descriptor_path: str):
+    """record_execution_requirements stores the resources suggested by the
+    descriptor of a new execution, so that they are known when the execution
+    is admitted."""
+    requirements = read_requirements(descriptor, descriptor_path)
+    db.session.add(
+        ExecutionResources(execution_identifier=execution_identifier,
+                           cpu_cores=requirements.cpu_cores,
+                           ram=requirements.ram,
+                           walltime=requirements.walltime))
+    db.session.commit()
+
+
+def get_execution_requirements(
+        execution_db,
+        resources_db: ExecutionResources = None) -> ResourceRequirements:
+    """get_execution_requirements returns the recorded resources of an
+    execution. For executions created before resources were recorded, the
+    descriptor of the execution is read again."""
+    if resources_db:
+        return ResourceRequirements(cpu_cores=resources_db.cpu_cores,
+                                    ram=resources_db.ram,
+                                    walltime=resources_db.walltime)
+    descriptor = Descriptor.descriptor_factory_from_type(
+        execution_db.descriptor)
+    return read_requirements(
+        descriptor,
+        get_descriptor_path(execution_db.creator_username,
+                            execution_db.identifier))
+
+
+def read_requirements(descriptor: Descriptor,
+                      descriptor_path: str) -> ResourceRequirements:
+    try:
+        return descriptor.requirements(descriptor_path)
+    except Exception:
+        logger = logging.getLogger('server-error')
+        logger.exception("Could not read the suggested resources of {}".format(
+            descriptor_path))
+        return ResourceRequirements()
+
+
+def get_host_capacity() -> ResourceRequirements:
+    """get_host_capacity returns the CPU cores and RAM, in GB, available to
+    executions on the host: `EXECUTION_HOST_CPU_CORES` and
+    `EXECUTION_HOST_RAM` if set, or all of the host otherwise."""
+    cpu_cores = (app.config.get('EXECUTION_HOST_CPU_CORES')
+                 or psutil.cpu_count())
+    ram = (app.config.get('EXECUTION_HOST_RAM')
+           or psutil.virtual_memory().total / 1024**3)
+    return ResourceRequirements(cpu_cores=cpu_cores, ram=ram)
+
+
+def exceeded_capacity(requirements: ResourceRequirements,
+                      capacity: ResourceRequirements) -> str:
+    """exceeded_capacity describes how an execution with `requirements` exceeds
+    the capacity of the host, if it does. Such an execution could never be
+    started."""
+    if requirements.cpu_cores > capacity.cpu_cores:
+        return "the execution requires {} CPU cores, the host has {}".format(
+            requirements.cpu_cores, capacity.cpu_cores)
+    if requirements.ram > capacity.ram:
+        return "the execution requires {} GB of RAM, the host has {:.1f}".format(
+            requirements.ram, capacity.ram)
+    return None
+
+
+def max_duration(execution_db, requirements: ResourceRequirements) -> float:
+    """max_duration returns the number of seconds after which an execution is
+    expected to be complete: its walltime estimate, bounded by its timeout.
+    It is infinite if neither is known."""
+    timeout = execution_db.timeout
+    if timeout is None:
+        timeout = PLATFORM_PROPERTIES.get("defaultExecutionTimeout")
+    durations = [d for d in [requirements.walltime, timeout] if d]
+    return min(durations) if durations else math.inf
+
+
+class Backfill():
+    """Backfill admits executions on the host as long as their requirements
+    fit in the resources that are not committed to running executions.
+
+    Executions are offered in queue order. When one does not fit, it gets a
+    reservation: the time at which enough running executions are expected to
+    be complete for it to fit. Later executions are then only admitted if
+    they are expected to complete before the reservation, or if they fit in
+    the resources that the reserved execution will leave unused. Small
+    executions can thus run around a large one without delaying it.
+    """
+
+    def __init__(self, capacity: ResourceRequirements,
+                 running: List[Tuple[float,
+                                     ResourceRequirements]], now: float):
+        """`running` are the expected completion times, in seconds since the
+        epoch, and the requirements of the running executions."""
+        self.now = now
+        self.running = sorted(running, key=lambda r: r[0])
+        self.free_cpu_cores = capacity.cpu_cores - sum(r.cpu_cores
+                                                       for _, r in running)
+        self.free_ram = capacity.ram - sum(r.ram for _, r in running)
+        self.reservation_time = None
+        self.extra_cpu_cores = 0
+        self.extra_ram = 0
+
+    def admit(self, requirements: ResourceRequirements,
+              duration: float) -> bool:
+        if not (requirements.cpu_cores <= self.free_cpu_cores
+                and requirements.ram <= self.free_ram):
+            if self.reservation_time is None:
+                self._reserve(requirements)
+            return False
+
+        if self.reservation_time is not None:
+            if (duration == math.inf
+                    or self.now + duration > self.reservation_time):
+                if not (requirements.cpu_cores <= self.extra_cpu_cores
+                        and requirements.ram <= self.extra_ram):
+                    return False
+                self.extra_cpu_cores -= requirements.cpu_cores
+                self.extra_ram -= requirements.ram
+
+        self.free_cpu_cores -= requirements.cpu_cores
+        self.free_ram -= requirements.ram
+        self.running.append((self.now + duration, requirements))
+        self.running.sort(key=lambda r: r[0])
+        return True
+
+    def _reserve(self, requirements: ResourceRequirements):
+        cpu_cores, ram = self.free_cpu_cores, self.free_ram
+        for end, running_requirements in self.running:
+            cpu_cores += running_requirements.cpu_cores
+            ram += running_requirements.ram
+            if requirements.cpu_cores <= cpu_cores and requirements.ram <= ram:
+                self.reservation_time = end
+                self.extra_cpu_cores = cpu_cores - requirements.cpu_cores
+                self.extra_ram = ram - requirements.ram
+                return
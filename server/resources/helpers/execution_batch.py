@@ -0,0 +1,166 @@
+from typing import List
+from server import app
+from server.database import db
+from server.database.models.user import User
+from server.database.models.execution import (Execution as ExecutionDB,
+                                              ExecutionStatus, execution_uuid)
+from server.database.models.execution_resources import ExecutionResources
+from server.common.error_codes_and_messages import (
+    ErrorCodeAndMessageFormatter, ErrorCodeAndMessageAdditionalDetails,
+    INVALID_PIPELINE_IDENTIFIER, INVALID_INPUT_FILE, UNEXPECTED_ERROR,
+    INVOCATION_INITIALIZATION_FAILED, EXECUTION_BATCH_TOO_LARGE)
+from server.resources.helpers.pipelines import (
+    get_pipeline, get_original_descriptor_path_and_type)
+from server.resources.helpers.executions import (
+    create_execution_directory, delete_execution_directory, get_execution_dir,
+    write_inputs_to_file, copy_descriptor_to_execution_dir,
+    write_absolute_path_inputs_to_file, absolute_path_inputs,
+    input_files_exist, validate_execution_timeout, record_execution_inputs)
+from server.resources.helpers.execution_admission import read_requirements
+from server.resources.helpers.execution_scheduler import EXECUTION_SCHEDULER
+from server.resources.models.execution import Execution
+from server.resources.models.execution_batch import (ExecutionBatch,
+                                                     ExecutionBatchItem)
+from server.resources.models.error_code_and_message import ErrorCodeAndMessage
+from server.resources.models.pipeline import Pipeline
+from server.resources.models.descriptor.descriptor_abstract import Descriptor
+
+
+def create_execution_batch(
+        batch: ExecutionBatch, user: User,
+        url_root: str) -> (List[ExecutionBatchItem], ErrorCodeAndMessage):
+    """create_execution_batch creates the executions of a batch, and plays
+    them if requested.
+
+    The pipeline, its descriptor and the timeout are checked once for the
+    whole batch, and an error is returned if they are not valid, or if the
+    batch has more than MAX_EXECUTION_BATCH_SIZE input values. Invalid input
+    values only fail their own item. All invocations are validated in one
+    pass, and all executions are inserted in a single transaction."""
+    if len(batch.input_values) > app.config['MAX_EXECUTION_BATCH_SIZE']:
+        return None, ErrorCodeAndMessageFormatter(
+            EXECUTION_BATCH_TOO_LARGE, len(batch.input_values),
+            app.config['MAX_EXECUTION_BATCH_SIZE'])
+    pipeline = get_pipeline(batch.pipeline_identifier)
+    if not pipeline:
+        return None, INVALID_PIPELINE_IDENTIFIER
+    error = validate_execution_timeout(batch.timeout)
+    if error:
+        return None, error
+    (descriptor_path,
+     descriptor_type), error = get_original_descriptor_path_and_type(
+         batch.pipeline_identifier)
+    if error:
+        return None, error
+    descriptor = Descriptor.descriptor_factory_from_type(descriptor_type)
+    requirements = read_requirements(descriptor, descriptor_path)
+
+    items = []
+    created = []
+    try:
+        for index, input_values in enumerate(batch.input_values):
+            item = ExecutionBatchItem(index=index)
+            items.append(item)
+            files_exist, path = input_files_exist(input_values, pipeline,
+                                                  url_root)
+            if not files_exist:
+                item.error = ErrorCodeAndMessageFormatter(
+                    INVALID_INPUT_FILE, path)
+                continue
+
+            execution_db = ExecutionDB(
+                identifier=execution_uuid(),
+                name="{}_{}".format(batch.name, index),
+                pipeline_identifier=batch.pipeline_identifier,
+                descriptor=descriptor_type,
+                timeout=batch.timeout,
+                status=ExecutionStatus.Initializing,
+                study_identifier=batch.study_identifier,
+                creator_username=user.username)
+            inputs, error = write_execution_files(execution_db, user,
+                                                  input_values,
+                                                  descriptor_path, pipeline,
+                                                  url_root)
+            if error:
+                item.error = error
+                continue
+            item.identifier = execution_db.identifier
+            created.append((item, execution_db, input_values, inputs))
+
+        valid = []
+        for (item, execution_db, input_values, _), (success, error) in zip(
+                created,
+                descriptor.validate_all(descriptor_path,
+                                        [c[3] for c in created])):
+            if success:
+                valid.append((item, execution_db))
+            else:
+                execution_db.status = ExecutionStatus.InitializationFailed
+                item.error = ErrorCodeAndMessageAdditionalDetails(
+                    ErrorCodeAndMessageFormatter(
+                        INVOCATION_INITIALIZATION_FAILED,
+                        execution_db.identifier), str(error))
+            item.status = execution_db.status
+            db.session.add(execution_db)
+            record_execution_inputs(execution_db.identifier, input_values)
+            db.session.add(
+                ExecutionResources(
+                    execution_identifier=execution_db.identifier,
+                    cpu_cores=requirements.cpu_cores,
+                    ram=requirements.ram,
+                    walltime=requirements.walltime))
+        db.session.flush()
+    except Exception:
+        # The directories of the executions are not kept without their rows
+        db.session.rollback()
+        for _, execution_db, _, _ in created:
+            try:
+                delete_execution_directory(
+                    get_execution_dir(user.username, execution_db.identifier))
+            except FileNotFoundError:
+                pass
+        raise
+
+    if not batch.play:
+        db.session.commit()
+        return items, None
+
+    errors = EXECUTION_SCHEDULER.submit_all([(execution_db, requirements)
+                                             for _, execution_db in valid],
+                                            user, batch.priority)
+    for (item, _), error in zip(valid, errors):
+        item.status = (ExecutionStatus.InitializationFailed
+                       if error else ExecutionStatus.Ready)
+        item.error = error
+    return items, None
+
+
+def write_execution_files(execution_db: ExecutionDB, user: User,
+                          input_values: dict, descriptor_path: str,
+                          pipeline: Pipeline,
+                          url_root: str) -> (dict, ErrorCodeAndMessage):
+    """write_execution_files creates the directory of a new execution, with
+    its inputs and descriptor, and returns its inputs with the paths of their
+    files in the data directory."""
+    (execution_path, carmin_files_path), error = create_execution_directory(
+        execution_db, user)
+    if error:
+        return None, error
+
+    error = write_inputs_to_file(Execution(input_values=input_values),
+                                 carmin_files_path)
+    if not error:
+        error = copy_descriptor_to_execution_dir(carmin_files_path,
+                                                 descriptor_path)
+    if error:
+        delete_execution_directory(execution_path)
+        return None, UNEXPECTED_ERROR
+
+    input_values = absolute_path_inputs(input_values, pipeline, url_root)
+    _, error = write_absolute_path_inputs_to_file(user.username,
+                                                  execution_db.identifier,
+                                                  input_values)
+    if error:
+        delete_execution_directory(execution_path)
+        return None, error
+    return input_values, None
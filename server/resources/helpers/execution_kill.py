@@ -19,18 +19,24 @@ def kill_all_execution_processes(execution_processes: List[ExecutionProcess]):
 
 def kill_execution_processes(processes: List[ExecutionProcess]):
     for process_entry in processes:
-        try:
-            process = Process(process_entry.pid)
-            children = process.children(recursive=True)
-            children.append(process)
-            for p in children:
-                call(['kill', '-s', 'TERM', str(p.pid)])
-            _, alive = wait_procs(children, timeout=2)
-            for p in alive:
-                call(['kill', '-s', 'QUIT', str(p.pid)])
-        except NoSuchProcess:
-            # The process was already killed. Let's continue
-            pass
+        kill_process_tree(process_entry.pid)
+
+
+def kill_process_tree(pid: int):
+    """kill_process_tree terminates a process and all its descendants, and
+    forces them to quit if they are still alive after 2 seconds."""
+    try:
+        process = Process(pid)
+        children = process.children(recursive=True)
+        children.append(process)
+        for p in children:
+            call(['kill', '-s', 'TERM', str(p.pid)])
+        _, alive = wait_procs(children, timeout=2)
+        for p in alive:
+            call(['kill', '-s', 'QUIT', str(p.pid)])
+    except NoSuchProcess:
+        # The process was already killed. Let's continue
+        pass
 
 
 def get_process_alive_count(processes: List[ExecutionProcess],
@@ -1,122 +1,151 @@
-import sys
 import os
-from subprocess import Popen, TimeoutExpired
-from multiprocessing import Pool, current_process
+import json
+import logging
+from sqlalchemy.exc import InvalidRequestError
 from server import app
 from server.platform_properties import PLATFORM_PROPERTIES
 from server.database import db
-from server.database.models.user import User
 from server.database.models.execution import ExecutionStatus, current_milli_time
+from server.database.models.execution_job import ExecutionJob, JobState
 from server.database.models.execution_process import ExecutionProcess
 from server.database.queries.executions import get_execution
-from server.resources.models.execution import Execution
+from server.database.queries.execution_jobs import get_execution_job
 from server.resources.helpers.path import get_user_data_directory
 from server.resources.helpers.executions import (
-    get_execution_dir, get_descriptor_path, std_file_path, STDOUT_FILENAME,
-    STDERR_FILENAME)
-from server.resources.helpers.execution_kill import kill_execution_processes
+    get_execution_dir, get_descriptor_path, get_absolute_path_inputs_path,
+    std_file_path, STDOUT_FILENAME, STDERR_FILENAME)
+from server.resources.helpers.directory_size import DIRECTORY_SIZE_INDEX
+from server.resources.helpers.execution_status import status_changed
+from server.resources.helpers.execution_results import (
+    write_outputs_manifest, write_returned_files)
 from server.resources.models.descriptor.descriptor_abstract import Descriptor
+from server.resources.models.backend.backend_abstract import Backend
 
 
-def start_execution(user: User, execution: Execution, descriptor: Descriptor,
-                    inputs_path: str):
-    #  Launch the execution process
-    if app.config["TESTING"]:
-        execution_process(
-            user=user,
-            execution=execution,
-            descriptor=descriptor,
-            inputs_path=inputs_path)
-    else:
-        pool = Pool(processes=1)
-        pool.apply_async(
-            func=execution_process,
-            kwds={
-                "user": user,
-                "execution": execution,
-                "descriptor": descriptor,
-                "inputs_path": inputs_path
-            })
-        pool.close()
+def create_execution_job(execution_identifier: str) -> ExecutionJob:
+    """create_execution_job creates the job of an execution claimed by the
+    execution scheduler. The execution is already marked as `Running`."""
+    execution_db = get_execution(execution_identifier, db.session)
+    username = execution_db.creator_username
 
-
-def execution_process(user: User, execution: Execution, descriptor: Descriptor,
-                      inputs_path: str):
-    # 1 Write the current execution pid to database
-    execution_process = ExecutionProcess(
-        execution_identifier=execution.identifier,
-        pid=current_process().pid,
-        is_execution=False)
-    db.session.add(execution_process)
+    user_data_dir = get_user_data_directory(username)
+    descriptor_path = get_descriptor_path(username, execution_identifier)
+    inputs_path = get_absolute_path_inputs_path(username, execution_identifier)
+    descriptor = Descriptor.descriptor_factory_from_type(
+        execution_db.descriptor)
+    job = ExecutionJob(
+        execution_identifier=execution_identifier,
+        backend=app.config['EXECUTION_BACKEND'],
+        command=json.dumps(
+            descriptor.execute(user_data_dir, descriptor_path, inputs_path)),
+        working_directory=get_execution_dir(username, execution_identifier),
+        stdout_path=std_file_path(username, execution_identifier,
+                                  STDOUT_FILENAME),
+        stderr_path=std_file_path(username, execution_identifier,
+                                  STDERR_FILENAME))
+    db.session.add(job)
     db.session.commit()
+    return job
 
-    # 2 Change the execution status in the database
-    execution_db = get_execution(execution.identifier, db.session)
-    execution_db.status = ExecutionStatus.Running
-    execution_db.start_date = current_milli_time()
-    db.session.commit()
 
-    # 3 Launch the bosh execution
-    user_data_dir = get_user_data_directory(user.username)
-    execution_dir = get_execution_dir(user.username, execution.identifier)
-    descriptor_path = get_descriptor_path(user.username, execution.identifier)
-    timeout = execution.timeout
+def get_execution_timeout(execution_db) -> int:
+    """get_execution_timeout returns the timeout of an execution, in seconds,
+    or None if it has none."""
+    timeout = execution_db.timeout
     if timeout is None:
         timeout = PLATFORM_PROPERTIES.get("defaultExecutionTimeout")
-    if not timeout:
-        timeout = None
+    return timeout or None
 
-    with open(
-            std_file_path(user.username, execution.identifier,
-                          STDOUT_FILENAME),
-            'w') as file_stdout, open(
-                std_file_path(user.username, execution.identifier,
-                              STDERR_FILENAME), 'w') as file_stderr:
-        try:
-            process = Popen(
-                descriptor.execute(user_data_dir, descriptor_path,
-                                   inputs_path),
-                stdout=file_stdout,
-                stderr=file_stderr,
-                cwd=execution_dir)
 
-            # Insert Popen process in DB
-            execution_process_popen = ExecutionProcess(
-                execution_identifier=execution.identifier,
-                pid=process.pid,
-                is_execution=True)
-            db.session.add(execution_process_popen)
-            db.session.commit()
+def finish_execution_job(execution_identifier: str,
+                         exit_code: int,
+                         timed_out: bool = False):
+    """finish_execution_job records the completion of the job of an
+    execution, and completes the execution. `exit_code` is None if the job
+    could not be run."""
+    execution_db = get_execution(execution_identifier, db.session)
+    if not execution_db:
+        # The execution was deleted, with its job and its directory, while it
+        # was running
+        return
+    username = execution_db.creator_username
+    try:
+        execution_dir = get_execution_dir(username, execution_identifier)
+        inputs_path = get_absolute_path_inputs_path(username,
+                                                    execution_identifier)
+    except FileNotFoundError:
+        execution_dir = None
+    job = get_execution_job(execution_identifier, db.session)
+    if job:
+        job.state = JobState.finished
+        job.exit_code = exit_code
+        if timed_out and execution_dir:
+            with open(job.stderr_path, 'a') as file_stderr:
+                file_stderr.write(
+                    "Execution timed out after {} seconds".format(
+                        get_execution_timeout(execution_db)))
+    # Delete Execution processes from the database. They may already have been
+    # deleted if the execution was killed.
+    db.session.query(ExecutionProcess).filter_by(
+        execution_identifier=execution_identifier).delete(
+            synchronize_session=False)
+
+    # List the outputs once, before the execution is seen as completed
+    if execution_dir:
+        write_outputs_manifest(execution_dir)
+        try:
+            write_returned_files(
+                execution_dir,
+                Descriptor.descriptor_factory_from_type(
+                    execution_db.descriptor),
+                get_descriptor_path(username, execution_identifier),
+                inputs_path)
+        except Exception:
+            # The output files are then returned as a list
+            logger = logging.getLogger('server-error')
+            logger.exception(
+                "Could not resolve the output files of execution {}".format(
+                    execution_identifier))
 
-            exit_code = process.wait(timeout=timeout)
-        except TimeoutExpired as timeout_expired:  # Timeout
-            kill_execution_processes([execution_process_popen])
-            file_stderr.writelines(
-                "Execution timed out after {} seconds".format(
-                    timeout_expired.timeout))
-            ExecutionFailed(execution_db)
-        except Exception:  # Any other execution issue
-            ExecutionFailed(execution_db)
-            kill_execution_processes([execution_process_popen])
-        else:
-            # 4 Execution successfully completed - Writing to database
-            if exit_code == 0:
-                execution_db.status = ExecutionStatus.Finished
-            else:
-                execution_db.status = ExecutionStatus.ExecutionFailed
-            db.session.commit()
-        finally:
-            # Delete Execution processes from the database
-            db.session.delete(execution_process)
-            db.session.delete(execution_process_popen)
-            # Insert endtime
-            execution_db.end_date = current_milli_time()
-            db.session.commit()
+    complete_execution(execution_db, ExecutionStatus.Finished
+                       if exit_code == 0 and not timed_out else
+                       ExecutionStatus.ExecutionFailed)
 
-            # Delete temporary absolute input paths files
+    if execution_dir:
+        # Delete temporary absolute input paths files
+        try:
             os.remove(inputs_path)
+        except FileNotFoundError:
+            pass
+
+        # The execution wrote its outputs below the execution directory
+        DIRECTORY_SIZE_INDEX.invalidate(execution_dir)
+
+
+def complete_execution(execution_db, status: ExecutionStatus):
+    """complete_execution sets the final status and end date of an execution,
+    unless it was killed while it was running."""
+    try:
+        db.session.refresh(execution_db)
+    except InvalidRequestError:
+        # The execution was deleted while it was completing
+        db.session.rollback()
+        return
+    if execution_db.status == ExecutionStatus.Running:
+        execution_db.status = status
+        execution_db.end_date = current_milli_time()
+    db.session.commit()
+    status_changed(execution_db.identifier, execution_db.status)
 
 
-def ExecutionFailed(execution_db):
-    execution_db.status = ExecutionStatus.ExecutionFailed
+def kill_execution_job(execution_identifier: str) -> bool:
+    """kill_execution_job kills the job of a running execution on its
+    execution backend. It returns False if the execution has no job running,
+    most probably because it is completing."""
+    job = get_execution_job(execution_identifier, db.session)
+    if not job or job.state == JobState.finished:
+        return False
+    job.kill_requested = True
     db.session.commit()
+    Backend.backend_factory_from_name(job.backend).kill(job)
+    return True
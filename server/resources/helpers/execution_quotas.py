@@ -0,0 +1,101 @@
+import json
+from typing import Dict
+from server import app
+from server.database.models.user import Role
+from server.resources.models.execution_quota import (ExecutionQuota,
+                                                     ExecutionQuotaSchema)
+from server.resources.models.descriptor.descriptor_abstract import ResourceRequirements
+
+
+def load_execution_quotas(quotas_path: str) -> Dict:
+    """load_execution_quotas reads the execution quotas file, and raises an
+    EnvironmentError if it is invalid. The file contains a `default` quota,
+    applied to every user, and quotas by role in `roles` and by username in
+    `users`, which override the default quota limit by limit."""
+    with open(quotas_path) as f:
+        quotas = json.load(f)
+    if not isinstance(quotas, dict):
+        raise EnvironmentError(
+            "Execution quotas file '{}' must contain a JSON object".format(
+                quotas_path))
+
+    quota_lists = [('default', quotas.get('default', {}))]
+    for section in ['roles', 'users']:
+        if not isinstance(quotas.get(section, {}), dict):
+            raise EnvironmentError(
+                "'{}' must be an object in execution quotas file '{}'".format(
+                    section, quotas_path))
+        quota_lists.extend(('{}.{}'.format(section, key), value)
+                           for key, value in quotas.get(section, {}).items())
+    for role in quotas.get('roles', {}):
+        if role not in Role.__members__:
+            raise EnvironmentError(
+                "Unknown role '{}' in execution quotas file '{}'".format(
+                    role, quotas_path))
+    for name, quota in quota_lists:
+        _, errors = ExecutionQuotaSchema().load(quota)
+        if errors:
+            raise EnvironmentError(
+                "Invalid quota '{}' in execution quotas file '{}': {}".format(
+                    name, quotas_path, errors))
+    return quotas
+
+
+def get_user_quota(username: str, role: Role) -> ExecutionQuota:
+    quotas = app.config.get('EXECUTION_QUOTAS') or {}
+    quota = ExecutionQuota(weight=1)
+    for overrides in [
+            quotas.get('default'),
+            quotas.get('roles', {}).get(role.name),
+            quotas.get('users', {}).get(username)
+    ]:
+        if not overrides:
+            continue
+        for key, value in ExecutionQuotaSchema().load(
+                overrides).data.__dict__.items():
+            if value is not None:
+                setattr(quota, key, value)
+    return quota
+
+
+def exceeded_quota(requirements: ResourceRequirements,
+                   quota: ExecutionQuota) -> str:
+    """exceeded_quota describes the limit of `quota` that an execution with
+    `requirements` exceeds on its own, if any. Such an execution could never
+    be started."""
+    if quota.max_running_executions == 0:
+        return "no execution can be run"
+    if quota.cpu_cores is not None and requirements.cpu_cores > quota.cpu_cores:
+        return "the execution requires {} CPU cores, the quota is {}".format(
+            requirements.cpu_cores, quota.cpu_cores)
+    if quota.ram is not None and requirements.ram > quota.ram:
+        return "the execution requires {} GB of RAM, the quota is {}".format(
+            requirements.ram, quota.ram)
+    return None
+
+
+class QuotaUsage():
+    """QuotaUsage sums the resources used by the running executions of a
+    user."""
+
+    def __init__(self):
+        self.running_executions = 0
+        self.cpu_cores = 0
+        self.ram = 0
+
+    def add(self, requirements: ResourceRequirements):
+        self.running_executions += 1
+        self.cpu_cores += requirements.cpu_cores
+        self.ram += requirements.ram
+
+    def admits(self, requirements: ResourceRequirements,
+               quota: ExecutionQuota) -> bool:
+        if (quota.max_running_executions is not None
+                and self.running_executions >= quota.max_running_executions):
+            return False
+        if (quota.cpu_cores is not None
+                and self.cpu_cores + requirements.cpu_cores > quota.cpu_cores):
+            return False
+        if quota.ram is not None and self.ram + requirements.ram > quota.ram:
+            return False
+        return True
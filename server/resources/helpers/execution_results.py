@@ -3,26 +3,172 @@ try:
     from os import scandir, walk
 except ImportError:
     from scandir import scandir, walk
-from typing import List
-from server.resources.helpers.executions import CARMIN_FILES_FOLDER, get_execution_dir
+import glob
+import json
+import logging
+import mimetypes
+from pathlib import PurePath
+from typing import Dict, List
+from flask_restful import request
+from server import app
+from server.resources.helpers.executions import (CARMIN_FILES_FOLDER,
+                                                 get_execution_dir)
+from server.resources.helpers.execution import extract_execution_identifier_from_path
+from server.resources.helpers.pathnames import (OUTPUTS_MANIFEST_FILENAME,
+                                                RETURNED_FILES_FILENAME)
+from server.resources.helpers.checksums import get_checksum, CHECKSUM_ALGORITHMS
 from server.resources.models.error_code_and_message import ErrorCodeAndMessage
+from server.common.error_codes_and_messages import PATH_DOES_NOT_EXIST
 from server.resources.models.path import Path
+from server.resources.models.descriptor.descriptor_abstract import Descriptor
 
 
 def get_output_files(username: str, execution_identifier: str
-                     ) -> (List[str], ErrorCodeAndMessage):
+                     ) -> (List[Path], ErrorCodeAndMessage):
+    """get_output_files returns the files produced by a completed execution,
+    as listed by its outputs manifest. The manifest of executions completed
+    before manifests were written is written on the first call."""
     try:
         execution_dir = get_execution_dir(username, execution_identifier)
     except FileNotFoundError:
         return None, PATH_DOES_NOT_EXIST
 
-    excluded_dirs = [CARMIN_FILES_FOLDER]
-    output_files = list()
+    manifest = read_outputs_manifest(execution_dir)
+    if manifest is None:
+        manifest = write_outputs_manifest(execution_dir)
+    return [output_path(execution_dir, output) for output in manifest], None
+
+
+def write_outputs_manifest(execution_dir: str) -> List[dict]:
+    """write_outputs_manifest lists the files below an execution directory,
+    outside of its CARMIN files folder, with their size, modification time and
+    MIME type, as well as their checksums for the algorithms of
+    `OUTPUTS_MANIFEST_CHECKSUM_ALGORITHMS`. The list is saved to the outputs
+    manifest of the execution, and returned. Symbolic links are listed as the
+    files they point to."""
+    algorithms = [
+        a for a in app.config.get('OUTPUTS_MANIFEST_CHECKSUM_ALGORITHMS', [])
+        if a in CHECKSUM_ALGORITHMS
+    ]
+    manifest = []
     for root, dirs, files in walk(execution_dir):
-        dirs[:] = [d for d in dirs if d not in CARMIN_FILES_FOLDER]
+        dirs[:] = [d for d in dirs if d != CARMIN_FILES_FOLDER]
 
         for f in files:
             real_path = os.path.realpath(os.path.join(root, f))
-            output_files.append(Path.object_from_pathname(real_path))
+            try:
+                st = os.stat(real_path)
+            except OSError:
+                continue
+            mime_type, _ = mimetypes.guess_type(real_path)
+            output = {
+                "path":
+                PurePath(os.path.relpath(real_path, execution_dir)).as_posix(),
+                "size": st.st_size,
+                "mtime": st.st_mtime,
+                "mimeType": mime_type
+            }
+            if algorithms:
+                output["checksums"] = {
+                    algorithm: get_checksum(real_path, algorithm)
+                    for algorithm in algorithms
+                }
+            manifest.append(output)
+
+    manifest_path = os.path.join(execution_dir, CARMIN_FILES_FOLDER,
+                                 OUTPUTS_MANIFEST_FILENAME)
+    try:
+        with open(manifest_path + '.tmp', 'w') as f:
+            json.dump(manifest, f)
+        os.replace(manifest_path + '.tmp', manifest_path)
+    except OSError:
+        # The outputs will be listed again on the next call
+        logger = logging.getLogger('server-error')
+        logger.exception("Could not write {}".format(manifest_path))
+    return manifest
+
+
+def read_outputs_manifest(execution_dir: str) -> List[dict]:
+    """read_outputs_manifest returns the outputs manifest of an execution, or
+    None if it was not written."""
+    manifest_path = os.path.join(execution_dir, CARMIN_FILES_FOLDER,
+                                 OUTPUTS_MANIFEST_FILENAME)
+    try:
+        with open(manifest_path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def output_path(execution_dir: str, output: dict) -> Path:
+    """output_path returns the Path of a file of an outputs manifest, without
+    querying the file system."""
+    absolute_path = os.path.normpath(
+        os.path.join(execution_dir, output["path"]))
+    rel_path = PurePath(
+        os.path.relpath(absolute_path,
+                        app.config['DATA_DIRECTORY'])).as_posix()
+    return Path(platform_path='{}path/{}'.format(request.url_root, rel_path),
+                last_modification_date=output["mtime"],
+                is_directory=False,
+                size=output["size"],
+                mime_type=output["mimeType"],
+                execution_id=extract_execution_identifier_from_path(
+                    absolute_path, False))
+
 
-    return output_files, None
+def write_returned_files(execution_dir: str, descriptor: Descriptor,
+                         descriptor_path: str,
+                         inputs_path: str) -> Dict[str, List[str]]:
+    """write_returned_files resolves the output files of a completed
+    execution, with the path patterns of the output parameters of its
+    descriptor, and saves the files that exist, relative to the data
+    directory, by output parameter id."""
+    data_directory = os.path.realpath(app.config['DATA_DIRECTORY'])
+    returned_files = {}
+    for output_id, path in descriptor.output_paths(descriptor_path,
+                                                   inputs_path).items():
+        files = []
+        for output_file in sorted(glob.glob(os.path.join(execution_dir,
+                                                         path))):
+            output_file = os.path.realpath(output_file)
+            if (os.path.isfile(output_file) and os.path.commonpath(
+                [output_file, data_directory]) == data_directory):
+                files.append(
+                    PurePath(os.path.relpath(output_file,
+                                             data_directory)).as_posix())
+        returned_files[output_id] = files
+
+    returned_files_path = os.path.join(execution_dir, CARMIN_FILES_FOLDER,
+                                       RETURNED_FILES_FILENAME)
+    with open(returned_files_path, 'w') as f:
+        json.dump(returned_files, f)
+    return returned_files
+
+
+def get_returned_files(username: str, execution_identifier: str
+                       ) -> (Dict[str, List[str]], ErrorCodeAndMessage):
+    """get_returned_files returns the URLs of the output files of a completed
+    execution, by output parameter id. For executions completed before their
+    output files were resolved, all the output files are returned as a
+    list."""
+    try:
+        execution_dir = get_execution_dir(username, execution_identifier)
+    except FileNotFoundError:
+        return None, PATH_DOES_NOT_EXIST
+
+    try:
+        with open(
+                os.path.join(execution_dir, CARMIN_FILES_FOLDER,
+                             RETURNED_FILES_FILENAME)) as f:
+            returned_files = json.load(f)
+    except (OSError, ValueError):
+        output_files, error = get_output_files(username, execution_identifier)
+        return [output.platform_path for output in output_files or []], error
+    return {
+        output_id: [
+            '{}path/{}'.format(request.url_root, rel_path)
+            for rel_path in files
+        ]
+        for output_id, files in returned_files.items()
+    }, None
@@ -0,0 +1,291 @@
+import time
+import logging
+import threading
+from collections import OrderedDict, defaultdict, deque
+from typing import Dict, List, Tuple
+from server import app
+from server.database import db
+from server.database.models.user import User
+from server.database.models.execution import (Execution, ExecutionStatus,
+                                              current_milli_time)
+from server.database.models.execution_queue_entry import ExecutionQueueEntry
+from server.database.queries.executions import (
+    get_execution_resources, get_queued_executions, get_running_executions,
+    get_running_execution_count, claim_execution, cancel_execution)
+from server.common.error_codes_and_messages import (
+    ErrorCodeAndMessageFormatter, EXECUTION_EXCEEDS_QUOTA,
+    EXECUTION_EXCEEDS_HOST_CAPACITY)
+from server.resources.helpers.execution_supervisor import (
+    EXECUTION_SUPERVISOR, execution_completed)
+from server.resources.helpers.execution_status import status_changed
+from server.resources.helpers.execution_quotas import (get_user_quota,
+                                                       exceeded_quota,
+                                                       QuotaUsage)
+from server.resources.helpers.execution_admission import (
+    get_execution_requirements, get_host_capacity, exceeded_capacity,
+    max_duration, Backfill)
+from server.resources.models.error_code_and_message import ErrorCodeAndMessage
+from server.resources.models.execution_quota import ExecutionQuota
+from server.resources.models.descriptor.descriptor_abstract import ResourceRequirements
+
+QUEUE_POLICIES = ['fifo', 'priority']
+
+
+class QueuedExecution():
+    """QueuedExecution is a queue entry, with what the scheduler needs to know
+    to start it."""
+
+    def __init__(self, queue_entry: ExecutionQueueEntry, username: str,
+                 requirements: ResourceRequirements, duration: float):
+        self.queue_entry = queue_entry
+        self.username = username
+        self.requirements = requirements
+        self.duration = duration
+
+
+class ExecutionScheduler():
+    """ExecutionScheduler decides when the queued executions start. Started
+    executions are handed to the execution supervisor, which runs them on the
+    execution backend and watches them until they are complete.
+
+    Playing an execution only queues it, with the `Ready` status. The queue is
+    stored in the database, so that queued executions survive a restart of
+    the server. Whenever an execution completes, the next executions are claimed
+    from the queue, as long as fewer than `MAX_CONCURRENT_EXECUTIONS`
+    executions are running.
+
+    Users share the workers fairly: see `fair_share_order`. Each user only
+    runs executions within their quota, and executions only start if the CPU
+    cores and RAM suggested by their descriptor are free on the host: see
+    `Backfill`. An execution that exceeds the quota or the host on its own is
+    rejected when it is played.
+
+    The queue is checked when an execution is queued, when one completes, and
+    every `EXECUTION_SCHEDULER_POLL_INTERVAL` seconds. In testing mode, no
+    thread is started and executions run inline, as soon as they are queued.
+    """
+
+    def __init__(self):
+        self._dispatch_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        execution_completed.connect(self._execution_completed, weak=False)
+
+    def start(self):
+        if self._thread:
+            return
+        EXECUTION_SUPERVISOR.start()
+        self._thread = threading.Thread(target=self._dispatch_loop,
+                                        name='execution-scheduler',
+                                        daemon=True)
+        self._thread.start()
+
+    def submit(self,
+               execution_db: Execution,
+               user: User,
+               priority: int = 0) -> ErrorCodeAndMessage:
+        """submit queues an `Initializing` execution, marking it as `Ready`.
+        If the execution exceeds the quota of the user or the capacity of the
+        host, it is marked as `InitializationFailed` instead, and the error is
+        returned."""
+        requirements = get_execution_requirements(
+            execution_db,
+            get_execution_resources(execution_db.identifier, db.session))
+        return self.submit_all([(execution_db, requirements)], user,
+                               priority)[0]
+
+    def submit_all(self,
+                   executions: List[Tuple[Execution, ResourceRequirements]],
+                   user: User,
+                   priority: int = 0) -> List[ErrorCodeAndMessage]:
+        """submit_all submits several executions of a user, with their
+        requirements, in a single transaction, and returns the error of each
+        of them."""
+        quota = get_user_quota(user.username, user.role)
+        capacity = get_host_capacity()
+        errors = []
+        for execution_db, requirements in executions:
+            error = None
+            exceeded = exceeded_quota(requirements, quota)
+            if exceeded:
+                error = ErrorCodeAndMessageFormatter(EXECUTION_EXCEEDS_QUOTA,
+                                                     user.username, exceeded)
+            exceeded = exceeded_capacity(requirements, capacity)
+            if exceeded and not error:
+                error = ErrorCodeAndMessageFormatter(
+                    EXECUTION_EXCEEDS_HOST_CAPACITY, exceeded)
+            errors.append(error)
+            if error:
+                execution_db.status = ExecutionStatus.InitializationFailed
+                execution_db.error_code = error.error_code
+                execution_db.end_date = current_milli_time()
+                continue
+
+            execution_db.status = ExecutionStatus.Ready
+            db.session.add(
+                ExecutionQueueEntry(
+                    execution_identifier=execution_db.identifier,
+                    priority=priority))
+        db.session.commit()
+        for execution_db, _ in executions:
+            status_changed(execution_db.identifier, execution_db.status)
+        self.notify()
+        return errors
+
+    def cancel(self, execution_db: Execution) -> bool:
+        """cancel removes a `Ready` execution from the queue and marks it as
+        killed. It returns False if the execution was started in the
+        meantime, in which case its job must be killed instead."""
+        if not cancel_execution(execution_db.identifier, db.session):
+            return False
+        status_changed(execution_db.identifier, ExecutionStatus.Killed)
+        return True
+
+    def notify(self):
+        """notify asks the scheduler to check the queue for executions to
+        start."""
+        if app.config.get('TESTING'):
+            self.dispatch()
+        else:
+            self._wakeup.set()
+
+    def dispatch(self):
+        with self._dispatch_lock:
+            while True:
+                free_slots = (app.config['MAX_CONCURRENT_EXECUTIONS'] -
+                              get_running_execution_count(db.session))
+                if free_slots <= 0:
+                    return
+                queues, usages, quotas, running = self._queue_state()
+                backfill = Backfill(get_host_capacity(), running, time.time())
+                started = 0
+                for queued in fair_share_order(queues,
+                                               usages,
+                                               quotas,
+                                               admit=True):
+                    if started == free_slots:
+                        break
+                    if not backfill.admit(queued.requirements,
+                                          queued.duration):
+                        continue
+                    identifier = queued.queue_entry.execution_identifier
+                    if claim_execution(identifier, db.session):
+                        status_changed(identifier, ExecutionStatus.Running)
+                        usages[queued.username].add(queued.requirements)
+                        started += 1
+                        self._start(identifier)
+                if not started:
+                    return
+
+    def queue_position(self, execution_identifier: str) -> int:
+        """queue_position returns the 1-based position of a queued execution
+        in the order in which the queue would be emptied, ignoring quotas and
+        the resources of the host, or None if the execution is not queued."""
+        return self.queue_positions().get(execution_identifier)
+
+    def queue_positions(self) -> Dict[str, int]:
+        """queue_positions returns the queue positions of all the queued
+        executions, by execution identifier."""
+        queues, usages, quotas, _ = self._queue_state()
+        positions = {}
+        for position, queued in enumerate(
+                fair_share_order(queues, usages, quotas, admit=False), 1):
+            positions[queued.queue_entry.execution_identifier] = position
+            usages[queued.username].add(queued.requirements)
+        return positions
+
+    def _queue_state(self):
+        """_queue_state loads the queues of all users, the resources used by
+        their running executions and their quotas, as well as the expected
+        completion times of the running executions."""
+        by_priority = app.config.get('EXECUTION_QUEUE_POLICY') == 'priority'
+        queues = OrderedDict()
+        quotas = {}
+        for queue_entry, execution_db, role, resources_db in (
+                get_queued_executions(by_priority, db.session)):
+            username = execution_db.creator_username
+            if username not in quotas:
+                quotas[username] = get_user_quota(username, role)
+                queues[username] = []
+            requirements = get_execution_requirements(execution_db,
+                                                      resources_db)
+            queues[username].append(
+                QueuedExecution(queue_entry, username, requirements,
+                                max_duration(execution_db, requirements)))
+
+        usages = defaultdict(QuotaUsage)
+        running = []
+        for execution_db, resources_db in get_running_executions(db.session):
+            requirements = get_execution_requirements(execution_db,
+                                                      resources_db)
+            usages[execution_db.creator_username].add(requirements)
+            start_time = (execution_db.start_date
+                          or current_milli_time()) / 1000
+            running.append(
+                (start_time + max_duration(execution_db, requirements),
+                 requirements))
+        return queues, usages, quotas, running
+
+    def _start(self, execution_identifier: str):
+        EXECUTION_SUPERVISOR.supervise(execution_identifier)
+
+    def _execution_completed(self, sender, execution_identifier: str):
+        # In testing mode, executions complete during `dispatch`, which then
+        # checks the queue again: the dispatch loop must not be called here.
+        self._wakeup.set()
+
+    def _dispatch_loop(self):
+        while True:
+            self._wakeup.wait(app.config['EXECUTION_SCHEDULER_POLL_INTERVAL'])
+            self._wakeup.clear()
+            with app.app_context():
+                try:
+                    self.dispatch()
+                except Exception:
+                    logger = logging.getLogger('server-error')
+                    logger.exception("Could not dispatch queued executions")
+                finally:
+                    db.session.remove()
+
+
+def fair_share_order(queues: Dict[str, List[QueuedExecution]],
+                     usages: Dict[str, QuotaUsage],
+                     quotas: Dict[str, ExecutionQuota], admit: bool):
+    """fair_share_order yields the queued executions in the order they should
+    be started. The caller adds the requirements of the executions it starts
+    to `usages`.
+
+    Each user has their own queue, sorted by the queue policy. The next
+    execution is taken from the user with the fewest running executions
+    relative to the weight of their quota, which is a weighted round-robin
+    when all users are waiting. Ties go to the highest priority when the
+    queue policy is 'priority', then to the oldest execution.
+
+    If `admit` is set, a user whose next execution does not fit in their
+    quota gets no more turns."""
+    by_priority = app.config.get('EXECUTION_QUEUE_POLICY') == 'priority'
+    queues = {
+        username: deque(queue)
+        for username, queue in queues.items() if queue
+    }
+
+    def turn_order(username):
+        queue_entry = queues[username][0].queue_entry
+        return (usages[username].running_executions / quotas[username].weight,
+                -queue_entry.priority if by_priority else 0,
+                queue_entry.queued_at)
+
+    while queues:
+        username = min(queues, key=turn_order)
+        queued = queues[username][0]
+        if admit and not usages[username].admits(queued.requirements,
+                                                 quotas[username]):
+            del queues[username]
+            continue
+        queues[username].popleft()
+        if not queues[username]:
+            del queues[username]
+        yield queued
+
+
+EXECUTION_SCHEDULER = ExecutionScheduler()
@@ -0,0 +1,88 @@
+import time
+import threading
+from typing import List
+from blinker import Namespace
+from server import app
+from server.database import db
+from server.database.models.execution import ExecutionStatus
+from server.resources.models.execution import EXECUTION_COMPLETED_STATUSES
+from server.database.queries.executions import get_execution_status
+
+execution_signals = Namespace()
+
+# Sent with the execution identifier and its new status once a status change
+# is committed.
+execution_status_changed = execution_signals.signal('execution-status-changed')
+
+# Statuses after which the status of an execution no longer changes
+FINAL_STATUSES = EXECUTION_COMPLETED_STATUSES + [
+    ExecutionStatus.InitializationFailed
+]
+
+
+def status_changed(execution_identifier: str, status: ExecutionStatus):
+    execution_status_changed.send(None,
+                                  execution_identifier=execution_identifier,
+                                  status=status)
+
+
+def current_status(execution_identifier: str) -> ExecutionStatus:
+    """current_status reads the status of an execution from the database, and
+    ends the transaction, so that the next read sees the status committed in
+    the meantime."""
+    status = get_execution_status(execution_identifier, db.session)
+    db.session.commit()
+    return status
+
+
+class ExecutionStatusWatcher():
+    """ExecutionStatusWatcher lets requests wait for the status of an
+    execution to change, instead of clients polling for it.
+
+    Waiters are woken up by `execution_status_changed`, sent by this server
+    process. The status is also read again every
+    `EXECUTION_SCHEDULER_POLL_INTERVAL` seconds, so that changes made by
+    other server processes are noticed.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._waiters = {}
+        execution_status_changed.connect(self._status_changed, weak=False)
+
+    def wait(self, execution_identifier: str, statuses: List[ExecutionStatus],
+             timeout: float) -> ExecutionStatus:
+        """wait returns the status of an execution as soon as it is one of
+        `statuses`, or a final status, or after `timeout` seconds."""
+        deadline = time.monotonic() + timeout
+        event = threading.Event()
+        with self._lock:
+            self._waiters.setdefault(execution_identifier, set()).add(event)
+        try:
+            while True:
+                status = current_status(execution_identifier)
+                if (status is None or status in statuses
+                        or status in FINAL_STATUSES):
+                    return status
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return status
+                event.wait(
+                    min(remaining,
+                        app.config['EXECUTION_SCHEDULER_POLL_INTERVAL']))
+                event.clear()
+        finally:
+            with self._lock:
+                waiters = self._waiters[execution_identifier]
+                waiters.discard(event)
+                if not waiters:
+                    del self._waiters[execution_identifier]
+
+    def _status_changed(self, sender, execution_identifier: str,
+                        status: ExecutionStatus):
+        with self._lock:
+            for event in self._waiters.get(execution_identifier, ()):
+                event.set()
+
+
+EXECUTION_STATUS_WATCHER = ExecutionStatusWatcher()
@@ -0,0 +1,235 @@
+import os
+import time
+import heapq
+import logging
+import selectors
+import threading
+from server import app
+from server.database import db
+from server.database.models.execution import current_milli_time
+from server.database.queries.executions import get_execution
+from server.database.queries.execution_jobs import get_execution_job
+from server.resources.helpers.execution_play import (
+    create_execution_job, finish_execution_job, get_execution_timeout)
+from server.resources.models.backend.backend_abstract import Backend
+from server.resources.helpers.execution_status import execution_signals
+
+# Sent with the execution identifier once an execution started by the
+# supervisor is complete, and its status updated.
+execution_completed = execution_signals.signal('execution-completed')
+
+# Maximum delay, in seconds, between two iterations of the supervisor loop
+MAX_TICK = 60
+
+
+class SupervisedJob():
+    """SupervisedJob is a running job, as watched by the supervisor.
+
+    Attributes:
+        execution_identifier (str):
+        backend (Backend):
+        deadline (float): Monotonic time at which the job times out, or None.
+        fd (int): File descriptor readable once the job is complete, or None
+        if the job is polled.
+        next_poll (float): Monotonic time of the next poll of the job.
+        timed_out (bool): Whether the job was killed because it timed out.
+    """
+
+    def __init__(self, execution_identifier: str, backend: Backend,
+                 deadline: float, fd: int):
+        self.execution_identifier = execution_identifier
+        self.backend = backend
+        self.deadline = deadline
+        self.fd = fd
+        self.next_poll = time.monotonic()
+        self.timed_out = False
+
+
+class ExecutionSupervisor():
+    """ExecutionSupervisor starts the jobs of the executions on their backend
+    and watches all of them from a single thread, instead of a thread waiting
+    for each job.
+
+    Jobs that provide a completion file descriptor, such as the pidfd of a
+    local process, are watched with a selector. Other jobs are polled every
+    `poll_interval` of their backend. Timeouts are kept in a heap, ordered by
+    deadline, so that the loop sleeps until the next deadline at most. When a
+    job is complete, the status of its execution is updated and
+    `execution_completed` is sent.
+
+    In testing mode, no thread is started and `supervise` only returns once
+    the execution is complete.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._jobs = {}
+        self._timers = []
+        self._added = []
+        self._selector = selectors.DefaultSelector()
+        self._wakeup_read, self._wakeup_write = os.pipe()
+        os.set_blocking(self._wakeup_read, False)
+        self._selector.register(self._wakeup_read, selectors.EVENT_READ)
+        self._thread = None
+
+    def start(self):
+        if self._thread:
+            return
+        self._thread = threading.Thread(target=self._loop,
+                                        name='execution-supervisor',
+                                        daemon=True)
+        self._thread.start()
+
+    def supervise(self, execution_identifier: str):
+        """supervise starts the job of an execution claimed by the execution
+        scheduler, and watches it until it is complete."""
+        execution_db = get_execution(execution_identifier, db.session)
+        timeout = get_execution_timeout(execution_db)
+        job = None
+        try:
+            job = create_execution_job(execution_identifier)
+            backend = Backend.backend_factory_from_name(job.backend)
+            backend.start(job)
+            fd = backend.completion_fd(job)
+        except Exception:  # Any issue starting the execution
+            logger = logging.getLogger('server-error')
+            logger.exception("Could not start execution {}".format(
+                execution_identifier))
+            if job and job.job_identifier:
+                backend.kill(job)
+            self._complete(execution_identifier, None)
+            return
+
+        self._watch(
+            SupervisedJob(execution_identifier, backend,
+                          time.monotonic() + timeout if timeout else None,
+                          fd))
+
+    def adopt(self, execution_identifier: str):
+        """adopt watches the job of an execution started by a previous run of
+        the server, on a backend whose jobs survive the restart of the server,
+        until it is complete. The execution keeps its original deadline."""
+        execution_db = get_execution(execution_identifier, db.session)
+        job = get_execution_job(execution_identifier, db.session)
+        backend = Backend.backend_factory_from_name(job.backend)
+        timeout = get_execution_timeout(execution_db)
+        deadline = None
+        if timeout:
+            started = (execution_db.start_date or current_milli_time()) / 1000
+            deadline = time.monotonic() + max(0,
+                                              started + timeout - time.time())
+        self._watch(
+            SupervisedJob(execution_identifier, backend, deadline,
+                          backend.completion_fd(job)))
+
+    def _watch(self, supervised_job: SupervisedJob):
+        with self._lock:
+            self._added.append(supervised_job)
+        os.write(self._wakeup_write, b'\0')
+
+        if app.config.get('TESTING'):
+            while (supervised_job in self._added or
+                   supervised_job.execution_identifier in self._jobs):
+                self._tick()
+
+    def _loop(self):
+        while True:
+            with app.app_context():
+                try:
+                    self._tick()
+                except Exception:
+                    logger = logging.getLogger('server-error')
+                    logger.exception("Could not supervise the executions")
+                finally:
+                    db.session.remove()
+
+    def _tick(self):
+        """_tick waits for the next job completion, poll or deadline, and
+        handles it."""
+        with self._lock:
+            added, self._added = self._added, []
+        for supervised_job in added:
+            self._jobs[supervised_job.execution_identifier] = supervised_job
+            if supervised_job.deadline:
+                heapq.heappush(self._timers,
+                               (supervised_job.deadline,
+                                supervised_job.execution_identifier))
+            if supervised_job.fd is not None:
+                self._selector.register(supervised_job.fd,
+                                        selectors.EVENT_READ,
+                                        supervised_job.execution_identifier)
+
+        now = time.monotonic()
+        wakeups = [now + MAX_TICK]
+        wakeups.extend(j.next_poll for j in self._jobs.values()
+                       if j.fd is None)
+        if self._timers:
+            wakeups.append(self._timers[0][0])
+        ready = set()
+        for key, _ in self._selector.select(max(0, min(wakeups) - now)):
+            if key.fileobj == self._wakeup_read:
+                while True:
+                    try:
+                        os.read(self._wakeup_read, 4096)
+                    except BlockingIOError:
+                        break
+            else:
+                ready.add(key.data)
+
+        now = time.monotonic()
+        for execution_identifier, supervised_job in list(self._jobs.items()):
+            if supervised_job.fd is None and supervised_job.next_poll <= now:
+                supervised_job.next_poll = (
+                    now + supervised_job.backend.poll_interval())
+                ready.add(execution_identifier)
+        for execution_identifier in ready:
+            self._poll(execution_identifier)
+
+        while self._timers and self._timers[0][0] <= now:
+            _, execution_identifier = heapq.heappop(self._timers)
+            supervised_job = self._jobs.get(execution_identifier)
+            if supervised_job and not supervised_job.timed_out:
+                supervised_job.timed_out = True
+                supervised_job.backend.kill(
+                    get_execution_job(execution_identifier, db.session))
+                # Check the job again as soon as the kill is effective
+                supervised_job.next_poll = now
+
+    def _poll(self, execution_identifier: str):
+        supervised_job = self._jobs[execution_identifier]
+        try:
+            exit_code = supervised_job.backend.poll(
+                get_execution_job(execution_identifier, db.session))
+        except Exception:
+            logger = logging.getLogger('server-error')
+            logger.exception("Execution {} failed to run".format(
+                execution_identifier))
+            exit_code = None
+        else:
+            if exit_code is None:
+                return
+
+        del self._jobs[execution_identifier]
+        if supervised_job.fd is not None:
+            self._selector.unregister(supervised_job.fd)
+            os.close(supervised_job.fd)
+        self._complete(execution_identifier, exit_code,
+                       supervised_job.timed_out)
+
+    def _complete(self,
+                  execution_identifier: str,
+                  exit_code: int,
+                  timed_out: bool = False):
+        try:
+            finish_execution_job(execution_identifier, exit_code, timed_out)
+        except Exception:
+            # Most probably, the execution was deleted while it was completing
+            logger = logging.getLogger('server-error')
+            logger.exception("Could not complete execution {}".format(
+                execution_identifier))
+            db.session.rollback()
+        execution_completed.send(self,
+                                 execution_identifier=execution_identifier)
+
+
+EXECUTION_SUPERVISOR = ExecutionSupervisor()
@@ -1,12 +1,17 @@
 import os
 import json
+import base64
+import binascii
 import shutil
 import tempfile
 from boutiques import bosh
-from typing import Dict
+from typing import Dict, List, Tuple
 from server import app
+from server.database import db
 from server.database.models.user import User, Role
 from server.database.models.execution import Execution as ExecutionDB
+from server.database.models.execution_inputs import ExecutionInputs
+from server.database.queries.executions import get_executions_inputs
 from server.platform_properties import PLATFORM_PROPERTIES
 from server.resources.models.error_code_and_message import ErrorCodeAndMessage
 from server.resources.models.pipeline import Pipeline, PipelineSchema
@@ -15,12 +20,18 @@ from server.common.error_codes_and_messages import (
     INVALID_PIPELINE_IDENTIFIER, EXECUTION_IDENTIFIER_MUST_NOT_BE_SET,
     INVALID_QUERY_PARAMETER, INVALID_EXECUTION_TIMEOUT, PATH_DOES_NOT_EXIST,
     UNEXPECTED_ERROR, ErrorCodeAndMessageFormatter)
-from server.resources.models.execution import Execution, EXECUTION_COMPLETED_STATUSES
+from server.resources.models.execution import (
+    Execution, ExecutionSchema, ExecutionStatus, EXECUTION_COMPLETED_STATUSES)
 from server.resources.helpers.pipelines import get_pipeline
+from server.resources.helpers.directory_size import DIRECTORY_SIZE_INDEX
 from server.resources.helpers.pathnames import (
     INPUTS_FILENAME, EXECUTIONS_DIRNAME, DESCRIPTOR_FILENAME,
     CARMIN_FILES_FOLDER, STDOUT_FILENAME, STDERR_FILENAME)
 
+# Attributes of the executions that are costly to compute, returned in lists
+# of executions only when they are requested
+EXPANDABLE_FIELDS = ['returned_files', 'queue_position']
+
 
 def create_user_executions_dir(username: str):
     user_execution_dir = os.path.join(
@@ -53,6 +64,7 @@ def create_execution_directory(execution: ExecutionDB, user: User
 
 def delete_execution_directory(execution_dir_path: str):
     shutil.rmtree(execution_dir_path, ignore_errors=True)
+    DIRECTORY_SIZE_INDEX.invalidate(execution_dir_path)
 
 
 def get_execution_dir(username: str, execution_identifier: str) -> str:
@@ -84,6 +96,14 @@ def write_inputs_to_file(execution: Execution,
         return UNEXPECTED_ERROR
 
 
+def record_execution_inputs(execution_identifier: str, input_values: Dict):
+    """record_execution_inputs stores the input values of a new execution in
+    the database. The session is committed by the caller."""
+    db.session.add(
+        ExecutionInputs(execution_identifier=execution_identifier,
+                        input_values=json.dumps(input_values)))
+
+
 def write_absolute_path_inputs_to_file(
         username: str, execution_identifier: str,
         input_values: Dict) -> (str, ErrorCodeAndMessage):
@@ -124,7 +144,9 @@ def input_files_exist(input_values: Dict, pipeline: Pipeline,
 
 def create_absolute_path_inputs(username: str, execution_identifier: str,
                                 pipeline_identifier: str,
-                                url_root: str) -> (str, ErrorCodeAndMessage):
+                                url_root: str) -> (Dict, ErrorCodeAndMessage):
+    """create_absolute_path_inputs writes the inputs of an execution with the
+    paths of their files in the data directory, and returns them."""
     input_values, error = load_inputs(username, execution_identifier)
     if error:
         return None, error
@@ -133,17 +155,26 @@ def create_absolute_path_inputs(username: str, execution_identifier: str,
     if not pipeline:
         return None, INVALID_PIPELINE_IDENTIFIER
 
+    input_values = absolute_path_inputs(input_values, pipeline, url_root)
+    _, error = write_absolute_path_inputs_to_file(username,
+                                                  execution_identifier,
+                                                  input_values)
+    if error:
+        return None, error
+    return input_values, None
+
+
+def absolute_path_inputs(input_values: Dict, pipeline: Pipeline,
+                         url_root: str) -> Dict:
+    """absolute_path_inputs replaces the platform URLs of the input files in
+    `input_values` by their paths in the data directory."""
+    input_values = dict(input_values)
     for key in input_values:
         for parameter in pipeline.parameters:
             if parameter.parameter_type == "File" and not parameter.is_returned_value and parameter.identifier == key:
                 input_values[key] = path_from_data_dir(url_root,
                                                        input_values[key])
-
-    path, error = write_absolute_path_inputs_to_file(
-        username, execution_identifier, input_values)
-    if error:
-        return None, error
-    return path, None
+    return input_values
 
 
 def load_inputs(username: str,
@@ -169,26 +200,73 @@ def get_execution_as_model(username: str,
                            execution_db) -> (Execution, ErrorCodeAndMessage):
     if not execution_db:
         return None, INVALID_MODEL_PROVIDED
-    inputs, error = load_inputs(username, execution_db.identifier)
-    if error:
-        inputs = {"error": "Error retrieving inputs for execution."}
-    dummy_exec = Execution()
-    execution_kwargs = {
-        prop: execution_db.__dict__[prop]
-        for prop in dummy_exec.__dict__.keys() if prop in execution_db.__dict__
+    return get_executions_as_models(username, [execution_db])[0], None
+
+
+def get_executions_as_models(username: str,
+                             executions_db: List[ExecutionDB],
+                             fields: List[str] = None) -> List[Execution]:
+    """get_executions_as_models converts executions of a user from the
+    database to models, with only the given attributes set, or all of them if
+    `fields` is None. Input values are read from the database, in a single
+    query, or from the inputs file of executions created before they were
+    recorded."""
+    if fields is None:
+        fields = list(Execution().__dict__.keys())
+    inputs = {}
+    if 'input_values' in fields and executions_db:
+        inputs = {
+            execution_inputs.execution_identifier:
+            json.loads(execution_inputs.input_values)
+            for execution_inputs in get_executions_inputs(
+                [e.identifier for e in executions_db], db.session)
+        }
+    queue_positions = {}
+    if 'queue_position' in fields and any(
+            e.status == ExecutionStatus.Ready for e in executions_db):
+        from server.resources.helpers.execution_scheduler import EXECUTION_SCHEDULER
+        queue_positions = EXECUTION_SCHEDULER.queue_positions()
+
+    executions = []
+    for execution_db in executions_db:
+        exe = Execution(
+            **{
+                prop: execution_db.__dict__[prop]
+                for prop in fields if prop in execution_db.__dict__
+            })
+        if 'input_values' in fields:
+            exe.input_values = inputs.get(execution_db.identifier)
+            if exe.input_values is None:
+                exe.input_values, error = load_inputs(username,
+                                                      exe.identifier)
+                if error:
+                    exe.input_values = {
+                        "error": "Error retrieving inputs for execution."
+                    }
+        exe.queue_position = queue_positions.get(execution_db.identifier)
+        if ('returned_files' in fields
+                and execution_db.status in EXECUTION_COMPLETED_STATUSES):
+            from server.resources.helpers.execution_results import get_returned_files
+            exe.returned_files, _ = get_returned_files(username,
+                                                       exe.identifier)
+        executions.append(exe)
+    return executions
+
+
+def execution_fields(names: str) -> List[str]:
+    """execution_fields converts a comma-separated list of execution fields,
+    as named in the API, to the attributes of `Execution`. It raises a
+    ValueError if a field is unknown."""
+    attributes = {
+        field.dump_to or attribute: attribute
+        for attribute, field in ExecutionSchema().fields.items()
     }
-    exe = Execution(input_values=inputs, **execution_kwargs)
-    if exe.status in EXECUTION_COMPLETED_STATUSES:
-        """This implementation does not currently respect the current
-        (0.3) API specification. It simply returns a list of output files that
-        were generated from the execution."""
-        from server.resources.helpers.execution_results import get_output_files
-        output_files = get_output_files(username, exe.identifier)
-        path_list = []
-        for output in output_files:
-            path_list.append(output.platform_path)
-        exe.returned_files = path_list
-    return exe, None
+    fields = []
+    for name in names.split(','):
+        if name not in attributes:
+            raise ValueError
+        fields.append(attributes[name])
+    return fields
 
 
 def validate_request_model(model: Execution,
@@ -205,19 +283,24 @@ def validate_request_model(model: Execution,
             INVALID_INPUT_FILE, error)
         return False, error_code_and_message
 
-    # Timeout validation
+    error = validate_execution_timeout(model.timeout)
+    if error:
+        return False, error
+    return True, None
+
+
+def validate_execution_timeout(timeout: int) -> ErrorCodeAndMessage:
     min_authorized_execution_timeout = PLATFORM_PROPERTIES.get(
         "minAuthorizedExecutionTimeout", 0)
     max_authorized_execution_timeout = PLATFORM_PROPERTIES.get(
         "maxAuthorizedExecutionTimeout", 0)
-    if model.timeout and ((max_authorized_execution_timeout > 0 and
-                           model.timeout > max_authorized_execution_timeout) or
-                          (model.timeout < min_authorized_execution_timeout)):
-        error_code_and_message = ErrorCodeAndMessageFormatter(
+    if timeout and ((max_authorized_execution_timeout > 0
+                     and timeout > max_authorized_execution_timeout) or
+                    (timeout < min_authorized_execution_timeout)):
+        return ErrorCodeAndMessageFormatter(
             INVALID_EXECUTION_TIMEOUT, min_authorized_execution_timeout,
             max_authorized_execution_timeout or "(no maximum timeout)")
-        return False, error_code_and_message
-    return True, None
+    return None
 
 
 def query_converter(value):
@@ -227,6 +310,29 @@ def query_converter(value):
     return converted_value
 
 
+def encode_cursor(execution_db: ExecutionDB) -> str:
+    """encode_cursor returns the opaque token of the page of executions that
+    follows `execution_db`."""
+    return base64.urlsafe_b64encode(
+        json.dumps([execution_db.created_at,
+                    execution_db.identifier]).encode()).decode()
+
+
+def cursor_converter(value: str) -> Tuple[int, str]:
+    try:
+        created_at, identifier = json.loads(
+            base64.urlsafe_b64decode(value.encode()).decode())
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError):
+        raise ValueError
+    if not isinstance(created_at, int) or not isinstance(identifier, str):
+        raise ValueError
+    return created_at, identifier
+
+
+def statuses_converter(value: str) -> List[ExecutionStatus]:
+    return [ExecutionStatus(status) for status in value.split(',')]
+
+
 def copy_descriptor_to_execution_dir(execution_path,
                                      descriptor_path) -> ErrorCodeAndMessage:
     if not os.path.exists(descriptor_path):
@@ -254,17 +360,6 @@ def std_file_path(username: str, execution_identifier: str,
         execution_identifier, CARMIN_FILES_FOLDER, filename)
 
 
-def get_std_file(username: str, execution_identifier: str,
-                 filename: str) -> (str, ErrorCodeAndMessage):
-    file_path = std_file_path(username, execution_identifier, filename)
-
-    try:
-        with open(file_path) as f:
-            return f.read(), None
-    except OSError:
-        return None, PATH_DOES_NOT_EXIST
-
-
 def is_safe_for_get(user: User, execution_db: ExecutionDB):
     if user.role == Role.admin:
         return True
@@ -1,51 +1,118 @@
 import os
-import tarfile
-import tempfile
+try:
+    from os import scandir
+except ImportError:
+    from scandir import scandir
+import heapq
 import zipfile
-import mimetypes
+import re
+import uuid
 import hashlib
-import base64
-from typing import List
+import binascii
+from itertools import islice
+from contextlib import closing
+from typing import Iterator, List
 from binascii import Error
-from flask import Response, make_response, send_file
+from flask import Response, make_response
 from server import app
 from server.resources.models.upload_data import UploadData
 from server.resources.models.error_code_and_message import ErrorCodeAndMessage
 from server.database.models.user import User, Role
 from server.resources.models.path import Path, PathSchema
 from server.resources.models.path_md5 import PathMD5
+from server.resources.helpers.content import (get_directory_content,
+                                              get_file_content)
+from server.resources.helpers.checksums import (get_checksum,
+                                                precompute_checksums)
+from server.resources.helpers.directory_size import DIRECTORY_SIZE_INDEX
 from server.common.error_codes_and_messages import (
     ErrorCodeAndMessageMarshaller, ErrorCodeAndMessageFormatter,
     PATH_IS_DIRECTORY, INVALID_PATH, PATH_EXISTS, INVALID_MODEL_PROVIDED,
-    NOT_AN_ARCHIVE, INVALID_BASE_64, UNEXPECTED_ERROR)
+    NOT_AN_ARCHIVE, INVALID_BASE_64, UNEXPECTED_ERROR, MD5_MISMATCH,
+    INVALID_UPLOAD_OFFSET)
 
+# Size of the blocks written to disk when receiving uploads
+STREAM_CHUNK_SIZE = 1024 * 1024
+# Number of base64 characters decoded at once. Must be a multiple of 4.
+BASE64_CHUNK_SIZE = 4 * STREAM_CHUNK_SIZE
+BASE64_INVALID_CHARACTERS = re.compile('[^A-Za-z0-9+/=]')
 
-def get_content(complete_path: str) -> Response:
+
+def get_content(complete_path: str, compression: str = 'gzip') -> Response:
     """Helper function for the `content` action used in the GET method."""
     if os.path.isdir(complete_path):
-        tarball = make_tarball(complete_path)
-        response = send_file(
-            tarball, mimetype="application/gzip", as_attachment=True)
-        os.remove(tarball)
-        return response
-    mimetype, _ = mimetypes.guess_type(complete_path)
-    response = send_file(complete_path)
-    if mimetype:
-        response.mimetype = mimetype
-    return response
-
-
-def get_path_list(relative_path_to_resource: str) -> List[Path]:
-    """Helper function for the `list` action used in the GET method."""
-    result_list = []
+        return get_directory_content(complete_path, compression)
+    return get_file_content(complete_path)
+
+
+def get_path_list(relative_path_to_resource: str,
+                  offset: int = None,
+                  limit: int = None,
+                  sort: str = None,
+                  depth: int = 1) -> List[Path]:
+    """Helper function for the `list` action used in the GET method.
+
+    Hidden entries are skipped. Subdirectories are listed recursively up to
+    `depth` levels below the requested directory. Entries are returned in
+    directory order unless `sort` is one of LIST_SORT_KEYS, optionally
+    prefixed with '-' for a descending order. Only the `limit` entries
+    following `offset` are turned into Path objects, and without sorting the
+    directory is only read up to the end of the requested page.
+    """
     absolute_path_to_resource = make_absolute(relative_path_to_resource)
-    directory_list = os.listdir(absolute_path_to_resource)
-    for f_d in directory_list:
-        if not f_d.startswith('.'):
-            result_list.append(
-                Path.object_from_pathname(
-                    os.path.join(absolute_path_to_resource, f_d)))
-    return result_list
+    offset = offset or 0
+    stop = offset + limit if limit is not None else None
+
+    # The directories still open when the page is complete are closed on exit
+    with closing(scan_entries(absolute_path_to_resource, depth)) as scanned:
+        entries = scanned
+        if sort:
+            key = LIST_SORT_KEYS[sort.lstrip('-')]
+            if stop is None:
+                entries = sorted(
+                    entries, key=key, reverse=sort.startswith('-'))
+            elif sort.startswith('-'):
+                entries = heapq.nlargest(stop, entries, key=key)
+            else:
+                entries = heapq.nsmallest(stop, entries, key=key)
+
+        return [
+            Path.object_from_dir_entry(entry)
+            for entry in islice(entries, offset, stop)
+        ]
+
+
+def scan_entries(absolute_path: str, depth: int) -> Iterator:
+    """scan_entries generates the visible entries of the directory at
+    `absolute_path`, and of its subdirectories up to `depth` levels. The
+    directories are closed when the generator is closed, even before its
+    end."""
+    directory = scandir(absolute_path)
+    try:
+        for entry in directory:
+            if entry.name.startswith('.'):
+                continue
+            yield entry
+            if depth > 1 and entry.is_dir(follow_symlinks=False):
+                yield from scan_entries(entry.path, depth - 1)
+    finally:
+        # The iterators of Python 3.5 cannot be closed before their end
+        if hasattr(directory, 'close'):
+            directory.close()
+
+
+def entry_size(entry) -> int:
+    if entry.is_dir():
+        return DIRECTORY_SIZE_INDEX.get(entry.path, entry.stat())
+    return entry.stat().st_size
+
+
+LIST_SORT_KEYS = {
+    'name': lambda entry: entry.name,
+    'path': lambda entry: entry.path,
+    'size': entry_size,
+    'date': lambda entry: entry.stat().st_mtime
+}
 
 
 def is_safe_path(path: str, follow_symlinks: bool = True) -> bool:
@@ -101,46 +168,163 @@ def make_absolute(relative_path: str) -> str:
 
 def upload_file(upload_data: UploadData,
                 requested_file_path: str) -> (Path, ErrorCodeAndMessage):
+    temporary_path = temporary_upload_path(requested_file_path)
     try:
-        raw_content = base64.decodebytes(upload_data.base64_content.encode())
-    except Error as e:
-        return None, ErrorCodeAndMessageFormatter(INVALID_BASE_64, e)
-    try:
-        with open(requested_file_path, 'wb') as f:
-            f.write(raw_content)
+        with open(temporary_path, 'wb') as f:
+            md5, error = write_base64_to_file(upload_data.base64_content, f)
+        if not error:
+            error = check_md5(md5, upload_data.md5)
+        if not error:
+            os.replace(temporary_path, requested_file_path)
     except OSError:
-        return None, UNEXPECTED_ERROR
+        error = UNEXPECTED_ERROR
+    if error:
+        remove_file(temporary_path)
+        return None, error
+    DIRECTORY_SIZE_INDEX.invalidate(requested_file_path)
+    precompute_checksums(requested_file_path, {'md5': md5})
     path = Path.object_from_pathname(requested_file_path)
     return path, None
 
 
 def upload_archive(upload_data: UploadData,
                    requested_dir_path: str) -> (Path, ErrorCodeAndMessage):
-    try:
-        raw_content = base64.decodebytes(upload_data.base64_content.encode())
-    except Error as e:
-        return None, ErrorCodeAndMessageFormatter(INVALID_BASE_64, e)
     file_name = '{}.zip'.format(requested_dir_path)
 
     try:
         with open(file_name, 'wb') as f:
-            f.write(raw_content)
+            md5, error = write_base64_to_file(upload_data.base64_content, f)
     except OSError:
         return None, UNEXPECTED_ERROR
+    if not error:
+        error = check_md5(md5, upload_data.md5)
+    if error:
+        remove_file(file_name)
+        return None, error
     try:
         with zipfile.ZipFile(file_name, mode='r') as zf:
             zf.extractall(path=requested_dir_path)
     except zipfile.BadZipFile as e:
-        try:
-            os.remove(file_name)
-        except:
-            pass
+        remove_file(file_name)
         return None, ErrorCodeAndMessageFormatter(NOT_AN_ARCHIVE, e)
     os.remove(file_name)
+    DIRECTORY_SIZE_INDEX.invalidate(requested_dir_path)
     path = Path.object_from_pathname(requested_dir_path)
     return path, None
 
 
+def upload_stream(stream, requested_file_path: str, expected_md5: str = None,
+                  offset: int = None) -> (Path, ErrorCodeAndMessage):
+    """upload_stream writes the content of `stream` to `requested_file_path`,
+    one block at a time, so that memory usage does not depend on the size of
+    the upload. Like in `upload_file`, the content is written to a temporary
+    file, which only replaces `requested_file_path` once complete and checked.
+
+    If `offset` is given, the file must already exist and the content is
+    written in place from this offset, replacing anything after it. This
+    allows an interrupted upload to be resumed from the current size of the
+    file. `expected_md5` is always compared to the md5 of the whole file.
+    """
+    hash_md5 = hashlib.md5()
+    if offset:
+        current_size = os.path.getsize(requested_file_path) if (
+            os.path.isfile(requested_file_path)) else 0
+        if offset < 0 or offset > current_size:
+            return None, ErrorCodeAndMessageFormatter(
+                INVALID_UPLOAD_OFFSET, offset, current_size)
+        written_path = requested_file_path
+    else:
+        written_path = temporary_upload_path(requested_file_path)
+
+    error = None
+    try:
+        with open(written_path, 'r+b' if offset else 'wb') as f:
+            if offset:
+                if expected_md5:
+                    update_md5(hash_md5, f, offset)
+                f.seek(offset)
+                f.truncate()
+            for chunk in iter(lambda: stream.read(STREAM_CHUNK_SIZE), b""):
+                f.write(chunk)
+                hash_md5.update(chunk)
+        error = check_md5(hash_md5.hexdigest(), expected_md5)
+        if not error and not offset:
+            os.replace(written_path, requested_file_path)
+    except OSError:
+        error = UNEXPECTED_ERROR
+    finally:
+        # Also removes the temporary file of an interrupted upload
+        if not offset:
+            remove_file(written_path)
+        DIRECTORY_SIZE_INDEX.invalidate(requested_file_path)
+
+    if error:
+        return None, error
+    # Without an expected md5, the beginning of a resumed upload is not read,
+    # and the md5 is only known for complete uploads.
+    precompute_checksums(requested_file_path, {'md5': hash_md5.hexdigest()}
+                         if expected_md5 or not offset else None)
+    path = Path.object_from_pathname(requested_file_path)
+    return path, None
+
+
+def write_base64_to_file(base64_content: str,
+                         f) -> (str, ErrorCodeAndMessage):
+    """write_base64_to_file decodes `base64_content` into the binary file `f`
+    in blocks of BASE64_CHUNK_SIZE characters, to avoid holding a decoded copy
+    of the whole content in memory. Returns the md5 of the decoded content."""
+    hash_md5 = hashlib.md5()
+    remainder = ''
+    try:
+        for start in range(0, len(base64_content), BASE64_CHUNK_SIZE):
+            chunk = remainder + BASE64_INVALID_CHARACTERS.sub(
+                '', base64_content[start:start + BASE64_CHUNK_SIZE])
+            decodable_length = len(chunk) - len(chunk) % 4
+            remainder = chunk[decodable_length:]
+            raw_content = binascii.a2b_base64(chunk[:decodable_length])
+            f.write(raw_content)
+            hash_md5.update(raw_content)
+        if remainder:
+            binascii.a2b_base64(remainder)
+    except Error as e:
+        return None, ErrorCodeAndMessageFormatter(INVALID_BASE_64, e)
+    return hash_md5.hexdigest(), None
+
+
+def check_md5(md5: str, expected_md5: str = None) -> ErrorCodeAndMessage:
+    if expected_md5 and md5 != expected_md5.lower():
+        return ErrorCodeAndMessageFormatter(MD5_MISMATCH, md5, expected_md5)
+    return None
+
+
+def update_md5(hash_md5, f, length: int):
+    """update_md5 feeds the first `length` bytes of the file `f` to
+    `hash_md5`."""
+    f.seek(0)
+    while length > 0:
+        chunk = f.read(min(STREAM_CHUNK_SIZE, length))
+        if not chunk:
+            break
+        hash_md5.update(chunk)
+        length -= len(chunk)
+
+
+def temporary_upload_path(requested_file_path: str) -> str:
+    """temporary_upload_path returns a hidden path, next to
+    `requested_file_path`, where an upload can be written before being moved
+    to its final location."""
+    return os.path.join(
+        os.path.dirname(requested_file_path), '.{}.{}.part'.format(
+            os.path.basename(requested_file_path), uuid.uuid4().hex))
+
+
+def remove_file(file_path: str):
+    try:
+        os.remove(file_path)
+    except OSError:
+        pass
+
+
 def create_directory(requested_data_path: str, path_required: bool = True
                      ) -> (Path, ErrorCodeAndMessage):
     try:
@@ -155,19 +339,7 @@ def create_directory(requested_data_path: str, path_required: bool = True
 
 
 def generate_md5(data_path: str) -> PathMD5:
-    hash_md5 = hashlib.md5()
-    with open(data_path, "rb") as f:
-        for chunk in iter(lambda: f.read(4096), b""):
-            hash_md5.update(chunk)
-    return PathMD5(hash_md5.hexdigest())
-
-
-def make_tarball(data_path: str) -> tarfile:
-    temp_file = os.path.join(tempfile.gettempdir(),
-                             os.path.basename(data_path)) + ".tar.gz"
-    with tarfile.open(temp_file, mode='w:gz') as archive:
-        archive.add(data_path, arcname=os.path.basename(data_path))
-    return temp_file
+    return PathMD5(get_checksum(data_path, 'md5'))
 
 
 def parent_dir_exists(requested_data_path: str) -> bool:
@@ -2,6 +2,10 @@ INPUTS_FILENAME = "inputs.json"
 EXECUTIONS_DIRNAME = "executions"
 DESCRIPTOR_FILENAME = "descriptor.json"
 CARMIN_FILES_FOLDER = ".carmin-files"
+OUTPUTS_MANIFEST_FILENAME = "outputs.json"
+RETURNED_FILES_FILENAME = "returned-files.json"
+
+EXPORT_HASHES_FILENAME = ".carmin-exports"
 
 STDOUT_FILENAME = "stdout.txt"
 STDERR_FILENAME = "stderr.txt"
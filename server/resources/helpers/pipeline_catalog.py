@@ -0,0 +1,211 @@
+import os
+try:
+    from os import scandir
+except ImportError:
+    from scandir import scandir
+import json
+import time
+import logging
+import threading
+from typing import Dict, List
+from server import app
+from server.resources.models.descriptor.supported_descriptors import SUPPORTED_DESCRIPTORS
+from server.resources.models.pipeline import Pipeline, PipelineSchema
+
+
+class CatalogEntry():
+    """CatalogEntry holds a parsed pipeline file of the pipeline directory.
+
+    Attributes:
+        path (str): Absolute path to the CARMIN pipeline file.
+        mtime_ns (int): Modification time of the file when it was parsed.
+        size (int): Size of the file when it was parsed.
+        study (str): Name of the top-level directory containing the pipeline,
+        or None if the pipeline lives at the root of the pipeline directory.
+        pipeline (Pipeline): The parsed pipeline, or None if it was invalid.
+        errors (dict): Schema errors raised while parsing the pipeline.
+    """
+
+    def __init__(self,
+                 path: str,
+                 mtime_ns: int,
+                 size: int,
+                 study: str = None,
+                 pipeline: Pipeline = None,
+                 errors: Dict = None):
+        self.path = path
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.study = study
+        self.pipeline = pipeline
+        self.errors = errors
+
+
+class CatalogIndex():
+    """CatalogIndex is an immutable view of the catalog. A new index is built
+    on every reload and swapped in as a whole, so readers never observe a
+    partially updated catalog."""
+
+    def __init__(self, root: str = None, entries: List[CatalogEntry] = None):
+        self.root = root
+        self.entries = entries or []
+        self.by_identifier = {}
+        self.by_study = {}
+        self.by_property = {}
+
+        for entry in self.entries:
+            self.by_study.setdefault(entry.study, []).append(entry)
+            if not entry.pipeline:
+                continue
+            self.by_identifier.setdefault(entry.pipeline.identifier,
+                                          []).append(entry)
+            for prop in entry.pipeline.properties or {}:
+                self.by_property.setdefault(prop, []).append(entry)
+        # Several pipelines may share an identifier: the ones at the root of
+        # the pipeline directory come first, then the ones of the studies.
+        for entries in self.by_identifier.values():
+            entries.sort(key=lambda e: e.study is not None)
+
+
+class PipelineCatalog():
+    """PipelineCatalog keeps the CARMIN pipelines of the pipeline directory in
+    memory, indexed by identifier, study and property.
+
+    The catalog is loaded once at start up, after the descriptors have been
+    exported. `refresh` then compares the modification times of the pipeline
+    files with the ones seen during the last load, and only parses the files
+    that were added or modified. Refreshes are throttled with
+    `PIPELINE_CATALOG_REFRESH_INTERVAL` so that most lookups never touch the
+    disk.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._index = CatalogIndex()
+        self._last_refresh = None
+
+    def load(self, pipeline_directory: str = None):
+        """load discards the current index and parses every pipeline file."""
+        with self._lock:
+            self._load(pipeline_directory or app.config['PIPELINE_DIRECTORY'],
+                       {})
+
+    def refresh(self, force: bool = False):
+        """refresh reloads the catalog if the pipeline directory changed on disk
+        since the last load. Unless `force` is set, the pipeline directory is
+        checked at most once every `PIPELINE_CATALOG_REFRESH_INTERVAL` seconds.
+        """
+        pipeline_directory = app.config['PIPELINE_DIRECTORY']
+        interval = app.config.get('PIPELINE_CATALOG_REFRESH_INTERVAL', 0)
+        if (not force and self._last_refresh is not None
+                and self._index.root == pipeline_directory
+                and time.monotonic() - self._last_refresh < interval):
+            return
+
+        with self._lock:
+            previous_entries = {}
+            if self._index.root == pipeline_directory:
+                previous_entries = {e.path: e for e in self._index.entries}
+            self._load(pipeline_directory, previous_entries)
+
+    def get(self, pipeline_identifier: str) -> CatalogEntry:
+        """get returns the pipeline at the root of the pipeline directory with
+        the given identifier. Pipelines of studies with the same identifier
+        are ignored."""
+        return next((e for e in self._index.by_identifier.get(
+            pipeline_identifier, []) if not e.study), None)
+
+    def find(self,
+             pipeline_identifier: str = None,
+             study_identifier: str = None,
+             pipeline_property: str = None,
+             property_value: str = None) -> (List[Pipeline], Dict):
+        """find returns the pipelines matching all the given criteria, along
+        with the parsing errors of the pipeline files that were considered.
+        Pipelines at the root of the pipeline directory are not bound to a
+        study and are always part of the candidates."""
+        index = self._index
+        if study_identifier:
+            scope = (index.by_study.get(None, []) +
+                     index.by_study.get(study_identifier, []))
+        else:
+            scope = index.entries
+
+        errors = next((e.errors for e in scope if e.errors), None)
+        if errors:
+            return [], errors
+
+        if pipeline_identifier:
+            candidates = index.by_identifier.get(pipeline_identifier, [])
+        elif pipeline_property:
+            candidates = index.by_property.get(pipeline_property, [])
+        else:
+            candidates = scope
+
+        result = [
+            e.pipeline for e in candidates if e.pipeline and (
+                not study_identifier or e.study in (None, study_identifier))
+        ]
+        if pipeline_property:
+            result = [i for i in result if pipeline_property in i.properties]
+            if property_value:
+                result = [
+                    i for i in result
+                    if property_value == i.properties[pipeline_property]
+                ]
+        return result, None
+
+    def _load(self, pipeline_directory: str,
+              previous_entries: Dict[str, CatalogEntry]):
+        entries = []
+        if pipeline_directory and os.path.isdir(pipeline_directory):
+            for path, stat, study in self._pipeline_files(pipeline_directory):
+                previous = previous_entries.get(path)
+                if (previous and previous.mtime_ns == stat.st_mtime_ns
+                        and previous.size == stat.st_size):
+                    entries.append(previous)
+                    continue
+                entries.append(self._parse(path, stat, study))
+
+        self._index = CatalogIndex(pipeline_directory, entries)
+        self._last_refresh = time.monotonic()
+
+    @classmethod
+    def _pipeline_files(cls, pipeline_directory: str) -> list:
+        """_pipeline_files returns a (path, stat, study) tuple for every
+        pipeline file found under `pipeline_directory`, sorted by path."""
+        files = []
+        pending = [(pipeline_directory, None)]
+        while pending:
+            directory, study = pending.pop()
+            for f in scandir(directory):
+                if f.is_dir(follow_symlinks=False):
+                    # We exclude the descriptor folders as they include the
+                    # original, non-converted descriptors
+                    if f.name not in SUPPORTED_DESCRIPTORS.keys():
+                        pending.append((f.path, study or f.name))
+                elif f.name.endswith(".json") and f.is_file():
+                    files.append((f.path, f.stat(), study))
+        return sorted(files, key=lambda f: f[0])
+
+    @classmethod
+    def _parse(cls, path: str, stat: os.stat_result,
+               study: str) -> CatalogEntry:
+        try:
+            with open(path) as pipeline_json:
+                pipeline, errors = PipelineSchema().load(
+                    json.load(pipeline_json))
+        except (OSError, ValueError):
+            # We log the invalid pipeline, but just continue instead of crashing
+            logger = logging.getLogger('server-error')
+            logger.error("Invalid pipeline at {}".format(path))
+            pipeline, errors = None, None
+        return CatalogEntry(path=path,
+                            mtime_ns=stat.st_mtime_ns,
+                            size=stat.st_size,
+                            study=study,
+                            pipeline=None if errors else pipeline,
+                            errors=errors or None)
+
+
+PIPELINE_CATALOG = PipelineCatalog()
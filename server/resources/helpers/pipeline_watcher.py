@@ -0,0 +1,77 @@
+import os
+try:
+    from os import scandir
+except ImportError:
+    from scandir import scandir
+import time
+import logging
+import threading
+from server import app
+from server.resources.models.descriptor.supported_descriptors import SUPPORTED_DESCRIPTORS
+from server.resources.helpers.pipelines import reload_pipelines
+
+
+class PipelineWatcher():
+    """PipelineWatcher exports the descriptors added to or modified in the
+    pipeline directory while the server is running.
+
+    Every `PIPELINE_WATCH_INTERVAL` seconds, the modification times and sizes
+    of the descriptors are compared with the ones seen during the previous
+    check. If any changed, the pipelines are reloaded with
+    `reload_pipelines`, and the pipeline catalog swaps in its new index as a
+    whole: requests being handled are not interrupted. An interval of 0
+    disables the watcher.
+    """
+
+    def __init__(self):
+        self._thread = None
+        self._signature = None
+
+    def start(self):
+        if self._thread or not app.config.get('PIPELINE_WATCH_INTERVAL'):
+            return
+        self._signature = self.descriptors_signature()
+        self._thread = threading.Thread(target=self._watch_loop,
+                                        name='pipeline-watcher',
+                                        daemon=True)
+        self._thread.start()
+
+    def check(self) -> bool:
+        """check reloads the pipelines if the descriptors changed since the
+        previous check, and returns whether they did."""
+        signature = self.descriptors_signature()
+        if signature == self._signature:
+            return False
+        errors = reload_pipelines()
+        for descriptor_path, error in sorted(errors.items()):
+            logger = logging.getLogger('server-error')
+            logger.error("Could not export descriptor at {}: {}".format(
+                descriptor_path, error))
+        self._signature = signature
+        return True
+
+    @classmethod
+    def descriptors_signature(cls) -> frozenset:
+        pipeline_directory = app.config['PIPELINE_DIRECTORY']
+        signature = set()
+        for descriptor_type in SUPPORTED_DESCRIPTORS:
+            descriptor_dir = os.path.join(pipeline_directory, descriptor_type)
+            if not os.path.isdir(descriptor_dir):
+                continue
+            for f in scandir(descriptor_dir):
+                if not f.name.startswith(".") and f.is_file():
+                    stat = f.stat()
+                    signature.add((f.path, stat.st_mtime_ns, stat.st_size))
+        return frozenset(signature)
+
+    def _watch_loop(self):
+        while True:
+            time.sleep(app.config['PIPELINE_WATCH_INTERVAL'])
+            try:
+                self.check()
+            except Exception:
+                logger = logging.getLogger('server-error')
+                logger.exception("Could not reload the pipelines")
+
+
+PIPELINE_WATCHER = PipelineWatcher()
@@ -1,10 +1,14 @@
 import os
 try:
-    from os import scandir, walk
+    from os import scandir
 except ImportError:
-    from scandir import scandir, walk
+    from scandir import scandir
 import json
+import hashlib
 import logging
+import threading
+from typing import Dict
+from concurrent.futures import ProcessPoolExecutor
 from boutiques import bosh
 from server import app
 from server.resources.models.descriptor.descriptor_abstract import Descriptor
@@ -14,42 +18,24 @@ from server.common.error_codes_and_messages import (
     ErrorCodeAndMessageAdditionalDetails, ErrorCodeAndMessageFormatter,
     INVALID_PIPELINE_IDENTIFIER, UNEXPECTED_ERROR, PATH_DOES_NOT_EXIST)
 from server.resources.models.error_code_and_message import ErrorCodeAndMessage
+from server.resources.helpers.pipeline_catalog import PIPELINE_CATALOG
+from server.resources.helpers.pathnames import EXPORT_HASHES_FILENAME
+
+# Held while the pipelines are exported outside of start up, by the pipeline
+# watcher or on demand.
+RELOAD_LOCK = threading.Lock()
 
 
 def pipelines(pipeline_identifier: str = None,
               study_identifier: str = None,
               pipeline_property: str = None,
               property_value: str = None):
-    response = []
-    pipeline_path = app.config['PIPELINE_DIRECTORY']
-    for subdir, dirs, files in walk(pipeline_path):
-        if study_identifier:
-            dirs[:] = [i for i in dirs if i == study_identifier]
-
-        # We exclude the descriptor folders as they include the
-        # original, non-converted descriptors
-        dirs[:] = [i for i in dirs if i not in SUPPORTED_DESCRIPTORS.keys()]
-
-        for file in files:
-            real_path = os.path.realpath(os.path.join(subdir, file))
-            if file.endswith(".json"):
-                with open(real_path) as pipeline_json:
-                    pipeline, errors = PipelineSchema().load(
-                        json.load(pipeline_json))
-                    if errors:
-                        return ErrorCodeAndMessageAdditionalDetails(
-                            UNEXPECTED_ERROR, errors)
-                    else:
-                        response.append(pipeline)
-    if pipeline_property:
-        response = [i for i in response if pipeline_property in i.properties]
-        if property_value:
-            response = [
-                i for i in response
-                if property_value == i.properties[pipeline_property]
-            ]
-    if pipeline_identifier:
-        response = [i for i in response if pipeline_identifier == i.identifier]
+    PIPELINE_CATALOG.refresh()
+    response, errors = PIPELINE_CATALOG.find(
+        pipeline_identifier, study_identifier, pipeline_property,
+        property_value)
+    if errors:
+        return ErrorCodeAndMessageAdditionalDetails(UNEXPECTED_ERROR, errors)
     return response
 
 
@@ -69,38 +55,124 @@ def get_all_pipelines(_type: str = None) -> list:
 
 def get_pipeline(pipeline_identifier: str,
                  only_path: bool = False) -> Pipeline:
-    all_pipelines = get_all_pipelines()
-
-    for pipeline in all_pipelines:
-        with open(pipeline.path) as f:
-            try:
-                pipeline_json = json.load(f)
-                if pipeline_json["identifier"] == pipeline_identifier:
-                    return pipeline if only_path else PipelineSchema().load(
-                        pipeline_json).data
-            except json.JSONDecodeError:
-                # We log the invalid pipeline, but just continue instead of crashing
-                logger = logging.getLogger('server-error')
-                logger.error("Invalid pipeline at {}".format(pipeline.path))
+    """get_pipeline returns the pipeline exported from a descriptor, found at
+    the root of the pipeline directory, with the given identifier. If
+    `only_path` is set, the path to the CARMIN pipeline file is returned
+    instead."""
+    PIPELINE_CATALOG.refresh()
+    entry = PIPELINE_CATALOG.get(pipeline_identifier)
+    if not entry:
+        return None
+    return entry.path if only_path else entry.pipeline
+
+
+def export_all_pipelines(parallel: bool = True) -> Dict[str, str]:
+    """export_all_pipelines exports the descriptors of the pipeline directory
+    to CARMIN pipelines, in parallel on `PIPELINE_EXPORT_PROCESSES` processes
+    if `parallel` is set. Descriptors whose CARMIN pipeline is up to date are
+    skipped: see `export_is_up_to_date`. The pipelines exported from removed
+    descriptors are removed. A descriptor that cannot be exported does not
+    prevent the others from being exported: the errors are returned by
+    descriptor path."""
+    pipeline_directory = app.config['PIPELINE_DIRECTORY']
+    hashes_path = os.path.join(pipeline_directory, EXPORT_HASHES_FILENAME)
+    try:
+        with open(hashes_path) as f:
+            previous_hashes = json.load(f)
+    except (OSError, ValueError):
+        previous_hashes = {}
+
+    hashes = {}
+    exports = []
+    export_hashes = {}
+    for descriptor_type in SUPPORTED_DESCRIPTORS:
+        for descriptor in get_all_pipelines(descriptor_type):
+            carmin_pipeline = os.path.join(
+                pipeline_directory, "{}_{}".format(descriptor_type,
+                                                   descriptor.name))
+            descriptor_hash = file_hash(descriptor.path)
+            if export_is_up_to_date(descriptor.path, carmin_pipeline,
+                                    descriptor_hash,
+                                    previous_hashes.get(descriptor.path)):
+                hashes[descriptor.path] = descriptor_hash
+            else:
+                exports.append(
+                    (descriptor_type, descriptor.path, carmin_pipeline))
+                export_hashes[descriptor.path] = descriptor_hash
+
+    errors = {}
+    processes = app.config.get('PIPELINE_EXPORT_PROCESSES') or os.cpu_count()
+    if parallel and len(exports) > 1 and processes > 1:
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            results = list(executor.map(export_descriptor, *zip(*exports)))
+    else:
+        results = [export_descriptor(*export) for export in exports]
+    for (_, descriptor_path, _), error in zip(exports, results):
+        if error:
+            errors[descriptor_path] = error
+        else:
+            hashes[descriptor_path] = export_hashes[descriptor_path]
+
+    for descriptor_path in set(previous_hashes) - set(hashes) - set(errors):
+        if os.path.exists(descriptor_path):
+            continue
+        carmin_pipeline = os.path.join(
+            pipeline_directory, "{}_{}".format(
+                os.path.basename(os.path.dirname(descriptor_path)),
+                os.path.basename(descriptor_path)))
+        try:
+            os.remove(carmin_pipeline)
+        except FileNotFoundError:
+            pass
 
-    return None
+    try:
+        with open(hashes_path, 'w') as f:
+            json.dump(hashes, f)
+    except OSError:
+        # Descriptors will be exported again on the next start up
+        logger = logging.getLogger('server-error')
+        logger.exception("Could not write {}".format(hashes_path))
+    return errors
+
+
+def reload_pipelines() -> Dict[str, str]:
+    """reload_pipelines exports the descriptors that changed since the last
+    export, and refreshes the pipeline catalog. It returns the errors of the
+    descriptors that could not be exported, by descriptor path."""
+    with RELOAD_LOCK:
+        errors = export_all_pipelines(parallel=False)
+        PIPELINE_CATALOG.refresh(force=True)
+    return errors
+
+
+def export_descriptor(descriptor_type: str, descriptor_path: str,
+                      carmin_pipeline: str) -> str:
+    """export_descriptor exports one descriptor to a CARMIN pipeline, and
+    returns the error, if any. It runs in the export processes."""
+    descriptor = Descriptor.descriptor_factory_from_type(descriptor_type)
+    try:
+        _, error = descriptor.export(descriptor_path, carmin_pipeline)
+    except Exception as e:
+        error = str(e)
+    return error
 
 
-def export_all_pipelines() -> (bool, str):
-    for descriptor_type in SUPPORTED_DESCRIPTORS:
-        all_pipelines = get_all_pipelines(descriptor_type)
+def export_is_up_to_date(descriptor_path: str, carmin_pipeline: str,
+                         descriptor_hash: str, previous_hash: str) -> bool:
+    """export_is_up_to_date returns True if the CARMIN pipeline exported from
+    a descriptor exists, and is either newer than the descriptor, or was
+    exported from a descriptor with the same content."""
+    try:
+        pipeline_mtime = os.stat(carmin_pipeline).st_mtime_ns
+    except OSError:
+        return False
+    return (pipeline_mtime >= os.stat(descriptor_path).st_mtime_ns
+            or descriptor_hash == previous_hash)
 
-        for pipeline in all_pipelines:
-            carmin_pipeline = os.path.join(app.config['PIPELINE_DIRECTORY'],
-                                           "{}_{}".format(
-                                               descriptor_type, pipeline.name))
 
-            descriptor = Descriptor.descriptor_factory_from_type(
-                descriptor_type)
-            export, error = descriptor.export(pipeline.path, carmin_pipeline)
-            if error:
-                return False, error
-    return True, None
+def file_hash(path: str) -> str:
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
 
 
 def get_original_descriptor_path_and_type(
@@ -111,10 +183,14 @@ def get_original_descriptor_path_and_type(
     if not carmin_descriptor_path:
         return (None, None), INVALID_PIPELINE_IDENTIFIER
 
-    descriptor_type = carmin_descriptor_path.name[:carmin_descriptor_path.name.
-                                                  index("_")]
-    original_descriptor_filename = carmin_descriptor_path.name[
-        carmin_descriptor_path.name.index("_") + 1:]
+    carmin_descriptor_filename = os.path.basename(carmin_descriptor_path)
+    if "_" not in carmin_descriptor_filename:
+        return (None, None), INVALID_PIPELINE_IDENTIFIER
+
+    descriptor_type = carmin_descriptor_filename[:carmin_descriptor_filename.
+                                                 index("_")]
+    original_descriptor_filename = carmin_descriptor_filename[
+        carmin_descriptor_filename.index("_") + 1:]
     original_descriptor_path = os.path.join(app.config['PIPELINE_DIRECTORY'],
                                             descriptor_type,
                                             original_descriptor_filename)
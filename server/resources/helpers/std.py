@@ -1,15 +1,36 @@
-from flask import Response
+import os
+import time
+from typing import Iterator
+from flask import Response, request, stream_with_context
+from server import app
 from server.database import db
 from server.common.utils import marshal
 from server.common.error_codes_and_messages import (
-    ErrorCodeAndMessageFormatter, EXECUTION_NOT_FOUND, UNAUTHORIZED)
+    ErrorCodeAndMessageFormatter, EXECUTION_NOT_FOUND, UNAUTHORIZED,
+    PATH_DOES_NOT_EXIST)
+from server.database.models.execution import ExecutionStatus
 from server.database.queries.executions import get_execution
 from server.resources.helpers.executions import (
-    get_execution_as_model, get_std_file, STDERR_FILENAME, is_safe_for_get)
-from server.resources.decorators import login_required
+    std_file_path, is_safe_for_get, query_converter)
+from server.resources.helpers.execution_status import current_status
+from server.resources.helpers.content import (CONTENT_CHUNK_SIZE,
+                                              get_file_content,
+                                              file_range_blocks)
+
+# Statuses of the executions that may still write to their standard output and
+# error
+WRITING_STATUSES = [ExecutionStatus.Ready, ExecutionStatus.Running]
 
 
 def std_file_resource(user, execution_identifier, path_to_file):
+    """std_file_resource sends the standard output or error of an execution.
+
+    The whole file is sent unless one of these query parameters is given:
+    `offset` and `limit`, a range of bytes, or `tail`, the number of lines to
+    send from the end of the file. With `follow`, the response goes on with
+    the bytes written to the file until the execution is complete. The offset
+    of the first byte sent is given in the `X-Content-Offset` header.
+    """
     execution_db = get_execution(execution_identifier, db.session)
     if not execution_db:
         error = ErrorCodeAndMessageFormatter(EXECUTION_NOT_FOUND,
@@ -19,14 +40,88 @@ def std_file_resource(user, execution_identifier, path_to_file):
     if not is_safe_for_get(user, execution_db):
         return UNAUTHORIZED
 
-    execution, error = get_execution_as_model(execution_db.creator_username,
-                                              execution_db)
-    if error:
-        return marshal(error), 400
+    file_path = std_file_path(execution_db.creator_username,
+                              execution_identifier, path_to_file)
+    follow = request.args.get('follow', default='', type=str).lower() in [
+        'true', '1'
+    ]
+    if not os.path.isfile(file_path) and not (
+            follow and execution_db.status in WRITING_STATUSES):
+        return marshal(PATH_DOES_NOT_EXIST), 400
 
-    std, error = get_std_file(user.username, execution_identifier,
-                              path_to_file)
-    if error:
-        return marshal(error), 400
+    offset = request.args.get('offset', type=query_converter)
+    limit = request.args.get('limit', type=query_converter)
+    tail = request.args.get('tail', type=query_converter)
+    if offset is None and limit is None and tail is None and not follow:
+        return get_file_content(file_path)
+
+    size = os.path.getsize(file_path) if os.path.isfile(file_path) else 0
+    start = tail_offset(file_path, tail) if tail is not None else min(
+        offset or 0, size)
+    if follow:
+        response = Response(
+            stream_with_context(
+                follow_blocks(file_path, start, execution_identifier)),
+            mimetype='text/plain')
+    else:
+        stop = size if limit is None else min(start + limit, size)
+        response = Response(
+            file_range_blocks(file_path, [(b'', start, stop)]),
+            mimetype='text/plain')
+        response.content_length = stop - start
+    response.headers['X-Content-Offset'] = str(start)
+    return response
+
+
+def tail_offset(file_path: str, lines: int) -> int:
+    """tail_offset returns the offset of the last `lines` lines of a file.
+    The file is read backwards, block by block, until enough lines are
+    found."""
+    if not os.path.isfile(file_path):
+        return 0
+    with open(file_path, 'rb') as f:
+        position = f.seek(0, os.SEEK_END)
+        if not position:
+            return 0
+        # A newline at the end of the file ends the last line
+        f.seek(position - 1)
+        newlines = -1 if f.read(1) == b'\n' else 0
+        while position > 0:
+            block_size = min(CONTENT_CHUNK_SIZE, position)
+            position -= block_size
+            f.seek(position)
+            block = f.read(block_size)
+            count = block.count(b'\n')
+            if newlines + count >= lines:
+                index = len(block)
+                for _ in range(lines - newlines):
+                    index = block.rindex(b'\n', 0, index)
+                return position + index + (1 if lines - newlines else 0)
+            newlines += count
+    return 0
+
+
+def follow_blocks(file_path: str, start: int,
+                  execution_identifier: str) -> Iterator[bytes]:
+    """follow_blocks generates the content of a file from `start`, then the
+    content written to it, until the execution writing it is complete."""
+    f = None
+    try:
+        while True:
+            # The status is read before the file, so that nothing written
+            # before the execution completed is missed
+            writing = current_status(execution_identifier) in WRITING_STATUSES
+            if not f and os.path.isfile(file_path):
+                f = open(file_path, 'rb')
+                f.seek(start)
+            chunk = f.read(CONTENT_CHUNK_SIZE) if f else b''
+            while chunk:
+                yield chunk
+                chunk = f.read(CONTENT_CHUNK_SIZE)
+            if not writing:
+                return
+            time.sleep(app.config['STD_FILE_FOLLOW_INTERVAL'])
+    finally:
+        if f:
+            f.close()
 
-    return Response(std, mimetype='text/plain')
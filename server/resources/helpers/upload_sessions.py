@@ -0,0 +1,248 @@
+import os
+import re
+import errno
+import shutil
+import hashlib
+from typing import List
+from server import app
+from server.database.models.upload_session import UploadSession as UploadSessionDB
+from server.database.models.upload_session import UploadSessionRange
+from server.database.models.user import User
+from server.database.models.execution import current_milli_time
+from server.database.queries.upload_sessions import (
+    get_upload_session, get_upload_session_ranges, get_upload_sessions_size,
+    get_expired_upload_sessions)
+from server.resources.models.upload_session import UploadSession
+from server.resources.models.path import Path
+from server.resources.models.error_code_and_message import ErrorCodeAndMessage
+from server.common.error_codes_and_messages import (
+    ErrorCodeAndMessageFormatter, UNEXPECTED_ERROR, UNAUTHORIZED,
+    UPLOAD_SESSION_NOT_FOUND, UPLOAD_INCOMPLETE, UPLOAD_SESSIONS_SIZE_EXCEEDED,
+    INSUFFICIENT_STORAGE)
+from server.resources.helpers.checksums import precompute_checksums
+from server.resources.helpers.directory_size import DIRECTORY_SIZE_INDEX
+from server.resources.helpers.path import (check_md5, update_md5, remove_file,
+                                           temporary_upload_path,
+                                           STREAM_CHUNK_SIZE)
+
+CONTENT_RANGE_REGEX = re.compile(r'^bytes (\d+)-(\d+)/(\d+|\*)$')
+
+
+def get_user_upload_session(
+        upload_identifier: str, user: User,
+        db_session) -> (UploadSessionDB, ErrorCodeAndMessage):
+    session_db = get_upload_session(upload_identifier, db_session)
+    if not session_db:
+        return None, ErrorCodeAndMessageFormatter(UPLOAD_SESSION_NOT_FOUND,
+                                                  upload_identifier)
+    if session_db.creator_username != user.username:
+        return None, UNAUTHORIZED
+    return session_db, None
+
+
+def get_upload_session_file_path(username: str, identifier: str) -> str:
+    """get_upload_session_file_path returns the path of the temporary file of
+    an upload session. It is kept out of the data directory, where users could
+    list, download or delete it."""
+    return os.path.join(app.config['UPLOAD_SESSIONS_DIRECTORY'], username,
+                        '{}.part'.format(identifier))
+
+
+def relative_path_from_platform_path(url_root: str, platform_path: str) -> str:
+    path_url = '{}path/'.format(url_root)
+    if not platform_path.startswith(path_url):
+        return None
+    return platform_path[len(path_url):]
+
+
+def check_upload_session_size(username: str, size: int,
+                              db_session) -> ErrorCodeAndMessage:
+    """check_upload_session_size returns an error if an upload of `size`
+    bytes would take the upload sessions of the user beyond
+    MAX_UPLOAD_SESSIONS_SIZE."""
+    available = (app.config['MAX_UPLOAD_SESSIONS_SIZE'] -
+                 get_upload_sessions_size(username, db_session))
+    if size > available:
+        return ErrorCodeAndMessageFormatter(UPLOAD_SESSIONS_SIZE_EXCEEDED,
+                                            size, max(available, 0), username)
+    return None
+
+
+def create_upload_session_file(username: str, identifier: str,
+                               size: int) -> ErrorCodeAndMessage:
+    """create_upload_session_file creates the temporary file of an upload
+    session, preallocated to the size of the complete upload, so that ranges
+    can be written in place in any order."""
+    file_path = get_upload_session_file_path(username, identifier)
+    try:
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        if size > shutil.disk_usage(os.path.dirname(file_path)).free:
+            return ErrorCodeAndMessageFormatter(INSUFFICIENT_STORAGE, size)
+        with open(file_path, 'wb') as f:
+            if size:
+                preallocate(f.fileno(), size)
+    except OSError:
+        delete_upload_session_file(username, identifier)
+        return UNEXPECTED_ERROR
+    return None
+
+
+def delete_upload_session_file(username: str, identifier: str):
+    remove_file(get_upload_session_file_path(username, identifier))
+
+
+def delete_upload_session(session_db: UploadSessionDB, db_session):
+    """delete_upload_session deletes an upload session, with its ranges and
+    its temporary file. The caller commits the deletion."""
+    delete_upload_session_file(session_db.creator_username,
+                               session_db.identifier)
+    for r in get_upload_session_ranges(session_db.identifier, db_session):
+        db_session.delete(r)
+    db_session.delete(session_db)
+
+
+def purge_upload_sessions(db_session):
+    """purge_upload_sessions deletes the upload sessions created more than
+    UPLOAD_SESSION_EXPIRATION seconds ago, which were most probably
+    abandoned."""
+    created_before = (current_milli_time() -
+                      app.config['UPLOAD_SESSION_EXPIRATION'] * 1000)
+    for session_db in get_expired_upload_sessions(created_before, db_session):
+        delete_upload_session(session_db, db_session)
+    db_session.commit()
+
+
+def preallocate(fd: int, size: int):
+    try:
+        os.posix_fallocate(fd, 0, size)
+    except AttributeError:
+        # posix_fallocate is not available on this platform
+        os.ftruncate(fd, size)
+    except OSError as e:
+        # The file system does not support preallocation
+        if e.errno not in (errno.EOPNOTSUPP, errno.EINVAL):
+            raise
+        os.ftruncate(fd, size)
+
+
+def parse_content_range(content_range: str, size: int) -> (int, int):
+    """parse_content_range returns the [start, end) offsets described by a
+    'bytes <first>-<last>/<size>' Content-Range header, or None if the header
+    is invalid or does not fit in an upload of `size` bytes."""
+    match = CONTENT_RANGE_REGEX.match(content_range or '')
+    if not match:
+        return None
+    first, last, total = match.groups()
+    first, last = int(first), int(last)
+    if first > last or last >= size or total not in ('*', str(size)):
+        return None
+    return first, last + 1
+
+
+def write_range(stream, file_path: str, start: int, end: int) -> int:
+    """write_range copies `stream` to the [start, end) range of the file, with
+    positioned writes. Returns the number of bytes written, which is smaller
+    than the range if the stream ended early."""
+    fd = os.open(file_path, os.O_WRONLY)
+    offset = start
+    try:
+        while offset < end:
+            chunk = stream.read(min(STREAM_CHUNK_SIZE, end - offset))
+            if not chunk:
+                break
+            view = memoryview(chunk)
+            while view:
+                written = os.pwrite(fd, view, offset)
+                view = view[written:]
+                offset += written
+    finally:
+        os.close(fd)
+    return offset - start
+
+
+def merge_ranges(ranges: List[UploadSessionRange]) -> List[List[int]]:
+    """merge_ranges merges the overlapping and adjacent committed ranges, and
+    returns them as [first, last] inclusive offsets."""
+    merged = []
+    for r in sorted(ranges, key=lambda r: r.start):
+        if merged and r.start <= merged[-1][1] + 1:
+            merged[-1][1] = max(merged[-1][1], r.end - 1)
+        else:
+            merged.append([r.start, r.end - 1])
+    return merged
+
+
+def missing_ranges(committed_ranges: List[List[int]],
+                   size: int) -> List[List[int]]:
+    missing = []
+    next_offset = 0
+    for first, last in committed_ranges:
+        if first > next_offset:
+            missing.append([next_offset, first - 1])
+        next_offset = max(next_offset, last + 1)
+    if next_offset < size:
+        missing.append([next_offset, size - 1])
+    return missing
+
+
+def upload_session_as_model(session_db: UploadSessionDB, url_root: str,
+                            ranges: List[UploadSessionRange]) -> UploadSession:
+    committed_ranges = merge_ranges(ranges)
+    return UploadSession(
+        identifier=session_db.identifier,
+        platform_path='{}path/{}'.format(url_root, session_db.relative_path),
+        size=session_db.size,
+        md5=session_db.md5,
+        committed_ranges=committed_ranges,
+        is_complete=not missing_ranges(committed_ranges, session_db.size))
+
+
+def finalize_upload_session_file(
+        session_db: UploadSessionDB, ranges: List[UploadSessionRange],
+        requested_file_path: str) -> (Path, ErrorCodeAndMessage):
+    """finalize_upload_session_file checks that every byte of the upload was
+    received and that it matches the expected md5, then moves the temporary
+    file of the session to `requested_file_path`."""
+    missing = missing_ranges(merge_ranges(ranges), session_db.size)
+    if missing:
+        return None, ErrorCodeAndMessageFormatter(UPLOAD_INCOMPLETE, missing)
+
+    file_path = get_upload_session_file_path(session_db.creator_username,
+                                             session_db.identifier)
+    known_checksums = None
+    try:
+        if session_db.md5:
+            hash_md5 = hashlib.md5()
+            with open(file_path, 'rb') as f:
+                update_md5(hash_md5, f, session_db.size)
+            error = check_md5(hash_md5.hexdigest(), session_db.md5)
+            if error:
+                return None, error
+            known_checksums = {'md5': hash_md5.hexdigest()}
+        move_file(file_path, requested_file_path)
+    except OSError:
+        return None, UNEXPECTED_ERROR
+    DIRECTORY_SIZE_INDEX.invalidate(requested_file_path)
+    precompute_checksums(requested_file_path, known_checksums)
+    return Path.object_from_pathname(requested_file_path), None
+
+
+def move_file(file_path: str, requested_file_path: str):
+    """move_file moves the temporary file of an upload session to its final
+    location. If the upload sessions directory and the data directory are on
+    different file systems, the file is copied next to its final location
+    first, so that it still appears at once."""
+    try:
+        os.replace(file_path, requested_file_path)
+        return
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+    temporary_path = temporary_upload_path(requested_file_path)
+    try:
+        shutil.copyfile(file_path, temporary_path)
+        os.replace(temporary_path, requested_file_path)
+    except OSError:
+        remove_file(temporary_path)
+        raise
+    remove_file(file_path)
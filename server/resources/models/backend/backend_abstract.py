@@ -0,0 +1,55 @@
+from abc import ABC, abstractmethod
+from server.database.models.execution_job import ExecutionJob
+
+
+class Backend(ABC):
+    """Backends must subclass Backend to define how the command lines of
+    executions are run. Refer to `local.py` for an example of implementation.
+    Backends that subclass Backend must be included in `SUPPORTED_BACKENDS`
+    in `supported_backends.py`.
+
+    Backends do not wait for their jobs: the execution supervisor watches
+    all the running jobs, through `completion_fd` or by calling `poll` every
+    `poll_interval` seconds."""
+
+    @classmethod
+    @abstractmethod
+    def start(cls, job: ExecutionJob):
+        """start starts the command line of `job`, writing its standard output
+        and error to the paths of the job, and returns immediately."""
+        pass
+
+    @classmethod
+    @abstractmethod
+    def poll(cls, job: ExecutionJob) -> int:
+        """poll returns the exit code of `job` if it is complete, or None."""
+        pass
+
+    @classmethod
+    @abstractmethod
+    def kill(cls, job: ExecutionJob):
+        pass
+
+    @classmethod
+    def completion_fd(cls, job: ExecutionJob) -> int:
+        """completion_fd returns a file descriptor that becomes readable when
+        `job` is complete, or None if the job must be polled. The caller
+        closes it."""
+        return None
+
+    @classmethod
+    def poll_interval(cls) -> float:
+        return 1
+
+    @classmethod
+    def jobs_survive_restart(cls) -> bool:
+        """jobs_survive_restart returns whether the jobs keep running when the
+        server restarts, in which case the next run of the server watches
+        them again. Otherwise, they are killed."""
+        return False
+
+    @classmethod
+    def backend_factory_from_name(cls, name):
+        from server.resources.models.backend.supported_backends import SUPPORTED_BACKENDS
+        backend = SUPPORTED_BACKENDS.get(name.lower())
+        return backend() if backend else None
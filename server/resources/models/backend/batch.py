@@ -0,0 +1,127 @@
+import os
+import json
+import shlex
+import threading
+from subprocess import Popen, check_output, call
+from server import app
+from server.database import db
+from server.database.models.execution_job import JobState
+from server.resources.helpers.execution_kill import kill_process_tree
+from server.resources.models.backend.backend_abstract import Backend
+
+JOB_SCRIPT_FILENAME = 'job.sh'
+
+
+class Batch(Backend):
+    """Batch submits the jobs as shell scripts to a batch scheduler, chosen
+    by `BATCH_SCHEDULER`: 'slurm', or 'local', which runs the scripts on the
+    server itself and stands in for a batch scheduler in tests. The nodes of
+    the batch scheduler must share the data directory with the server, at
+    the same path."""
+
+    @classmethod
+    def start(cls, job):
+        script_path = os.path.join(os.path.dirname(job.stdout_path),
+                                   JOB_SCRIPT_FILENAME)
+        with open(script_path, 'w') as f:
+            f.write(job_script(job))
+
+        job.job_identifier = get_batch_scheduler().submit(
+            script_path, job.execution_identifier)
+        job.state = JobState.running
+        db.session.commit()
+
+    @classmethod
+    def poll(cls, job):
+        return get_batch_scheduler().exit_code(job.job_identifier)
+
+    @classmethod
+    def kill(cls, job):
+        if job.job_identifier:
+            get_batch_scheduler().cancel(job.job_identifier)
+
+    @classmethod
+    def poll_interval(cls):
+        return app.config['BATCH_POLL_INTERVAL']
+
+    @classmethod
+    def jobs_survive_restart(cls):
+        return True
+
+
+def job_script(job) -> str:
+    return "#!/bin/sh\ncd {}\nexec {} > {} 2> {}\n".format(
+        shlex.quote(job.working_directory),
+        ' '.join(shlex.quote(arg) for arg in json.loads(job.command)),
+        shlex.quote(job.stdout_path), shlex.quote(job.stderr_path))
+
+
+class SlurmScheduler():
+    """SlurmScheduler submits the job scripts with `sbatch`."""
+
+    # States of `sacct` in which a job is complete
+    COMPLETED_STATES = [
+        'COMPLETED', 'FAILED', 'CANCELLED', 'TIMEOUT', 'NODE_FAIL',
+        'OUT_OF_MEMORY', 'PREEMPTED', 'BOOT_FAIL', 'DEADLINE'
+    ]
+
+    def submit(self, script_path: str, name: str) -> str:
+        output = check_output([
+            'sbatch', '--parsable', '--job-name', name, '--output', os.devnull,
+            script_path
+        ])
+        return output.decode().strip().split(';')[0]
+
+    def exit_code(self, job_identifier: str) -> int:
+        """exit_code returns the exit code of a complete job, or None while
+        it is pending or running."""
+        output = check_output([
+            'sacct', '--noheader', '--parsable2', '--allocations', '--jobs',
+            job_identifier, '--format', 'State,ExitCode'
+        ]).decode().strip()
+        if not output:
+            return None
+        state, exit_code = output.splitlines()[0].split('|')
+        if state.split(' ')[0] not in self.COMPLETED_STATES:
+            return None
+        code, signal = (int(c) for c in exit_code.split(':'))
+        return code if state == 'COMPLETED' or code else 128 + signal
+
+    def cancel(self, job_identifier: str):
+        call(['scancel', job_identifier])
+
+
+class LocalBatchScheduler():
+    """LocalBatchScheduler runs the job scripts on the server, as a batch
+    scheduler with a single node would. The exit codes of its jobs are lost
+    when the server restarts."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._processes = {}
+
+    def submit(self, script_path: str, name: str) -> str:
+        process = Popen(['sh', script_path])
+        with self._lock:
+            self._processes[str(process.pid)] = process
+        return str(process.pid)
+
+    def exit_code(self, job_identifier: str) -> int:
+        with self._lock:
+            process = self._processes.get(job_identifier)
+            if not process:
+                return -1
+            exit_code = process.poll()
+            if exit_code is not None:
+                del self._processes[job_identifier]
+            return exit_code
+
+    def cancel(self, job_identifier: str):
+        kill_process_tree(int(job_identifier))
+
+
+BATCH_SCHEDULERS = {'slurm': SlurmScheduler(), 'local': LocalBatchScheduler()}
+
+
+def get_batch_scheduler():
+    return BATCH_SCHEDULERS[app.config['BATCH_SCHEDULER']]
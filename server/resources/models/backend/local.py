@@ -0,0 +1,71 @@
+import os
+import json
+import threading
+from subprocess import Popen
+from server.database import db
+from server.database.models.execution_job import JobState
+from server.database.models.execution_process import ExecutionProcess
+from server.database.queries.executions import get_execution_processes
+from server.resources.helpers.execution_kill import kill_execution_processes
+from server.resources.models.backend.backend_abstract import Backend
+
+
+class Local(Backend):
+    """Local runs the jobs as child processes of the server. Their completion
+    is signaled by a pidfd where the platform supports it."""
+
+    # Child processes of the running jobs, by execution identifier
+    _processes = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def start(cls, job):
+        with open(job.stdout_path, 'w') as file_stdout, open(
+                job.stderr_path, 'w') as file_stderr:
+            process = Popen(json.loads(job.command),
+                            stdout=file_stdout,
+                            stderr=file_stderr,
+                            cwd=job.working_directory)
+        with cls._lock:
+            cls._processes[job.execution_identifier] = process
+
+        # Insert Popen process in DB
+        job.job_identifier = str(process.pid)
+        job.state = JobState.running
+        db.session.add(
+            ExecutionProcess(execution_identifier=job.execution_identifier,
+                             pid=process.pid,
+                             is_execution=True))
+        db.session.commit()
+
+        # The execution may have been killed before its process was known
+        db.session.refresh(job)
+        if job.kill_requested:
+            cls.kill(job)
+
+    @classmethod
+    def poll(cls, job):
+        with cls._lock:
+            process = cls._processes.get(job.execution_identifier)
+            if not process:
+                # The process was started by a previous run of the server
+                return -1
+            exit_code = process.poll()
+            if exit_code is not None:
+                del cls._processes[job.execution_identifier]
+        return exit_code
+
+    @classmethod
+    def kill(cls, job):
+        kill_execution_processes(
+            get_execution_processes(job.execution_identifier, db.session))
+
+    @classmethod
+    def completion_fd(cls, job):
+        if not hasattr(os, 'pidfd_open') or not job.job_identifier:
+            return None
+        try:
+            return os.pidfd_open(int(job.job_identifier))
+        except OSError:
+            # The process is already complete, or pidfds are not supported
+            return None
@@ -0,0 +1,8 @@
+from server.resources.models.backend.local import Local
+from server.resources.models.backend.worker_agent import WorkerAgent
+from server.resources.models.backend.batch import Batch
+"""
+SUPPORTED_BACKENDS contains all the execution backends that are supported by
+the platform. `EXECUTION_BACKEND` must be one of its keys.
+"""
+SUPPORTED_BACKENDS = {'local': Local, 'worker': WorkerAgent, 'batch': Batch}
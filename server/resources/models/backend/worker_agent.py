@@ -0,0 +1,52 @@
+from server import app
+from server.database import db
+from server.database.models.execution import current_milli_time
+from server.database.models.execution_job import JobState
+from server.database.queries.execution_jobs import finish_queued_job
+from server.resources.models.backend.backend_abstract import Backend
+
+
+class WorkerAgent(Backend):
+    """WorkerAgent leaves the jobs in the database, where worker agents
+    running on other nodes claim and run them (see `server/worker_agent.py`).
+    The nodes must share the data directory with the server, at the same
+    path.
+
+    A job whose worker agent stops reporting it as running for
+    `WORKER_AGENT_HEARTBEAT_TIMEOUT` seconds is considered lost. A job killed
+    before any worker agent claimed it is finished without exit code."""
+
+    @classmethod
+    def start(cls, job):
+        job.state = JobState.queued
+        db.session.commit()
+
+    @classmethod
+    def poll(cls, job):
+        db.session.refresh(job)
+        if job.state == JobState.finished:
+            return job.exit_code if job.exit_code is not None else -1
+        heartbeat_timeout = app.config['WORKER_AGENT_HEARTBEAT_TIMEOUT']
+        if (job.state == JobState.running and heartbeat_timeout and
+                current_milli_time() - job.heartbeat > heartbeat_timeout * 1000):
+            raise RuntimeError(
+                "Worker agent '{}' stopped reporting job {}".format(
+                    job.worker, job.execution_identifier))
+        return None
+
+    @classmethod
+    def kill(cls, job):
+        job.kill_requested = True
+        db.session.commit()
+        # Worker agents do not claim the jobs whose kill was requested, so a
+        # job that is still queued is finished here, unless an agent claimed
+        # it in the meantime and will kill it
+        finish_queued_job(job.execution_identifier, db.session)
+
+    @classmethod
+    def poll_interval(cls):
+        return app.config['WORKER_AGENT_POLL_INTERVAL']
+
+    @classmethod
+    def jobs_survive_restart(cls):
+        return True
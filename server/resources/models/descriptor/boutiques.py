@@ -1,18 +1,76 @@
 import os
+import copy
+import glob
+import json
+import threading
+from typing import Dict
 from boutiques import bosh
-from jsonschema import ValidationError
+from boutiques.util.utils import loadJson
+from boutiques.validator import validate_descriptor
+from boutiques.localExec import addDefaultValues
+from boutiques.invocationSchemaHandler import generateInvocationSchema
+from jsonschema import Draft4Validator, SchemaError, ValidationError
+from jsonschema.exceptions import best_match
 from server import app
-from server.resources.models.descriptor.descriptor_abstract import Descriptor
+from server.resources.models.descriptor.descriptor_abstract import (
+    Descriptor, ResourceRequirements)
+
+
+class InvocationValidators():
+    """InvocationValidators compiles the invocation schema of each Boutiques
+    descriptor once, so that invocations are validated in memory, as
+    `bosh invocation` would. Validators are kept by descriptor path, and
+    compiled again when the descriptor is modified."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # (mtime, descriptor, validator, error) by descriptor path
+        self._validators = {}
+
+    def validate(self, descriptor_path: str,
+                 input_values: Dict) -> (bool, str):
+        mtime = os.stat(descriptor_path).st_mtime_ns
+        with self._lock:
+            entry = self._validators.get(descriptor_path)
+        if not entry or entry[0] != mtime:
+            entry = (mtime, ) + self._compile(descriptor_path)
+            with self._lock:
+                self._validators[descriptor_path] = entry
+
+        _, descriptor, validator, error = entry
+        if error:
+            return False, error
+        error = best_match(
+            validator.iter_errors(
+                addDefaultValues(descriptor, copy.deepcopy(input_values))))
+        if error:
+            return False, error.message
+        return True, None
+
+    def _compile(self, descriptor_path: str):
+        try:
+            descriptor = loadJson(descriptor_path)
+            validate_descriptor(descriptor, descriptor_path=descriptor_path)
+            schema = (descriptor.get("invocation-schema")
+                      or generateInvocationSchema(descriptor))
+            Draft4Validator.check_schema(schema)
+        except (ValidationError, SchemaError) as e:
+            return None, None, e.message
+        return descriptor, Draft4Validator(schema), None
+
+
+INVOCATION_VALIDATORS = InvocationValidators()
 
 
 class Boutiques(Descriptor):
     @classmethod
     def validate(cls, descriptor_path, input_path):
-        try:
-            bosh(["invocation", descriptor_path, "-i", input_path])
-        except ValidationError as e:
-            return False, e.message
-        return True, None
+        return cls.validate_input_values(descriptor_path,
+                                         loadJson(input_path))
+
+    @classmethod
+    def validate_input_values(cls, descriptor_path, input_values):
+        return INVOCATION_VALIDATORS.validate(descriptor_path, input_values)
 
     @classmethod
     def export(cls, input_descriptor_path, output_descriptor_path):
@@ -23,12 +81,13 @@ class Boutiques(Descriptor):
                 "export", "carmin", input_descriptor_path, "--identifier",
                 relative_path, output_descriptor_path
             ])
-        except Exception:
-            return False, "Boutiques descriptor at '{}' is invalid and could not be translated. Please fix it before launching the server.".format(
-                input_descriptor_path)
+        except Exception as e:
+            return False, "Boutiques descriptor at '{}' is invalid and could not be translated: {}".format(
+                input_descriptor_path, e)
 
         if not os.path.exists(output_descriptor_path):
-            return False, "Boutiques descriptor at '{}' was exported without error, but no output file was created."
+            return False, "Boutiques descriptor at '{}' was exported without error, but no output file was created.".format(
+                input_descriptor_path)
         return True, None
 
     @classmethod
@@ -37,3 +96,27 @@ class Boutiques(Descriptor):
             "bosh", "exec", "launch", "-v{0}:{0}".format(user_data_dir),
             descriptor, input_data
         ]
+
+    @classmethod
+    def output_paths(cls, descriptor, input_data):
+        with open(descriptor) as f:
+            list_outputs = {
+                output['id']
+                for output in json.load(f).get('output-files', [])
+                if output.get('list')
+            }
+        # Only the path templates of list outputs are glob patterns
+        return {
+            output_id: path if output_id in list_outputs else glob.escape(path)
+            for output_id, path in bosh(
+                ["evaluate", descriptor, input_data, "output-files/"]).items()
+        }
+
+    @classmethod
+    def requirements(cls, descriptor_path):
+        with open(descriptor_path) as f:
+            suggested_resources = json.load(f).get('suggested-resources', {})
+        return ResourceRequirements(
+            cpu_cores=suggested_resources.get('cpu-cores', 1),
+            ram=suggested_resources.get('ram', 0),
+            walltime=suggested_resources.get('walltime-estimate'))
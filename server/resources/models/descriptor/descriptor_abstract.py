@@ -1,5 +1,33 @@
 from abc import ABC, abstractmethod
 import os
+import json
+import tempfile
+from typing import Dict
+
+
+class ResourceRequirements():
+    """ResourceRequirements are the resources that a descriptor suggests for
+    one of its executions.
+
+    Attributes:
+        cpu_cores (float): Number of CPU cores, 1 if not suggested.
+        ram (float): RAM, in GB, 0 if not suggested.
+        walltime (float): Estimated duration, in seconds, None if not
+        suggested.
+    """
+
+    def __init__(self,
+                 cpu_cores: float = 1,
+                 ram: float = 0,
+                 walltime: float = None):
+        self.cpu_cores = cpu_cores
+        self.ram = ram
+        self.walltime = walltime
+
+    def __eq__(self, other):
+        if isinstance(other, self.__class__):
+            return self.__dict__ == other.__dict__
+        return False
 
 
 class Descriptor(ABC):
@@ -13,6 +41,25 @@ class Descriptor(ABC):
     def validate(cls, descriptor, input_data):
         pass
 
+    @classmethod
+    def validate_input_values(cls, descriptor, input_values):
+        """validate_input_values validates an invocation given as a
+        dictionary. Descriptors can override it to validate the invocation in
+        memory, instead of writing it to a temporary file for `validate`."""
+        with tempfile.NamedTemporaryFile('w', suffix='.json') as f:
+            json.dump(input_values, f)
+            f.flush()
+            return cls.validate(descriptor, f.name)
+
+    @classmethod
+    def validate_all(cls, descriptor, input_values_list):
+        """validate_all validates several invocations of the same descriptor,
+        returning the result of `validate_input_values` for each of them."""
+        return [
+            cls.validate_input_values(descriptor, input_values)
+            for input_values in input_values_list
+        ]
+
     @classmethod
     @abstractmethod
     def export(cls, input_descriptor_path, output_descriptor_path):
@@ -23,6 +70,22 @@ class Descriptor(ABC):
     def execute(cls, user_data_dir, descriptor, input_data):
         pass
 
+    @classmethod
+    def output_paths(cls, descriptor, input_data) -> Dict[str, str]:
+        """output_paths returns the paths of the output files of an
+        invocation, resolved against its inputs, by output parameter id.
+        Relative paths are relative to the execution directory. Paths are glob
+        patterns: those of outputs that are lists of files match any number
+        of files, the others are escaped to match a single file. Descriptors
+        that cannot resolve their outputs return no paths."""
+        return {}
+
+    @classmethod
+    def requirements(cls, descriptor_path) -> ResourceRequirements:
+        """requirements returns the resources suggested by the descriptor.
+        Descriptors that cannot suggest resources use the defaults."""
+        return ResourceRequirements()
+
     @classmethod
     def descriptor_factory_from_type(cls, typ):
         from server.resources.models.descriptor.supported_descriptors import SUPPORTED_DESCRIPTORS
@@ -47,6 +47,8 @@ class ExecutionSchema(Schema):
     error_code = fields.Int(dump_to='errorCode', load_from='errorCode')
     start_date = fields.Int(dump_to='startDate', load_from='startDate')
     end_date = fields.Int(dump_to='endDate', load_from='endDate')
+    queue_position = fields.Int(
+        dump_only=True, dump_to='queuePosition', load_from='queuePosition')
 
     @post_load
     def to_model(self, data):
@@ -77,7 +79,8 @@ class Execution():
                  study_identifier: str = None,
                  error_code: int = None,
                  start_date: int = None,
-                 end_date: int = None):
+                 end_date: int = None,
+                 queue_position: int = None):
 
         self.identifier = identifier
         self.name = name
@@ -90,3 +93,4 @@ class Execution():
         self.error_code = error_code
         self.start_date = start_date
         self.end_date = end_date
+        self.queue_position = queue_position
@@ -0,0 +1,120 @@
+from typing import Dict, List
+from marshmallow import Schema, fields, post_load, post_dump, validate
+from marshmallow_enum import EnumField
+from server.resources.models.execution import ExecutionStatus
+from server.resources.models.error_code_and_message import (
+    ErrorCodeAndMessage, ErrorCodeAndMessageSchema)
+
+
+class ExecutionBatchSchema(Schema):
+    SKIP_VALUES = list([None])
+
+    class Meta:
+        ordered = True
+
+    name = fields.Str(required=True)
+    pipeline_identifier = fields.Str(required=True,
+                                     dump_to='pipelineIdentifier',
+                                     load_from='pipelineIdentifier')
+    timeout = fields.Int()
+    study_identifier = fields.Str(dump_to='studyIdentifier',
+                                  load_from='studyIdentifier')
+    input_values = fields.List(fields.Dict(),
+                               required=True,
+                               validate=validate.Length(min=1),
+                               dump_to='inputValues',
+                               load_from='inputValues')
+    play = fields.Bool()
+    priority = fields.Int(validate=validate.Range(min=0))
+
+    @post_load
+    def to_model(self, data):
+        return ExecutionBatch(**data)
+
+    @post_dump
+    def remove_skip_values(self, data):
+        return {
+            key: value
+            for key, value in data.items() if value not in self.SKIP_VALUES
+        }
+
+
+class ExecutionBatch():
+    """ExecutionBatch creates one execution of a pipeline for each of the
+    input values in `input_values`. Each execution is named after `name`,
+    followed by the index of its input values.
+
+    Attributes:
+        name (str):
+        pipeline_identifier (str):
+        timeout (int):
+        study_identifier (str):
+        input_values (List[Dict]):
+        play (bool): Whether the executions are played once created.
+        priority (int): Queue priority of the played executions.
+    """
+    schema = ExecutionBatchSchema()
+
+    def __init__(self,
+                 name: str = None,
+                 pipeline_identifier: str = None,
+                 timeout: int = None,
+                 study_identifier: str = None,
+                 input_values: List[Dict] = None,
+                 play: bool = False,
+                 priority: int = 0):
+        self.name = name
+        self.pipeline_identifier = pipeline_identifier
+        self.timeout = timeout
+        self.study_identifier = study_identifier
+        self.input_values = input_values
+        self.play = play
+        self.priority = priority
+
+
+class ExecutionBatchItemSchema(Schema):
+    SKIP_VALUES = list([None])
+
+    class Meta:
+        ordered = True
+
+    index = fields.Int(required=True)
+    identifier = fields.Str()
+    status = EnumField(ExecutionStatus)
+    error = fields.Nested(ErrorCodeAndMessageSchema)
+
+    @post_load
+    def to_model(self, data):
+        return ExecutionBatchItem(**data)
+
+    @post_dump
+    def remove_skip_values(self, data):
+        return {
+            key: value
+            for key, value in data.items() if value not in self.SKIP_VALUES
+        }
+
+
+class ExecutionBatchItem():
+    """ExecutionBatchItem reports what became of one of the input values of a
+    batch.
+
+    Attributes:
+        index (int): 0-based index of the input values in the batch.
+        identifier (str): Identifier of the execution, None if none was
+        created.
+        status (ExecutionStatus): Status of the execution.
+        error (ErrorCodeAndMessage): Why the execution could not be created
+        or played, if it could not.
+    """
+    schema = ExecutionBatchItemSchema()
+
+    def __init__(self,
+                 index: int = None,
+                 identifier: str = None,
+                 status: ExecutionStatus = None,
+                 error: ErrorCodeAndMessage = None):
+        self.index = index
+        self.identifier = identifier
+        self.status = status
+        self.error = error
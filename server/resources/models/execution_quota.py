@@ -0,0 +1,67 @@
+from marshmallow import (Schema, fields, post_load, post_dump, validate,
+                         validates, ValidationError)
+
+
+class ExecutionQuotaSchema(Schema):
+    SKIP_VALUES = list([None])
+
+    class Meta:
+        ordered = True
+
+    max_running_executions = fields.Int(
+        validate=validate.Range(min=0),
+        dump_to='maxRunningExecutions',
+        load_from='maxRunningExecutions')
+    cpu_cores = fields.Float(
+        validate=validate.Range(min=0),
+        dump_to='cpuCores',
+        load_from='cpuCores')
+    ram = fields.Float(validate=validate.Range(min=0))
+    weight = fields.Float()
+
+    @validates('weight')
+    def validate_weight(self, weight):
+        if weight <= 0:
+            raise ValidationError('Weight must be greater than 0.')
+
+    @post_load
+    def to_model(self, data):
+        return ExecutionQuota(**data)
+
+    @post_dump
+    def remove_skip_values(self, data):
+        return {
+            key: value
+            for key, value in data.items() if value not in self.SKIP_VALUES
+        }
+
+
+class ExecutionQuota():
+    """ExecutionQuota limits the executions that a user can run at the same
+    time. Unset limits are not enforced.
+
+    Attributes:
+        max_running_executions (int): Maximum number of running executions.
+        cpu_cores (float): Maximum number of CPU cores used by the running
+        executions, as suggested by their descriptors.
+        ram (float): Maximum RAM, in GB, used by the running executions, as
+        suggested by their descriptors.
+        weight (float): Share of the execution slots given to the user when
+        several users are waiting for one.
+    """
+    schema = ExecutionQuotaSchema()
+
+    def __init__(self,
+                 max_running_executions: int = None,
+                 cpu_cores: float = None,
+                 ram: float = None,
+                 weight: float = None):
+        self.max_running_executions = max_running_executions
+        self.cpu_cores = cpu_cores
+        self.ram = ram
+        self.weight = weight
+
+    def __eq__(self, other):
+        if isinstance(other, self.__class__):
+            return self.__dict__ == other.__dict__
+        return False
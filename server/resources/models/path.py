@@ -1,10 +1,12 @@
 import os
+import stat
 from pathlib import PurePath
 import mimetypes
 from server import app
 from flask_restful import request
 from marshmallow import Schema, fields, post_load, post_dump
 from server.resources.helpers.execution import extract_execution_identifier_from_path
+from server.resources.helpers.directory_size import DIRECTORY_SIZE_INDEX
 
 
 class PathSchema(Schema):
@@ -80,44 +82,45 @@ class Path():
         Path object based on the associated file or directory.
         """
 
-        is_directory = os.path.isdir(absolute_path_to_resource)
+        return Path.object_from_stat(absolute_path_to_resource,
+                                     os.stat(absolute_path_to_resource))
+
+    @classmethod
+    def object_from_dir_entry(cls, entry):
+        """object_from_dir_entry returns the Path object of a directory entry
+        yielded by `scandir`. On most platforms, the stat result is cached by
+        the entry, so that listing a directory costs a single stat per entry.
+        """
+        return Path.object_from_stat(entry.path, entry.stat())
+
+    @classmethod
+    def object_from_stat(cls, absolute_path_to_resource: str,
+                         st: os.stat_result):
+        """object_from_stat returns the Path object of the resource at
+        `absolute_path_to_resource`, using its already known stat result
+        instead of querying the file system again."""
+        is_directory = stat.S_ISDIR(st.st_mode)
         mime_type = None
 
         if not is_directory:
             mime_type, _ = mimetypes.guess_type(absolute_path_to_resource)
 
-        # TODO: Add execution_id to Path object
         execution_id = extract_execution_identifier_from_path(
-            absolute_path_to_resource)
+            absolute_path_to_resource, is_directory)
 
         rel_path = PurePath(
             os.path.relpath(absolute_path_to_resource,
                             app.config['DATA_DIRECTORY'])).as_posix()
 
+        if is_directory:
+            size = DIRECTORY_SIZE_INDEX.get(absolute_path_to_resource, st)
+        else:
+            size = st.st_size
+
         return Path(
             platform_path='{}path/{}'.format(request.url_root, rel_path),
-            last_modification_date=os.path.getmtime(absolute_path_to_resource),
-            is_directory=os.path.isdir(absolute_path_to_resource),
-            size=Path.get_path_size(absolute_path_to_resource, is_directory),
+            last_modification_date=st.st_mtime,
+            is_directory=is_directory,
+            size=size,
             mime_type=mime_type,
             execution_id=execution_id)
-
-    @classmethod
-    def get_path_size(cls, absolute_path: str, is_dir: bool) -> int:
-        """get_path_size returns the size of the resource.
-
-        Attributes:
-            absolute_path (str): Absolute path to the resource.
-            is_dir (bool): True if the resource is a directory.
-        Returns:
-            (int): Size of the resource.
-        """
-        size = 0
-        if is_dir:
-            for dirpath, _, filenames in os.walk(absolute_path):
-                for f in filenames:
-                    fp = os.path.join(dirpath, f)
-                    size += os.path.getsize(fp)
-        else:
-            size = os.path.getsize(absolute_path)
-        return size
@@ -0,0 +1,67 @@
+from typing import List
+from marshmallow import Schema, fields, post_load, post_dump
+
+
+class UploadSessionSchema(Schema):
+    SKIP_VALUES = list([None])
+
+    class Meta:
+        ordered = True
+
+    identifier = fields.Str(dump_only=True)
+    platform_path = fields.Str(
+        required=True, dump_to='platformPath', load_from='platformPath')
+    size = fields.Int(required=True, validate=lambda s: s >= 0)
+    md5 = fields.Str()
+    committed_ranges = fields.List(
+        fields.List(fields.Int()),
+        dump_only=True,
+        dump_to='committedRanges')
+    is_complete = fields.Bool(dump_only=True, dump_to='isComplete')
+
+    @post_load
+    def to_model(self, data):
+        return UploadSession(**data)
+
+    @post_dump
+    def remove_skip_values(self, data):
+        """remove_skip_values removes all values specified in the
+        SKIP_VALUES set from appearing in the 'dumped' JSON.
+        """
+        return {
+            key: value
+            for key, value in data.items() if value not in self.SKIP_VALUES
+        }
+
+
+class UploadSession():
+    """UploadSession describes a resumable upload, sent in byte ranges.
+
+    Attributes:
+        identifier (str): Identifier of the upload session.
+        platform_path (str): The url where the uploaded file will be found.
+        size (int): Size of the complete file, in bytes.
+        md5 (str): Expected md5 of the complete file, checked when the upload
+        is finalized.
+        committed_ranges (List[List[int]]): Byte ranges, as [first, last]
+        inclusive offsets, that were received by the server.
+        is_complete (bool): True if every byte of the file was received.
+    """
+    schema = UploadSessionSchema()
+
+    def __init__(self,
+                 platform_path: str = None,
+                 size: int = None,
+                 md5: str = None,
+                 identifier: str = None,
+                 committed_ranges: List[List[int]] = None,
+                 is_complete: bool = None):
+        self.identifier = identifier
+        self.platform_path = platform_path
+        self.size = size
+        self.md5 = md5
+        self.committed_ranges = committed_ranges
+        self.is_complete = is_complete
+
+    def __eq__(self, other):
+        return self.__dict__ == other.__dict__
@@ -8,16 +8,24 @@ from server.common.error_codes_and_messages import (
     ErrorCodeAndMessageFormatter, ErrorCodeAndMessageAdditionalDetails,
     INVALID_MODEL_PROVIDED, UNAUTHORIZED, INVALID_PATH, INVALID_ACTION,
     MD5_ON_DIR, LIST_ACTION_ON_FILE, ACTION_REQUIRED, UNEXPECTED_ERROR,
-    PATH_IS_DIRECTORY, INVALID_REQUEST, PATH_DOES_NOT_EXIST)
+    PATH_IS_DIRECTORY, INVALID_REQUEST, PATH_DOES_NOT_EXIST,
+    UNSUPPORTED_COMPRESSION, UNSUPPORTED_CHECKSUM_ALGORITHM, CHECKSUM_ON_DIR,
+    INVALID_QUERY_PARAMETER)
 from .models.upload_data import UploadDataSchema
 from .models.boolean_response import BooleanResponse
 from .models.path import Path as PathModel
 from .models.path import PathSchema
+from .models.path_checksum import PathChecksum
 from .decorators import login_required, unmarshal_request
 from .helpers.path import (is_safe_for_delete, upload_file, upload_archive,
-                           create_directory, generate_md5, is_safe_for_put,
-                           is_safe_for_get, make_absolute, get_content,
-                           get_path_list)
+                           upload_stream, create_directory, generate_md5,
+                           is_safe_for_put, is_safe_for_get, make_absolute,
+                           get_content, get_path_list, LIST_SORT_KEYS)
+from .helpers.executions import query_converter
+from .helpers.content import supported_archive_compressions
+from .helpers.checksums import (CHECKSUM_ALGORITHMS, get_checksum,
+                                forget_checksums)
+from .helpers.directory_size import DIRECTORY_SIZE_INDEX
 
 
 class Path(Resource):
@@ -48,7 +56,16 @@ class Path(Resource):
             return marshal(ACTION_REQUIRED), 400
 
         if action == 'content':
-            return get_content(requested_data_path)
+            # Directories are sent as a tar archive, compressed with gzip
+            # unless another compression is requested
+            compression = request.args.get(
+                'compression', default='gzip', type=str).lower()
+            if compression not in supported_archive_compressions():
+                error = ErrorCodeAndMessageFormatter(
+                    UNSUPPORTED_COMPRESSION, compression,
+                    ", ".join(supported_archive_compressions()))
+                return marshal(error), 400
+            return get_content(requested_data_path, compression)
         elif action == 'properties':
             path = PathModel.object_from_pathname(requested_data_path)
             return marshal(path)
@@ -58,27 +75,74 @@ class Path(Resource):
         elif action == 'list':
             if not os.path.isdir(requested_data_path):
                 return marshal(LIST_ACTION_ON_FILE), 400
-            directory_list = get_path_list(complete_path)
+            sort = request.args.get('sort', type=str)
+            if sort and sort.lstrip('-') not in LIST_SORT_KEYS:
+                error = ErrorCodeAndMessageFormatter(INVALID_QUERY_PARAMETER,
+                                                     sort, 'sort')
+                return marshal(error), 400
+            directory_list = get_path_list(
+                complete_path,
+                offset=request.args.get('offset', type=query_converter),
+                limit=request.args.get('limit', type=query_converter),
+                sort=sort,
+                depth=request.args.get(
+                    'depth', default=1, type=query_converter) or 1)
             return marshal(directory_list)
         elif action == 'md5':
             if os.path.isdir(requested_data_path):
                 return marshal(MD5_ON_DIR), 400
             md5 = generate_md5(requested_data_path)
             return marshal(md5)
+        elif action == 'checksum':
+            if os.path.isdir(requested_data_path):
+                return marshal(CHECKSUM_ON_DIR), 400
+            algorithm = request.args.get(
+                'algorithm', default='md5', type=str).lower()
+            if algorithm not in CHECKSUM_ALGORITHMS:
+                error = ErrorCodeAndMessageFormatter(
+                    UNSUPPORTED_CHECKSUM_ALGORITHM, algorithm,
+                    ", ".join(sorted(CHECKSUM_ALGORITHMS)))
+                return marshal(error), 400
+            checksum = get_checksum(requested_data_path, algorithm)
+            return marshal(PathChecksum(algorithm, checksum))
         else:
             return marshal(INVALID_ACTION), 400
 
     @login_required
     def put(self, user, complete_path: str = ''):
-        data = request.data
         requested_data_path = make_absolute(complete_path)
 
         if not is_safe_for_put(requested_data_path, user):
             return marshal(INVALID_PATH), 401
 
-        if request.headers.get(
-                'Content-Type',
-                default='').lower() == 'application/carmin+json' and data:
+        content_type = request.headers.get('Content-Type', default='').lower()
+        if content_type == 'application/octet-stream':
+            # Request data is the raw file content. It is streamed to disk
+            # instead of being loaded in memory. An interrupted upload can be
+            # resumed by sending the rest of the file with the 'offset' query
+            # parameter.
+            if os.path.isdir(requested_data_path):
+                error = ErrorCodeAndMessageFormatter(PATH_IS_DIRECTORY,
+                                                     complete_path)
+                return marshal(error), 400
+            # An invalid offset must not be taken as a new upload, which
+            # would overwrite the file
+            offset = request.args.get('offset')
+            if offset is not None:
+                try:
+                    offset = query_converter(offset)
+                except ValueError:
+                    error = ErrorCodeAndMessageFormatter(
+                        INVALID_QUERY_PARAMETER, offset, 'offset')
+                    return marshal(error), 400
+            path, error = upload_stream(request.stream, requested_data_path,
+                                        request.args.get('md5'), offset)
+            if error:
+                return marshal(error), 400
+            return marshal(path), 201
+
+        data = request.data
+        if content_type == 'application/carmin+json' and data:
             # Request data contains base64 encoding of file or archive
             data = request.get_json(force=True, silent=True)
             model, error = UploadDataSchema().load(data)
@@ -107,6 +171,7 @@ class Path(Resource):
             try:
                 with open(requested_data_path, 'w') as f:
                     f.write(data.decode('utf-8', errors='ignore'))
+                DIRECTORY_SIZE_INDEX.invalidate(requested_data_path)
                 return marshal(
                     PathModel.object_from_pathname(requested_data_path)), 201
             except OSError:
@@ -137,4 +202,6 @@ class Path(Resource):
                 return marshal(PATH_DOES_NOT_EXIST), 400
             except OSError:
                 return marshal(UNEXPECTED_ERROR), 500
+        DIRECTORY_SIZE_INDEX.invalidate(requested_data_path)
+        forget_checksums(requested_data_path)
         return Response(status=204)
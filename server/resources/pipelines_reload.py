@@ -0,0 +1,19 @@
+import os
+from flask_restful import Resource
+from server import app
+from .decorators import admin_only
+from .helpers.pipelines import reload_pipelines
+
+
+class PipelinesReload(Resource):
+    @admin_only
+    def post(self, user):
+        """Exports the descriptors added or modified since the last export,
+        and returns the errors of the descriptors that could not be exported,
+        by path relative to the pipeline directory."""
+        errors = reload_pipelines()
+        return {
+            os.path.relpath(descriptor_path,
+                            app.config['PIPELINE_DIRECTORY']): error
+            for descriptor_path, error in errors.items()
+        }
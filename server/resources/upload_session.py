@@ -0,0 +1,81 @@
+from flask_restful import Resource, request
+from server.database import db
+from server.database.models.upload_session import UploadSessionRange
+from server.database.queries.upload_sessions import get_upload_session_ranges
+from server.common.error_codes_and_messages import (
+    ErrorCodeAndMessageFormatter, INVALID_CONTENT_RANGE,
+    UPLOAD_RANGE_TRUNCATED, UNEXPECTED_ERROR)
+from .models.upload_session import UploadSessionSchema
+from .decorators import login_required, marshal_response
+from .helpers.upload_sessions import (get_user_upload_session,
+                                      get_upload_session_file_path,
+                                      delete_upload_session,
+                                      parse_content_range, write_range,
+                                      upload_session_as_model)
+
+
+class UploadSession(Resource):
+
+    @login_required
+    @marshal_response(UploadSessionSchema())
+    def get(self, user, upload_identifier):
+        session_db, error = get_user_upload_session(upload_identifier, user,
+                                                    db.session)
+        if error:
+            return error
+        ranges = get_upload_session_ranges(upload_identifier, db.session)
+        return upload_session_as_model(session_db, request.url_root, ranges)
+
+    @login_required
+    @marshal_response(UploadSessionSchema())
+    def put(self, user, upload_identifier):
+        """The request body is the raw content of the byte range described by
+        the mandatory 'Content-Range: bytes <first>-<last>/<size>' header.
+        Ranges may be sent in any order, and sending a range again overwrites
+        it.
+        """
+        session_db, error = get_user_upload_session(upload_identifier, user,
+                                                    db.session)
+        if error:
+            return error
+
+        content_range = request.headers.get('Content-Range')
+        byte_range = parse_content_range(content_range, session_db.size)
+        if not byte_range:
+            return ErrorCodeAndMessageFormatter(INVALID_CONTENT_RANGE,
+                                                content_range, session_db.size)
+        start, end = byte_range
+
+        try:
+            written = write_range(
+                request.stream,
+                get_upload_session_file_path(user.username, upload_identifier),
+                start, end)
+        except OSError:
+            return UNEXPECTED_ERROR
+
+        # Only the bytes that actually reached the file are committed, so that
+        # an interrupted range can be resumed from where it stopped.
+        if written:
+            db.session.add(
+                UploadSessionRange(session_identifier=upload_identifier,
+                                   start=start,
+                                   end=start + written))
+            db.session.commit()
+        if written != end - start:
+            return ErrorCodeAndMessageFormatter(UPLOAD_RANGE_TRUNCATED,
+                                                written, end - start)
+
+        ranges = get_upload_session_ranges(upload_identifier, db.session)
+        return upload_session_as_model(session_db, request.url_root, ranges)
+
+    @login_required
+    @marshal_response()
+    def delete(self, user, upload_identifier):
+        session_db, error = get_user_upload_session(upload_identifier, user,
+                                                    db.session)
+        if error:
+            return error
+
+        delete_upload_session(session_db, db.session)
+        db.session.commit()
@@ -0,0 +1,43 @@
+import os
+from flask_restful import Resource
+from server.database import db
+from server.database.queries.upload_sessions import get_upload_session_ranges
+from server.common.error_codes_and_messages import (
+    ErrorCodeAndMessageFormatter, INVALID_PATH, PATH_IS_DIRECTORY)
+from .models.path import PathSchema
+from .decorators import login_required, marshal_response
+from .helpers.path import make_absolute, is_safe_for_put
+from .helpers.upload_sessions import (get_user_upload_session,
+                                      finalize_upload_session_file)
+
+
+class UploadSessionFinalize(Resource):
+
+    @login_required
+    @marshal_response(PathSchema())
+    def put(self, user, upload_identifier):
+        session_db, error = get_user_upload_session(upload_identifier, user,
+                                                    db.session)
+        if error:
+            return error
+
+        # The destination is checked again, as it may have changed since the
+        # session was created.
+        requested_data_path = make_absolute(session_db.relative_path)
+        if not is_safe_for_put(requested_data_path, user):
+            return INVALID_PATH
+        if os.path.isdir(requested_data_path):
+            return ErrorCodeAndMessageFormatter(PATH_IS_DIRECTORY,
+                                                session_db.relative_path)
+
+        ranges = get_upload_session_ranges(upload_identifier, db.session)
+        path, error = finalize_upload_session_file(session_db, ranges,
+                                                   requested_data_path)
+        if error:
+            return error
+
+        for r in ranges:
+            db.session.delete(r)
+        db.session.delete(session_db)
+        db.session.commit()
+        return path
@@ -0,0 +1,61 @@
+import os
+from flask_restful import Resource, request
+from server.database import db
+from server.database.models.upload_session import UploadSession as UploadSessionDB
+from server.common.error_codes_and_messages import (
+    ErrorCodeAndMessageFormatter, INVALID_PATH, PATH_IS_DIRECTORY)
+from .models.upload_session import UploadSessionSchema
+from .decorators import login_required, unmarshal_request, marshal_response
+from .helpers.path import make_absolute, is_safe_for_put
+from .helpers.upload_sessions import (relative_path_from_platform_path,
+                                      check_upload_session_size,
+                                      create_upload_session_file,
+                                      purge_upload_sessions,
+                                      upload_session_as_model)
+
+
+class UploadSessions(Resource):
+    """Start a resumable upload. The file is then sent in byte ranges, in any
+    order and over as many requests as needed, with PUT /uploads/{id}, and
+    moved to its platform path with PUT /uploads/{id}/finalize.
+    """
+
+    @login_required
+    @unmarshal_request(UploadSessionSchema())
+    @marshal_response(UploadSessionSchema())
+    def post(self, model, user):
+        relative_path = relative_path_from_platform_path(
+            request.url_root, model.platform_path)
+        if relative_path is None:
+            return INVALID_PATH
+
+        requested_data_path = make_absolute(relative_path)
+        if not is_safe_for_put(requested_data_path, user):
+            return INVALID_PATH
+        if os.path.isdir(requested_data_path):
+            return ErrorCodeAndMessageFormatter(PATH_IS_DIRECTORY,
+                                                relative_path)
+
+        # Expired sessions no longer count against the size limit
+        purge_upload_sessions(db.session)
+        error = check_upload_session_size(user.username, model.size,
+                                          db.session)
+        if error:
+            return error
+
+        session_db = UploadSessionDB(
+            creator_username=user.username,
+            relative_path=relative_path,
+            size=model.size,
+            md5=model.md5.lower() if model.md5 else None)
+        db.session.add(session_db)
+        db.session.commit()
+
+        error = create_upload_session_file(user.username,
+                                           session_db.identifier, model.size)
+        if error:
+            db.session.delete(session_db)
+            db.session.commit()
+            return error
+
+        return upload_session_as_model(session_db, request.url_root, [])
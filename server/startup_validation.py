@@ -12,15 +12,26 @@ from .resources.models.platform_properties import PlatformPropertiesSchema
 from server import app
 from server.database import db
 from .database.models.user import User, Role
-from .database.models.execution import Execution, ExecutionStatus
+from .database.models.execution import (Execution, ExecutionStatus,
+                                        current_milli_time)
 from .database.models.execution_process import ExecutionProcess
-from .database.queries.executions import get_execution_processes
+from .database.models.execution_queue_entry import ExecutionQueueEntry
+from .database.queries.executions import (get_execution,
+                                          get_execution_queue_entry)
+from .database.queries.execution_jobs import get_execution_job
 from server.resources.helpers.pipelines import export_all_pipelines
+from server.resources.helpers.pipeline_catalog import PIPELINE_CATALOG
 from server.common.error_codes_and_messages import PATH_EXISTS
 from server.resources.models.descriptor.supported_descriptors import SUPPORTED_DESCRIPTORS
+from server.resources.models.backend.supported_backends import SUPPORTED_BACKENDS
+from server.resources.models.backend.batch import BATCH_SCHEDULERS
 from server.platform_properties import PLATFORM_PROPERTIES
-from server.resources.helpers.execution_kill import (get_process_alive_count,
-                                                     kill_execution_processes)
+from server.resources.helpers.execution_quotas import load_execution_quotas
+from server.resources.helpers.execution_kill import kill_execution_processes
+from server.resources.helpers.execution_play import kill_execution_job
+from server.resources.helpers.execution_supervisor import EXECUTION_SUPERVISOR
+from server.resources.helpers.upload_sessions import purge_upload_sessions
+from server.resources.models.backend.backend_abstract import Backend
 
 
 def start_up():
@@ -28,8 +39,11 @@ def start_up():
     pipeline_and_data_directory_present()
     export_pipelines()
     properties_validation()
+    execution_quotas_validation()
+    execution_backend_validation()
     find_or_create_admin()
     purge_executions()
+    purge_upload_sessions(db.session)
 
 
 def properties_validation(config_data: Dict = None) -> bool:
@@ -56,6 +70,29 @@ def properties_validation(config_data: Dict = None) -> bool:
     return True
 
 
+def execution_quotas_validation():
+    """Loads the execution quotas file, if any. Raises EnvironmentError if it
+    is invalid."""
+    quotas_path = app.config.get('EXECUTION_QUOTAS_FILE')
+    if quotas_path:
+        app.config['EXECUTION_QUOTAS'] = load_execution_quotas(quotas_path)
+
+
+def execution_backend_validation():
+    """Checks that the execution backend and batch scheduler are supported.
+    If not, raise EnvironmentError"""
+    if app.config['EXECUTION_BACKEND'] not in SUPPORTED_BACKENDS:
+        raise EnvironmentError(
+            "Unsupported execution backend '{}'. Supported backends are: {}".
+            format(app.config['EXECUTION_BACKEND'],
+                   ', '.join(SUPPORTED_BACKENDS)))
+    if app.config['BATCH_SCHEDULER'] not in BATCH_SCHEDULERS:
+        raise EnvironmentError(
+            "Unsupported batch scheduler '{}'. Supported schedulers are: {}".
+            format(app.config['BATCH_SCHEDULER'],
+                   ', '.join(BATCH_SCHEDULERS)))
+
+
 def pipeline_and_data_directory_present():
     """Checks if Pipeline and Data directories were specified at launch. If not,
     raise EnvironmentError
@@ -105,10 +142,18 @@ def generate_admin_password(password_length=16):
 
 
 def export_pipelines():
-    success, error = export_all_pipelines()
+    """Exports the descriptors that changed since the last start up. The
+    descriptors that cannot be exported are reported, and their pipelines are
+    not updated, but the server still starts."""
+    errors = export_all_pipelines()
+    for descriptor_path, error in sorted(errors.items()):
+        print(
+            "Could not export descriptor at {}: {}".format(
+                descriptor_path, error),
+            file=sys.stderr,
+            flush=True)
 
-    if not success:
-        raise EnvironmentError(error)
+    PIPELINE_CATALOG.load()
 
 
 def create_dirs_for_supported_descriptors():
@@ -125,42 +170,22 @@ def create_dirs_for_supported_descriptors():
 
 
 def purge_executions():
-    # Let's get all executions running
+    # The jobs of the remote execution backends kept running during the
+    # restart, and are watched again by the execution supervisor. The jobs of
+    # the local backend did not survive it, so nothing would ever update their
+    # executions. We kill them and mark the executions as 'Unknown'.
     executions = db.session.query(Execution).filter_by(
-        status=ExecutionStatus.Running)
+        status=ExecutionStatus.Running).all()
 
     for e in executions:
-        # Look at if it has some processes linked to it
-        execution_processes = get_execution_processes(e.identifier, db.session)
-
-        if not execution_processes:  # Most probably due to the execution being in termination process
-            continue
-
-        actual_execution_processes = [
-            e for e in execution_processes if e.is_execution
-        ]
-        execution_parent_processes = [
-            e for e in execution_processes if not e.is_execution
-        ]
-
-        process_still_alive_count = 0
-        process_still_alive_count += get_process_alive_count(
-            actual_execution_processes)
-        process_still_alive_count += get_process_alive_count(
-            execution_parent_processes)
-
-        # The execution is going as expected
-        if process_still_alive_count == len(execution_processes):
+        job = get_execution_job(e.identifier, db.session)
+        backend = job and Backend.backend_factory_from_name(job.backend)
+        if backend and backend.jobs_survive_restart():
+            EXECUTION_SUPERVISOR.adopt(e.identifier)
             continue
-
-        # The execution is supposed to be still running but some of the processes it launched are no more active
-        # We will mark the execution as "ExecutionFailed" and kill the remaining processes
-        kill_execution_processes(execution_parent_processes)
-        kill_execution_processes(actual_execution_processes)
-
+        kill_execution_job(e.identifier)
         e.status = ExecutionStatus.Unknown
-        for execution_process in execution_processes:
-            db.session.delete(execution_process)
+        e.end_date = current_milli_time()
         db.session.commit()
 
     # Now that the executions marked as 'Running' have been purged, let's clean up the remaining execution processes
@@ -170,5 +195,20 @@ def purge_executions():
         db.session.delete(process)
         db.session.commit()
 
+    # Queued executions are kept, and will be started by the execution
+    # scheduler. Every 'Ready' execution must have a queue entry, and every
+    # queue entry must belong to a 'Ready' execution.
+    for queue_entry in db.session.query(ExecutionQueueEntry):
+        execution = get_execution(queue_entry.execution_identifier,
+                                  db.session)
+        if not execution or execution.status != ExecutionStatus.Ready:
+            db.session.delete(queue_entry)
+    for e in db.session.query(Execution).filter_by(
+            status=ExecutionStatus.Ready):
+        if not get_execution_queue_entry(e.identifier, db.session):
+            db.session.add(
+                ExecutionQueueEntry(execution_identifier=e.identifier))
+    db.session.commit()
+
 
 from server.resources.helpers.register import register_user
@@ -3,6 +3,8 @@ from server.server_helper import create_app
 from server.api import declare_api
 from server.database import db as _db
 from server.config import TestConfig
+from server.resources.helpers.authenticate import API_KEY_CACHE
+from server.resources.helpers.directory_size import DIRECTORY_SIZE_INDEX
 
 
 @pytest.yield_fixture(autouse=True, scope='session')
@@ -20,6 +22,8 @@ def app():
 def db(app):
     _db.drop_all()
     _db.create_all()
+    API_KEY_CACHE.clear()
+    DIRECTORY_SIZE_INDEX.clear()
     yield _db
     _db.drop_all()
 
@@ -0,0 +1,73 @@
+import pytest
+from sqlalchemy import create_engine, inspect, select
+from sqlalchemy.exc import OperationalError
+from server.database import db
+from server.database.models.execution import Execution
+from server.database.models.schema_migration import SchemaMigration
+from server.database.migrations import (migrate, Migration, MIGRATIONS,
+                                        MIGRATION_ATTEMPTS)
+
+
+@pytest.fixture
+def engine(tmpdir):
+    engine = create_engine('sqlite:///{}'.format(tmpdir.join('app.db')))
+    db.Model.metadata.create_all(engine)
+    return engine
+
+
+def execution_indexes(engine) -> set:
+    return {index['name'] for index in inspect(engine).get_indexes('execution')}
+
+
+class TestMigrations():
+    def test_migrate_existing_database(self, engine):
+        # The execution table of a database created before its indexes
+        for index in Execution.__table__.indexes:
+            index.drop(engine)
+
+        assert migrate(engine) == [m.version for m in MIGRATIONS]
+        assert execution_indexes(engine) == {
+            index.name
+            for index in Execution.__table__.indexes
+        }
+        assert migrate(engine) == []
+
+    def test_migrate_new_database(self, engine):
+        assert migrate(engine) == [m.version for m in MIGRATIONS]
+        assert execution_indexes(engine) == {
+            index.name
+            for index in Execution.__table__.indexes
+        }
+
+    def test_migration_applied_concurrently(self, engine):
+        migrate(engine)
+        migration_table = SchemaMigration.__table__
+
+        def upgrade(connection):
+            # Another server process applies the migration in the meantime
+            with engine.begin() as other_connection:
+                other_connection.execute(
+                    'CREATE INDEX ix_execution_name ON execution (name)')
+                other_connection.execute(migration_table.insert().values(
+                    version=3, description="Index the executions by name"))
+            connection.execute(
+                'CREATE INDEX ix_execution_name ON execution (name)')
+
+        migration = Migration(3, "Index the executions by name", upgrade)
+        assert migrate(engine, [migration]) == []
+        assert [
+            version for version, in engine.execute(
+                select([migration_table.c.version]))
+        ] == [m.version for m in MIGRATIONS] + [3]
+
+    def test_migration_fails(self, engine):
+        attempts = []
+
+        def upgrade(connection):
+            attempts.append(connection)
+            connection.execute('CREATE INDEX ix_missing ON missing (name)')
+
+        with pytest.raises(OperationalError):
+            migrate(engine, [Migration(3, "Index a missing table", upgrade)])
+        assert len(attempts) == MIGRATION_ATTEMPTS
+        assert migrate(engine) == [m.version for m in MIGRATIONS]
@@ -8,6 +8,7 @@ from server.resources.models.authentication import AuthenticationSchema
 from server.resources.models.error_code_and_message import ErrorCodeAndMessageSchema
 from server.common.error_codes_and_messages import INVALID_USERNAME_OR_PASSWORD, INVALID_MODEL_PROVIDED
 from server.test.fakedata.users import standard_user
+from server.resources.helpers.authenticate import API_KEY_CACHE
 
 
 @pytest.fixture(autouse=True)
@@ -104,3 +105,32 @@ class TestAuthenticate():
         assert len(ecam.error_detail) == 2
         assert "username" in ecam.error_detail
         assert "password" in ecam.error_detail
+
+    def test_api_key_cached(self, test_client):
+        for _ in range(2):
+            response = test_client.get(
+                "/executions/count",
+                headers={"apiKey": standard_user().api_key})
+            assert response.status_code == 200
+
+        stats = API_KEY_CACHE.stats()
+        assert stats["misses"] == 1
+        assert stats["hits"] == 1
+
+    def test_api_key_cache_invalidated_on_authenticate(self, test_client,
+                                                       test_user, session):
+        user = session.query(User).filter_by(
+            username=standard_user().username).first()
+        old_api_key = user.api_key
+        test_client.get(
+            "/executions/count", headers={"apiKey": old_api_key})
+
+        user.api_key = None
+        session.commit()
+        response = test_client.post(
+            "/authenticate", data=json.dumps(test_user), follow_redirects=True)
+        assert response.status_code == 200
+
+        response = test_client.get(
+            "/executions/count", headers={"apiKey": old_api_key})
+        assert response.status_code == 401
@@ -1,11 +1,26 @@
 import json
 import copy
 import os
+import time
+import threading
 import pytest
 from server import app
-from server.test.fakedata.users import standard_user
+from server.test.fakedata.users import standard_user, standard_user_2
 from server.test.utils import load_json_data, error_from_response
 from server.test.conftest import test_client, session
+from server.database import db
+from server.database.models.execution import ExecutionStatus
+from server.database.models.execution_job import JobState
+from server.database.queries import executions as execution_queries
+from server.database.queries.executions import get_execution, claim_execution
+from server.database.queries.execution_jobs import get_execution_job
+from server.resources.helpers import execution_scheduler, execution_supervisor
+from server.resources.helpers.execution_play import create_execution_job
+from server.resources.models.backend.local import Local
+from server.common.error_codes_and_messages import (
+    ErrorCodeAndMessageFormatter, EXECUTION_EXCEEDS_QUOTA,
+    EXECUTION_EXCEEDS_HOST_CAPACITY, EXECUTION_NOT_FOUND,
+    CANNOT_KILL_FINISHING_EXECUTION)
 from server.resources.models.execution import ExecutionSchema
 from server.test.fakedata.executions import post_valid_execution
 from server.test.fakedata.pipelines import (
@@ -47,6 +62,46 @@ def post_execution_no_sleep(test_client, pipeline_no_sleep):
     return ExecutionSchema().load(json_response).data.identifier
 
 
+@pytest.fixture
+def no_free_worker():
+    max_concurrent_executions = app.config['MAX_CONCURRENT_EXECUTIONS']
+    app.config['MAX_CONCURRENT_EXECUTIONS'] = 0
+    yield
+    app.config['MAX_CONCURRENT_EXECUTIONS'] = max_concurrent_executions
+
+
+@pytest.fixture
+def play_command(monkeypatch):
+    """play_command replaces the command line of the executions played
+    afterwards, for tests that do not depend on the container of the
+    pipeline."""
+
+    def set_command(command):
+        def create_job(execution_identifier):
+            job = create_execution_job(execution_identifier)
+            job.command = json.dumps(command)
+            db.session.commit()
+            return job
+
+        monkeypatch.setattr(execution_supervisor, 'create_execution_job',
+                            create_job)
+
+    return set_command
+
+
+def post_and_play(test_client, user, pipeline):
+    execution = post_valid_execution(pipeline.identifier)
+    response = test_client.post(
+        '/executions',
+        headers={"apiKey": user.api_key},
+        data=json.dumps(ExecutionSchema().dump(execution).data))
+    identifier = load_json_data(response)['identifier']
+    test_client.put(
+        '/executions/{}/play'.format(identifier),
+        headers={"apiKey": user.api_key})
+    return identifier
+
+
 @pytest.fixture
 def test_config(tmpdir_factory, session, test_client, pipeline_sleep,
                 pipeline_no_sleep):
@@ -92,3 +147,249 @@ class TestExecutionPlayResource():
 
         with open(output_path) as f:
             assert f.read() == 'Welcome to CARMIN-Server, Jane Doe.\n'
+
+    def test_put_execution_play_queued(self, test_client, test_config,
+                                       no_free_worker,
+                                       post_execution_no_sleep):
+        response = test_client.put(
+            '/executions/{}/play'.format(post_execution_no_sleep),
+            headers={"apiKey": standard_user().api_key})
+        assert response.status_code == 204
+
+        response = test_client.get(
+            '/executions/{}'.format(post_execution_no_sleep),
+            headers={"apiKey": standard_user().api_key})
+        json_response = load_json_data(response)
+        assert json_response['status'] == ExecutionStatus.Ready.name
+        assert json_response['queuePosition'] == 1
+
+        response = test_client.put(
+            '/executions/{}/kill'.format(post_execution_no_sleep),
+            headers={"apiKey": standard_user().api_key})
+        assert response.status_code == 204
+
+        response = test_client.get(
+            '/executions/{}'.format(post_execution_no_sleep),
+            headers={"apiKey": standard_user().api_key})
+        json_response = load_json_data(response)
+        assert json_response['status'] == ExecutionStatus.Killed.name
+        assert 'queuePosition' not in json_response
+
+    def test_put_execution_kill_started_while_queued(
+            self, test_client, test_config, session, monkeypatch,
+            no_free_worker, post_execution_no_sleep):
+        test_client.put(
+            '/executions/{}/play'.format(post_execution_no_sleep),
+            headers={"apiKey": standard_user().api_key})
+
+        # The scheduler claims the execution once it was found to be queued
+        def cancel_execution(execution_identifier, db_session):
+            assert claim_execution(execution_identifier, db_session)
+            return execution_queries.cancel_execution(
+                execution_identifier, db_session)
+
+        monkeypatch.setattr(execution_scheduler, 'cancel_execution',
+                            cancel_execution)
+        response = test_client.put(
+            '/executions/{}/kill'.format(post_execution_no_sleep),
+            headers={"apiKey": standard_user().api_key})
+        # Its job is not created yet, so the execution cannot be killed
+        assert error_from_response(
+            response) == CANNOT_KILL_FINISHING_EXECUTION
+
+        execution_db = get_execution(post_execution_no_sleep, session)
+        assert execution_db.status == ExecutionStatus.Running
+
+    def test_put_execution_play_fair_share(self, test_client, test_config,
+                                           session, no_free_worker,
+                                           pipeline_no_sleep):
+        session.add(standard_user_2(encrypted=True))
+        session.commit()
+        os.mkdir(
+            os.path.join(app.config['DATA_DIRECTORY'],
+                         standard_user_2().username))
+        first = post_and_play(test_client, standard_user(), pipeline_no_sleep)
+        second = post_and_play(test_client, standard_user(),
+                               pipeline_no_sleep)
+        other = post_and_play(test_client, standard_user_2(),
+                              pipeline_no_sleep)
+
+        positions = {}
+        for user, identifier in [(standard_user(), first),
+                                 (standard_user(), second),
+                                 (standard_user_2(), other)]:
+            response = test_client.get(
+                '/executions/{}'.format(identifier),
+                headers={"apiKey": user.api_key})
+            positions[identifier] = load_json_data(response)['queuePosition']
+        assert positions == {first: 1, other: 2, second: 3}
+
+    def test_put_execution_play_exceeds_quota(self, test_client, test_config,
+                                              post_execution_no_sleep):
+        app.config['EXECUTION_QUOTAS'] = {'default': {'cpuCores': 0.5}}
+        try:
+            response = test_client.put(
+                '/executions/{}/play'.format(post_execution_no_sleep),
+                headers={"apiKey": standard_user().api_key})
+            error = error_from_response(response)
+            assert response.status_code == 400
+            assert error.error_code == EXECUTION_EXCEEDS_QUOTA.error_code
+        finally:
+            app.config['EXECUTION_QUOTAS'] = {}
+
+        response = test_client.get(
+            '/executions/{}'.format(post_execution_no_sleep),
+            headers={"apiKey": standard_user().api_key})
+        json_response = load_json_data(response)
+        assert json_response[
+            'status'] == ExecutionStatus.InitializationFailed.name
+        assert json_response['errorCode'] == EXECUTION_EXCEEDS_QUOTA.error_code
+
+    def test_put_execution_play_exceeds_host_capacity(
+            self, test_client, test_config, post_execution_no_sleep):
+        app.config['EXECUTION_HOST_CPU_CORES'] = 0.5
+        try:
+            response = test_client.put(
+                '/executions/{}/play'.format(post_execution_no_sleep),
+                headers={"apiKey": standard_user().api_key})
+            error = error_from_response(response)
+            assert response.status_code == 400
+            assert (error.error_code ==
+                    EXECUTION_EXCEEDS_HOST_CAPACITY.error_code)
+        finally:
+            app.config['EXECUTION_HOST_CPU_CORES'] = 0
+
+        response = test_client.get(
+            '/executions/{}'.format(post_execution_no_sleep),
+            headers={"apiKey": standard_user().api_key})
+        json_response = load_json_data(response)
+        assert json_response[
+            'status'] == ExecutionStatus.InitializationFailed.name
+
+    def test_put_execution_play_batch_backend(self, test_client, test_config,
+                                              post_execution_no_sleep):
+        app.config['EXECUTION_BACKEND'] = 'batch'
+        try:
+            response = test_client.put(
+                '/executions/{}/play'.format(post_execution_no_sleep),
+                headers={"apiKey": standard_user().api_key})
+            assert response.status_code == 204
+        finally:
+            app.config['EXECUTION_BACKEND'] = 'local'
+
+        job = get_execution_job(post_execution_no_sleep, db.session)
+        assert job.backend == 'batch'
+        assert job.state == JobState.finished
+        assert job.exit_code == 0
+        assert os.path.exists(
+            os.path.join(os.path.dirname(job.stdout_path), 'job.sh'))
+
+        response = test_client.get(
+            '/executions/{}'.format(post_execution_no_sleep),
+            headers={"apiKey": standard_user().api_key})
+        json_response = load_json_data(response)
+        assert json_response['status'] == ExecutionStatus.Finished.name
+
+    def test_put_execution_play_timeout(self, test_client, test_config,
+                                        session, play_command,
+                                        post_execution_no_sleep):
+        play_command(['sleep', '30'])
+        execution_db = get_execution(post_execution_no_sleep, session)
+        execution_db.timeout = 1
+        session.commit()
+
+        start = time.monotonic()
+        response = test_client.put(
+            '/executions/{}/play'.format(post_execution_no_sleep),
+            headers={"apiKey": standard_user().api_key})
+        assert response.status_code == 204
+        assert time.monotonic() - start < 10
+
+        response = test_client.get(
+            '/executions/{}'.format(post_execution_no_sleep),
+            headers={"apiKey": standard_user().api_key})
+        json_response = load_json_data(response)
+        assert json_response['status'] == ExecutionStatus.ExecutionFailed.name
+        response = test_client.get(
+            '/executions/{}/stderr'.format(post_execution_no_sleep),
+            headers={"apiKey": standard_user().api_key})
+        assert b"Execution timed out after 1 seconds" in response.data
+
+    def test_put_execution_play_killed(self, test_client, test_config,
+                                       play_command, post_execution_no_sleep):
+        play_command(['sleep', '30'])
+
+        def kill():
+            test_client.put(
+                '/executions/{}/kill'.format(post_execution_no_sleep),
+                headers={"apiKey": standard_user().api_key})
+
+        timer = threading.Timer(0.5, kill)
+        timer.start()
+        start = time.monotonic()
+        response = test_client.put(
+            '/executions/{}/play'.format(post_execution_no_sleep),
+            headers={"apiKey": standard_user().api_key})
+        timer.join()
+        assert response.status_code == 204
+        assert time.monotonic() - start < 10
+
+        response = test_client.get(
+            '/executions/{}'.format(post_execution_no_sleep),
+            headers={"apiKey": standard_user().api_key})
+        json_response = load_json_data(response)
+        assert json_response['status'] == ExecutionStatus.Killed.name
+
+    def test_put_execution_play_poll_fails(self, test_client, test_config,
+                                           monkeypatch, play_command,
+                                           post_execution_no_sleep):
+        play_command(['true'])
+
+        def poll(cls, job):
+            raise RuntimeError("Lost job")
+
+        monkeypatch.setattr(Local, 'poll', classmethod(poll))
+        response = test_client.put(
+            '/executions/{}/play'.format(post_execution_no_sleep),
+            headers={"apiKey": standard_user().api_key})
+        assert response.status_code == 204
+
+        job = get_execution_job(post_execution_no_sleep, db.session)
+        assert job.state == JobState.finished
+        assert job.exit_code is None
+        response = test_client.get(
+            '/executions/{}'.format(post_execution_no_sleep),
+            headers={"apiKey": standard_user().api_key})
+        json_response = load_json_data(response)
+        assert json_response['status'] == ExecutionStatus.ExecutionFailed.name
+
+    def test_put_execution_play_deleted(self, test_client, test_config,
+                                        play_command, post_execution_no_sleep):
+        play_command(['sleep', '30'])
+        completed = []
+
+        def delete():
+            test_client.delete(
+                '/executions/{}?deleteFiles=true'.format(
+                    post_execution_no_sleep),
+                headers={"apiKey": standard_user().api_key})
+
+        def on_completed(sender, execution_identifier):
+            completed.append(execution_identifier)
+
+        timer = threading.Timer(0.5, delete)
+        timer.start()
+        with execution_supervisor.execution_completed.connected_to(
+                on_completed):
+            response = test_client.put(
+                '/executions/{}/play'.format(post_execution_no_sleep),
+                headers={"apiKey": standard_user().api_key})
+        timer.join()
+        assert response.status_code == 204
+        assert completed == [post_execution_no_sleep]
+
+        response = test_client.get(
+            '/executions/{}'.format(post_execution_no_sleep),
+            headers={"apiKey": standard_user().api_key})
+        assert error_from_response(response) == ErrorCodeAndMessageFormatter(
+            EXECUTION_NOT_FOUND, post_execution_no_sleep)
@@ -8,6 +8,9 @@ from server.common.error_codes_and_messages import (
     ErrorCodeAndMessageFormatter, EXECUTION_NOT_FOUND,
     CANNOT_GET_RESULT_NOT_COMPLETED_EXECUTION, UNAUTHORIZED)
 from server.database.models.execution import ExecutionStatus
+from server.database.queries.executions import get_execution
+from server.resources.helpers.execution_play import finish_execution_job
+from server.resources.helpers.executions import get_descriptor_path
 from server.test.fakedata.users import standard_user, standard_user_2
 from server.test.utils import load_json_data, error_from_response
 from server.test.conftest import test_client, session
@@ -116,3 +119,92 @@ class TestExecutionResults():
             app.config['DATA_DIRECTORY'])
         relative_returned_path = paths[0].platform_path.split("/path/", 1)[1]
         assert relative_returned_path == output_file_path
+
+    def test_get_results_from_manifest(self, test_client, test_config,
+                                       session, post_execution_no_sleep):
+        execution_dir = os.path.join(app.config['DATA_DIRECTORY'],
+                                     standard_user().username, "executions",
+                                     post_execution_no_sleep)
+        os.mkdir(os.path.join(execution_dir, "out"))
+        with open(os.path.join(execution_dir, "out", "result.txt"), "w") as f:
+            f.write("result")
+        execution_db = get_execution(post_execution_no_sleep, session)
+        execution_db.status = ExecutionStatus.Running
+        session.commit()
+        finish_execution_job(post_execution_no_sleep, 0)
+
+        # Files written after the execution completed are not outputs
+        with open(os.path.join(execution_dir, "later.txt"), "w") as f:
+            f.write("later")
+        response = test_client.get(
+            '/executions/{}/results'.format(post_execution_no_sleep),
+            headers={"apiKey": standard_user().api_key})
+        paths = PathSchema(many=True).load(load_json_data(response)).data
+        assert len(paths) == 1
+        assert paths[0].platform_path.endswith(
+            "executions/{}/out/result.txt".format(post_execution_no_sleep))
+        assert paths[0].size == len("result")
+        assert paths[0].mime_type == "text/plain"
+        assert paths[0].execution_id == post_execution_no_sleep
+
+    def test_get_returned_files_by_output(self, test_client, test_config,
+                                          session, post_execution_no_sleep):
+        execution_dir = os.path.join(app.config['DATA_DIRECTORY'],
+                                     standard_user().username, "executions",
+                                     post_execution_no_sleep)
+        with open(os.path.join(execution_dir, "greeting.txt"), "w") as f:
+            f.write("Welcome to CARMIN-Server, Jane Doe.")
+        with open(os.path.join(execution_dir, "other.txt"), "w") as f:
+            f.write("other")
+        execution_db = get_execution(post_execution_no_sleep, session)
+        execution_db.status = ExecutionStatus.Running
+        session.commit()
+        finish_execution_job(post_execution_no_sleep, 0)
+
+        response = test_client.get(
+            '/executions/{}'.format(post_execution_no_sleep),
+            headers={"apiKey": standard_user().api_key})
+        execution = load_json_data(response)
+        assert execution['returnedFiles'] == {
+            "output_file": [
+                "http://localhost/path/{}/executions/{}/greeting.txt".format(
+                    standard_user().username, post_execution_no_sleep)
+            ]
+        }
+
+    def test_get_returned_files_glob_characters(self, test_client,
+                                                test_config, session,
+                                                post_execution_no_sleep):
+        descriptor_path = get_descriptor_path(standard_user().username,
+                                              post_execution_no_sleep)
+        with open(descriptor_path) as f:
+            descriptor = json.load(f)
+        descriptor["output-files"][0]["path-template"] = "./greeting[1].txt"
+        descriptor["output-files"].append({
+            "id": "logs",
+            "name": "Logs",
+            "path-template": "./*.log",
+            "list": True
+        })
+        with open(descriptor_path, "w") as f:
+            json.dump(descriptor, f)
+
+        execution_dir = os.path.dirname(os.path.dirname(descriptor_path))
+        for name in ["greeting[1].txt", "greeting1.txt", "a.log", "b.log"]:
+            with open(os.path.join(execution_dir, name), "w") as f:
+                f.write(name)
+        execution_db = get_execution(post_execution_no_sleep, session)
+        execution_db.status = ExecutionStatus.Running
+        session.commit()
+        finish_execution_job(post_execution_no_sleep, 0)
+
+        response = test_client.get(
+            '/executions/{}'.format(post_execution_no_sleep),
+            headers={"apiKey": standard_user().api_key})
+        url = "http://localhost/path/{}/executions/{}/{{}}".format(
+            standard_user().username, post_execution_no_sleep)
+        assert load_json_data(response)['returnedFiles'] == {
+            "output_file": [url.format("greeting[1].txt")],
+            "logs": [url.format("a.log"),
+                     url.format("b.log")]
+        }
@@ -0,0 +1,67 @@
+import time
+import threading
+from server.database.models.execution import ExecutionStatus
+from server.database.queries.executions import get_execution
+from server.common.error_codes_and_messages import (
+    EXECUTION_NOT_FOUND, ErrorCodeAndMessageFormatter)
+from server.resources.helpers.execution_status import status_changed
+from server.test.resources.test_execution import (test_config, pipeline,
+                                                  execution_id)
+from server.test.fakedata.users import standard_user
+from server.test.utils import load_json_data, error_from_response
+from server.test.conftest import test_client, session
+
+
+class TestExecutionStatusPollResource():
+    def test_get_execution_status(self, test_client, execution_id):
+        response = test_client.get(
+            '/executions/{}/status'.format(execution_id),
+            headers={"apiKey": standard_user().api_key})
+        assert load_json_data(response) == {
+            "identifier": execution_id,
+            "status": "Initializing"
+        }
+
+    def test_get_execution_status_timeout(self, test_client, execution_id):
+        start = time.monotonic()
+        response = test_client.get(
+            '/executions/{}/status?waitFor=Running&timeout=1'.format(
+                execution_id),
+            headers={"apiKey": standard_user().api_key})
+        assert time.monotonic() - start >= 1
+        assert load_json_data(response)['status'] == 'Initializing'
+
+    def test_get_execution_status_change(self, test_client, session,
+                                         execution_id):
+        # The session is idle while the request waits
+        execution_db = get_execution(execution_id, session)
+        db_session = session()
+
+        def kill():
+            execution_db.status = ExecutionStatus.Killed
+            db_session.commit()
+            status_changed(execution_id, ExecutionStatus.Killed)
+
+        threading.Timer(0.2, kill).start()
+        start = time.monotonic()
+        response = test_client.get(
+            '/executions/{}/status?waitFor=Running&timeout=30'.format(
+                execution_id),
+            headers={"apiKey": standard_user().api_key})
+        assert time.monotonic() - start < 5
+        assert load_json_data(response)['status'] == 'Killed'
+
+    def test_get_execution_status_already_reached(self, test_client,
+                                                  execution_id):
+        response = test_client.get(
+            '/executions/{}/status?waitFor=Initializing&timeout=30'.format(
+                execution_id),
+            headers={"apiKey": standard_user().api_key})
+        assert load_json_data(response)['status'] == 'Initializing'
+
+    def test_get_invalid_execution_status(self, test_client):
+        response = test_client.get(
+            '/executions/invalid/status',
+            headers={"apiKey": standard_user().api_key})
+        assert error_from_response(response) == ErrorCodeAndMessageFormatter(
+            EXECUTION_NOT_FOUND, "invalid")
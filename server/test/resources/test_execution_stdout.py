@@ -86,3 +86,40 @@ class TestExecutionStdOutResource():
         expected_error_code_and_message = ErrorCodeAndMessageFormatter(
             EXECUTION_NOT_FOUND, invalid_execution_id)
         assert error == expected_error_code_and_message
+
+    def test_get_execution_std_out_range(self, test_client, execution_id,
+                                         write_std_out):
+        response = test_client.get(
+            '/executions/{}/stdout?offset=8&limit=6'.format(execution_id),
+            headers={"apiKey": standard_user().api_key})
+        assert response.data.decode('utf8') == write_std_out[8:14]
+        assert response.headers['X-Content-Offset'] == '8'
+
+        response = test_client.get(
+            '/executions/{}/stdout?offset=15'.format(execution_id),
+            headers={"apiKey": standard_user().api_key})
+        assert response.data.decode('utf8') == write_std_out[15:]
+
+    def test_get_execution_std_out_tail(self, test_client, execution_id):
+        carmin_dir = get_execution_carmin_files_dir(standard_user().username,
+                                                    execution_id)
+        with open(os.path.join(carmin_dir, "stdout.txt"), "w") as f:
+            f.write("first\nsecond\nthird\n")
+
+        response = test_client.get(
+            '/executions/{}/stdout?tail=2'.format(execution_id),
+            headers={"apiKey": standard_user().api_key})
+        assert response.data.decode('utf8') == "second\nthird\n"
+        assert response.headers['X-Content-Offset'] == '6'
+
+        response = test_client.get(
+            '/executions/{}/stdout?tail=5'.format(execution_id),
+            headers={"apiKey": standard_user().api_key})
+        assert response.data.decode('utf8') == "first\nsecond\nthird\n"
+
+    def test_get_execution_std_out_follow_not_running(
+            self, test_client, execution_id, write_std_out):
+        response = test_client.get(
+            '/executions/{}/stdout?follow=true&offset=8'.format(execution_id),
+            headers={"apiKey": standard_user().api_key})
+        assert response.data.decode('utf8') == write_std_out[8:]
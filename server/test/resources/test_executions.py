@@ -8,8 +8,9 @@ import json
 import pytest
 from server import app
 from server.common.error_codes_and_messages import (
-    EXECUTION_IDENTIFIER_MUST_NOT_BE_SET, INVALID_PIPELINE_IDENTIFIER,
-    INVALID_MODEL_PROVIDED, INVALID_INPUT_FILE, INVALID_QUERY_PARAMETER)
+    ErrorCodeAndMessageFormatter, EXECUTION_IDENTIFIER_MUST_NOT_BE_SET, INVALID_PIPELINE_IDENTIFIER,
+    INVALID_MODEL_PROVIDED, INVALID_INPUT_FILE, INVALID_QUERY_PARAMETER,
+    INVOCATION_INITIALIZATION_FAILED)
 from server.resources.models.pipeline import PipelineSchema
 from server.resources.models.execution import ExecutionSchema
 from server.test.fakedata.pipelines import PipelineStub, BOUTIQUES_SLEEP_ORIGINAL, BOUTIQUES_SLEEP_CONVERTED
@@ -61,6 +62,14 @@ def number_of_executions(test_client, pipeline) -> int:
     return number_of_executions
 
 
+@pytest.fixture
+def no_free_worker():
+    max_concurrent_executions = app.config['MAX_CONCURRENT_EXECUTIONS']
+    app.config['MAX_CONCURRENT_EXECUTIONS'] = 0
+    yield
+    app.config['MAX_CONCURRENT_EXECUTIONS'] = max_concurrent_executions
+
+
 class TestExecutionsResource():
     # tests for POST
     def test_post_valid_execution(self, test_client, pipeline):
@@ -114,6 +123,17 @@ class TestExecutionsResource():
         assert not os.listdir(user_execution_dir)
         assert error_code_and_message == expected_error_code_and_message
 
+    def test_post_invalid_invocation(self, test_client, pipeline):
+        execution = post_valid_execution(pipeline.identifier)
+        execution.input_values["unknown"] = "value"
+        response = test_client.post(
+            '/executions',
+            headers={"apiKey": standard_user().api_key},
+            data=json.dumps(ExecutionSchema().dump(execution).data))
+        error = error_from_response(response)
+        assert error.error_code == INVOCATION_INITIALIZATION_FAILED.error_code
+        assert "unknown" in error.error_detail
+
     def test_post_identifier_set(self, test_client, pipeline):
         response = test_client.post(
             '/executions',
@@ -229,3 +249,108 @@ class TestExecutionsResource():
             })
         json_response = load_json_data(response)
         assert len(json_response) == number_of_executions
+
+    def test_get_with_fields(self, test_client, number_of_executions):
+        response = test_client.get(
+            '/executions?fields=name,status',
+            headers={"apiKey": standard_user().api_key})
+        json_response = load_json_data(response)
+        assert len(json_response) == number_of_executions
+        assert all(
+            sorted(execution) == ['identifier', 'name', 'status']
+            for execution in json_response)
+
+    @pytest.mark.parametrize('parameter', ['fields', 'expand'])
+    def test_get_with_unknown_field(self, test_client, number_of_executions,
+                                    parameter):
+        response = test_client.get(
+            '/executions?{}=name,stauts'.format(parameter),
+            headers={"apiKey": standard_user().api_key})
+        assert response.status_code == 400
+        error = error_from_response(response)
+        assert error == ErrorCodeAndMessageFormatter(
+            INVALID_QUERY_PARAMETER, 'name,stauts', parameter)
+
+    def test_get_inputs_without_inputs_file(self, test_client, pipeline):
+        execution = post_valid_execution(pipeline.identifier)
+        response = test_client.post(
+            '/executions',
+            headers={"apiKey": standard_user().api_key},
+            data=json.dumps(ExecutionSchema().dump(execution).data))
+        identifier = load_json_data(response)['identifier']
+        os.remove(
+            os.path.join(app.config['DATA_DIRECTORY'],
+                         standard_user().username, 'executions', identifier,
+                         '.carmin-files', INPUTS_FILENAME))
+
+        response = test_client.get(
+            '/executions', headers={"apiKey": standard_user().api_key})
+        json_response = load_json_data(response)
+        assert json_response[0]['inputValues'] == execution.input_values
+
+    def test_get_with_expand(self, test_client, pipeline, no_free_worker):
+        response = test_client.post(
+            '/executions',
+            headers={"apiKey": standard_user().api_key},
+            data=json.dumps(ExecutionSchema().dump(
+                post_valid_execution(pipeline.identifier)).data))
+        identifier = load_json_data(response)['identifier']
+        test_client.put('/executions/{}/play'.format(identifier),
+                        headers={"apiKey": standard_user().api_key})
+
+        response = test_client.get(
+            '/executions', headers={"apiKey": standard_user().api_key})
+        assert 'queuePosition' not in load_json_data(response)[0]
+        response = test_client.get(
+            '/executions?expand=queuePosition',
+            headers={"apiKey": standard_user().api_key})
+        assert load_json_data(response)[0]['queuePosition'] == 1
+
+    def test_get_with_cursor(self, test_client, number_of_executions):
+        response = test_client.get(
+            '/executions', headers={"apiKey": standard_user().api_key})
+        all_identifiers = [e['identifier'] for e in load_json_data(response)]
+
+        identifiers = []
+        url = '/executions?limit=4'
+        while True:
+            response = test_client.get(
+                url, headers={"apiKey": standard_user().api_key})
+            identifiers += [e['identifier'] for e in load_json_data(response)]
+            if 'X-Next-Cursor' not in response.headers:
+                break
+            url = '/executions?limit=4&cursor={}'.format(
+                response.headers['X-Next-Cursor'])
+        assert identifiers == all_identifiers
+        assert len(identifiers) == number_of_executions
+
+    def test_get_with_invalid_cursor(self, test_client, number_of_executions):
+        response = test_client.get(
+            '/executions?cursor=invalid',
+            headers={"apiKey": standard_user().api_key})
+        assert response.status_code == 400
+        assert error_from_response(response) == ErrorCodeAndMessageFormatter(
+            INVALID_QUERY_PARAMETER, 'invalid', 'cursor')
+
+    def test_get_with_filters(self, test_client, pipeline,
+                              number_of_executions):
+        response = test_client.get(
+            '/executions?status=Initializing,Finished'
+            '&pipelineIdentifier={}'.format(pipeline.identifier),
+            headers={"apiKey": standard_user().api_key})
+        assert len(load_json_data(response)) == number_of_executions
+
+        response = test_client.get(
+            '/executions?status=Finished',
+            headers={"apiKey": standard_user().api_key})
+        assert load_json_data(response) == []
+
+        response = test_client.get(
+            '/executions?createdBefore=1',
+            headers={"apiKey": standard_user().api_key})
+        assert load_json_data(response) == []
+
+        response = test_client.get(
+            '/executions?status=Unknown,Invalid',
+            headers={"apiKey": standard_user().api_key})
+        assert response.status_code == 400
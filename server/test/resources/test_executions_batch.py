@@ -0,0 +1,136 @@
+import os
+import json
+import pytest
+from server import app
+from server.common.error_codes_and_messages import (
+    ErrorCodeAndMessageFormatter, INVALID_PIPELINE_IDENTIFIER,
+    INVALID_INPUT_FILE, INVOCATION_INITIALIZATION_FAILED,
+    EXECUTION_BATCH_TOO_LARGE)
+from server.database.models.execution import Execution
+from server.resources.helpers import execution_batch
+from server.test.resources.test_executions import test_config, pipeline
+from server.test.fakedata.users import standard_user
+from server.test.utils import load_json_data, error_from_response
+from server.test.conftest import test_client, session
+
+
+def input_file(filename: str) -> str:
+    return "http://localhost/path/{}/{}".format(standard_user().username,
+                                                filename)
+
+
+def post_batch(test_client, pipeline_identifier: str, input_values: list,
+               **kwargs):
+    batch = {
+        "name": "batch",
+        "pipelineIdentifier": pipeline_identifier,
+        "inputValues": input_values
+    }
+    batch.update(kwargs)
+    return test_client.post('/executions/batch',
+                            headers={"apiKey": standard_user().api_key},
+                            data=json.dumps(batch))
+
+
+@pytest.fixture
+def no_free_worker():
+    max_concurrent_executions = app.config['MAX_CONCURRENT_EXECUTIONS']
+    app.config['MAX_CONCURRENT_EXECUTIONS'] = 0
+    yield
+    app.config['MAX_CONCURRENT_EXECUTIONS'] = max_concurrent_executions
+
+
+class TestExecutionsBatchResource():
+    def test_post_batch(self, test_client, pipeline):
+        user_execution_dir = os.path.join(app.config['DATA_DIRECTORY'],
+                                          standard_user().username,
+                                          'executions')
+        response = post_batch(
+            test_client, pipeline.identifier,
+            [{
+                "input_file": input_file("test.txt")
+            }, {
+                "input_file": input_file("does_not_exist.txt")
+            }, {
+                "input_file": input_file("test.txt"),
+                "unknown": "value"
+            }])
+        assert response.status_code == 200
+
+        items = load_json_data(response)
+        assert [item['index'] for item in items] == [0, 1, 2]
+        assert items[0]['status'] == 'Initializing'
+        assert 'error' not in items[0]
+        assert 'identifier' not in items[1]
+        assert items[1]['error']['errorCode'] == INVALID_INPUT_FILE.error_code
+        assert items[2]['status'] == 'InitializationFailed'
+        assert (items[2]['error']['errorCode'] ==
+                INVOCATION_INITIALIZATION_FAILED.error_code)
+        assert sorted(os.listdir(user_execution_dir)) == sorted(
+            [items[0]['identifier'], items[2]['identifier']])
+
+        response = test_client.get(
+            '/executions/{}'.format(items[0]['identifier']),
+            headers={"apiKey": standard_user().api_key})
+        execution = load_json_data(response)
+        assert execution['name'] == 'batch_0'
+        assert execution['inputValues'] == {
+            "input_file": input_file("test.txt")
+        }
+
+    def test_post_batch_play(self, test_client, pipeline, no_free_worker):
+        response = post_batch(test_client,
+                              pipeline.identifier,
+                              [{
+                                  "input_file": input_file("test.txt")
+                              }] * 3,
+                              play=True)
+        items = load_json_data(response)
+        assert [item['status'] for item in items] == ['Ready'] * 3
+
+        response = test_client.get(
+            '/executions/{}'.format(items[0]['identifier']),
+            headers={"apiKey": standard_user().api_key})
+        assert load_json_data(response)['status'] == 'Ready'
+
+    def test_post_batch_pipeline_identifier_doesnt_exist(self, test_client):
+        response = post_batch(test_client, "not_exist",
+                              [{
+                                  "input_file": input_file("test.txt")
+                              }])
+        assert error_from_response(response) == INVALID_PIPELINE_IDENTIFIER
+
+    def test_post_empty_batch(self, test_client, pipeline):
+        response = post_batch(test_client, pipeline.identifier, [])
+        assert response.status_code == 400
+
+    def test_post_batch_too_large(self, test_client, pipeline, session,
+                                  monkeypatch):
+        monkeypatch.setitem(app.config, 'MAX_EXECUTION_BATCH_SIZE', 2)
+        response = post_batch(test_client, pipeline.identifier,
+                              [{
+                                  "input_file": input_file("test.txt")
+                              }] * 3)
+        assert error_from_response(response) == ErrorCodeAndMessageFormatter(
+            EXECUTION_BATCH_TOO_LARGE, 3, 2)
+        assert session.query(Execution).count() == 0
+
+    def test_post_batch_failure_removes_directories(self, test_client,
+                                                    pipeline, session,
+                                                    monkeypatch):
+        user_execution_dir = os.path.join(app.config['DATA_DIRECTORY'],
+                                          standard_user().username,
+                                          'executions')
+
+        def record_execution_inputs(execution_identifier, input_values):
+            raise RuntimeError("Database unavailable")
+
+        monkeypatch.setattr(execution_batch, 'record_execution_inputs',
+                            record_execution_inputs)
+        with pytest.raises(RuntimeError):
+            post_batch(test_client, pipeline.identifier,
+                       [{
+                           "input_file": input_file("test.txt")
+                       }] * 2)
+        assert not os.listdir(user_execution_dir)
+        assert session.query(Execution).count() == 0
@@ -1,7 +1,10 @@
 import pytest
 import os
 import json
+import io
 import zipfile
+import tarfile
+import hashlib
 from server import app
 from server.config import TestConfig
 from server.test.utils import load_json_data, error_from_response
@@ -9,13 +12,19 @@ from server.test.conftest import test_client, session
 from server.common.error_codes_and_messages import (
     MD5_ON_DIR, INVALID_PATH, UNAUTHORIZED, ACTION_REQUIRED, INVALID_ACTION,
     LIST_ACTION_ON_FILE, INVALID_MODEL_PROVIDED, PATH_EXISTS,
-    INVALID_UPLOAD_TYPE, PATH_DOES_NOT_EXIST, PATH_IS_DIRECTORY)
+    INVALID_UPLOAD_TYPE, PATH_DOES_NOT_EXIST, PATH_IS_DIRECTORY, MD5_MISMATCH,
+    INVALID_UPLOAD_OFFSET, UNSUPPORTED_COMPRESSION,
+    UNSUPPORTED_CHECKSUM_ALGORITHM, INVALID_QUERY_PARAMETER, UNEXPECTED_ERROR,
+    ErrorCodeAndMessageFormatter)
 from server.resources.models.path import Path, PathSchema
 from server.resources.models.path_md5 import PathMD5Schema
+from server.resources.models.path_checksum import PathChecksum, PathChecksumSchema
+from server.database.models.file_checksum import FileChecksum
 from server.resources.models.upload_data import UploadData, UploadDataSchema
 from server.resources.models.boolean_response import BooleanResponseSchema
 from server.resources.models.error_code_and_message import ErrorCodeAndMessageSchema
 from server.resources.path import generate_md5
+from server.resources.helpers.path import upload_stream
 from server.test.fakedata.users import standard_user
 
 
@@ -37,6 +46,12 @@ def test_config(tmpdir_factory, session):
     app.config['DATA_DIRECTORY'] = str(root_directory)
 
 
+def directory_size(dir_path: str) -> int:
+    return sum(
+        os.path.getsize(os.path.join(root, f))
+        for root, _, files in os.walk(dir_path) for f in files)
+
+
 @pytest.fixture
 def file_object():
     file_path = os.path.join(app.config['DATA_DIRECTORY'],
@@ -46,7 +61,7 @@ def file_object():
             standard_user().username),
         last_modification_date=int(os.path.getmtime(file_path)),
         is_directory=False,
-        size=Path.get_path_size(file_path, is_dir=False),
+        size=os.path.getsize(file_path),
         mime_type='application/json')
 
 
@@ -59,7 +74,7 @@ def dir_object():
             standard_user().username),
         last_modification_date=int(os.path.getmtime(dir_path)),
         is_directory=True,
-        size=Path.get_path_size(dir_path, is_dir=True),
+        size=directory_size(dir_path),
     )
 
 
@@ -68,7 +83,7 @@ def put_file():
     return UploadData(
         base64_content="VGhpcyBpcyBhIHRlc3QgZmlsZSE=",
         upload_type="File",
-        md5="5dcd075938007ceb7164df6e0b21032f")
+        md5="07aa24d4ee5d5d29fbaf360896713947")
 
 
 @pytest.fixture
@@ -118,6 +133,86 @@ class TestPathResource():
             })
         assert response.data == b'{"test": "json"}'
 
+    def test_get_content_action_not_modified(self, test_client):
+        path = '/path/{}/file.json?action=content'.format(
+            standard_user().username)
+        response = test_client.get(
+            path, headers={"apiKey": standard_user().api_key})
+        etag = response.headers['ETag']
+        last_modified = response.headers['Last-Modified']
+        assert response.headers['Accept-Ranges'] == 'bytes'
+
+        response = test_client.get(
+            path,
+            headers={
+                "apiKey": standard_user().api_key,
+                "If-None-Match": etag
+            })
+        assert response.status_code == 304
+        assert response.data == b''
+
+        response = test_client.get(
+            path,
+            headers={
+                "apiKey": standard_user().api_key,
+                "If-Modified-Since": last_modified
+            })
+        assert response.status_code == 304
+
+    def test_get_content_action_with_range(self, test_client):
+        response = test_client.get(
+            '/path/{}/file.json?action=content'.format(
+                standard_user().username),
+            headers={
+                "apiKey": standard_user().api_key,
+                "Range": "bytes=2-5"
+            })
+        assert response.status_code == 206
+        assert response.headers['Content-Range'] == 'bytes 2-5/16'
+        assert response.data == b'test'
+
+    def test_get_content_action_with_multiple_ranges(self, test_client):
+        response = test_client.get(
+            '/path/{}/file.json?action=content'.format(
+                standard_user().username),
+            headers={
+                "apiKey": standard_user().api_key,
+                "Range": "bytes=2-5,-6"
+            })
+        assert response.status_code == 206
+        assert response.mimetype == 'multipart/byteranges'
+        boundary = response.mimetype_params['boundary'].encode()
+        parts = response.data.split(b'--' + boundary)
+        assert parts[1].endswith(
+            b'Content-Range: bytes 2-5/16\r\n\r\ntest\r\n')
+        assert parts[2].endswith(
+            b'Content-Range: bytes 10-15/16\r\n\r\njson"}\r\n')
+        assert parts[3] == b'--\r\n'
+        assert int(response.headers['Content-Length']) == len(response.data)
+
+    def test_get_content_action_with_stale_if_range(self, test_client):
+        response = test_client.get(
+            '/path/{}/file.json?action=content'.format(
+                standard_user().username),
+            headers={
+                "apiKey": standard_user().api_key,
+                "Range": "bytes=2-5",
+                "If-Range": '"stale"'
+            })
+        assert response.status_code == 200
+        assert response.data == b'{"test": "json"}'
+
+    def test_get_content_action_with_unsatisfiable_range(self, test_client):
+        response = test_client.get(
+            '/path/{}/file.json?action=content'.format(
+                standard_user().username),
+            headers={
+                "apiKey": standard_user().api_key,
+                "Range": "bytes=100-"
+            })
+        assert response.status_code == 416
+        assert response.headers['Content-Range'] == 'bytes */16'
+
     def test_get_content_action_with_invalid_file(self, test_client):
         response = test_client.get(
             '/path/{}/file2.json?action=content'.format(
@@ -137,6 +232,37 @@ class TestPathResource():
             })
         assert response.headers['Content-Type'] == 'application/gzip'
 
+    def test_get_content_action_with_dir_archive(self, test_client):
+        username = standard_user().username
+        response = test_client.get(
+            '/path/{}?action=content&compression=none'.format(username),
+            headers={
+                "apiKey": standard_user().api_key
+            })
+        assert response.headers['Content-Type'] == 'application/x-tar'
+        with tarfile.open(fileobj=io.BytesIO(response.data)) as archive:
+            assert sorted(archive.getnames()) == sorted([
+                username, '{}/directory.yml'.format(username),
+                '{}/empty_dir'.format(username),
+                '{}/file.json'.format(username),
+                '{}/subdir_text.txt'.format(username),
+                '{}/subdirectory'.format(username),
+                '{}/test.txt'.format(username)
+            ])
+            content = archive.extractfile('{}/file.json'.format(username))
+            assert content.read() == b'{"test": "json"}'
+
+    def test_get_content_action_with_dir_invalid_compression(
+            self, test_client):
+        response = test_client.get(
+            '/path/{}/subdirectory?action=content&compression=rar'.format(
+                standard_user().username),
+            headers={
+                "apiKey": standard_user().api_key
+            })
+        error = error_from_response(response)
+        assert error.error_code == UNSUPPORTED_COMPRESSION.error_code
+
     def test_get_content_action_with_invalid_dir(self, test_client):
         response = test_client.get(
             '/path/{}/dir_that_does_not_exist?action=content'.format(
@@ -157,6 +283,27 @@ class TestPathResource():
         path = PathSchema().load(load_json_data(response)).data
         assert path == file_object
 
+    def test_get_properties_action_with_dir_after_nested_upload(
+            self, test_client):
+        username = standard_user().username
+        response = test_client.get(
+            '/path/{}?action=properties'.format(username),
+            headers={"apiKey": standard_user().api_key})
+        size = PathSchema().load(load_json_data(response)).data.size
+
+        test_client.put(
+            '/path/{}/subdirectory/nested.bin'.format(username),
+            headers={
+                "apiKey": standard_user().api_key,
+                "Content-Type": "application/octet-stream"
+            },
+            data=b'0' * 1000)
+        response = test_client.get(
+            '/path/{}?action=properties'.format(username),
+            headers={"apiKey": standard_user().api_key})
+        path = PathSchema().load(load_json_data(response)).data
+        assert path.size == size + 1000
+
     def test_get_properties_action_with_dir(self, test_client, dir_object):
         response = test_client.get(
             '/path/{}/subdirectory?action=properties'.format(
@@ -202,6 +349,54 @@ class TestPathResource():
                          '{}/subdirectory'.format(standard_user().username)))
         assert len(expected_paths_list) == len(paths)
 
+    def test_get_list_action_sorted_page(self, test_client):
+        response = test_client.get(
+            '/path/{}?action=list&sort=name&offset=1&limit=2'.format(
+                standard_user().username),
+            headers={
+                "apiKey": standard_user().api_key
+            })
+        paths = PathSchema(many=True).load(load_json_data(response)).data
+        assert [os.path.basename(p.platform_path)
+                for p in paths] == ['empty_dir', 'file.json']
+
+    def test_get_list_action_sorted_by_size_descending(self, test_client):
+        response = test_client.get(
+            '/path/{}?action=list&sort=-size&limit=1'.format(
+                standard_user().username),
+            headers={
+                "apiKey": standard_user().api_key
+            })
+        paths = PathSchema(many=True).load(load_json_data(response)).data
+        assert [os.path.basename(p.platform_path)
+                for p in paths] == ['subdir_text.txt']
+
+    def test_get_list_action_with_depth(self, test_client):
+        username = standard_user().username
+        with open(
+                os.path.join(app.config['DATA_DIRECTORY'], username,
+                             'subdirectory', 'nested.txt'), 'w') as f:
+            f.write("nested")
+        response = test_client.get(
+            '/path/{}?action=list&depth=2&sort=path'.format(username),
+            headers={
+                "apiKey": standard_user().api_key
+            })
+        paths = PathSchema(many=True).load(load_json_data(response)).data
+        assert 'http://localhost/path/{}/subdirectory/nested.txt'.format(
+            username) in [p.platform_path for p in paths]
+
+    def test_get_list_action_invalid_sort(self, test_client):
+        response = test_client.get(
+            '/path/{}?action=list&sort=color'.format(
+                standard_user().username),
+            headers={
+                "apiKey": standard_user().api_key
+            })
+        error = error_from_response(response)
+        assert error == ErrorCodeAndMessageFormatter(INVALID_QUERY_PARAMETER,
+                                                     'color', 'sort')
+
     def test_get_list_action_with_file(self, test_client):
         response = test_client.get(
             '/path/{}/file.json?action=list'.format(standard_user().username),
@@ -232,6 +427,67 @@ class TestPathResource():
         error = error_from_response(response)
         assert error == MD5_ON_DIR
 
+    def test_get_md5_action_cached(self, test_client, session):
+        path = '{}/file.json'.format(standard_user().username)
+        file_path = os.path.join(app.config['DATA_DIRECTORY'], path)
+        response = test_client.get(
+            '/path/{}?action=md5'.format(path),
+            headers={"apiKey": standard_user().api_key})
+        md5 = PathMD5Schema().load(load_json_data(response)).data
+        assert md5.md5 == hashlib.md5(b'{"test": "json"}').hexdigest()
+        assert session.query(FileChecksum).filter_by(
+            path=file_path, algorithm='md5').count() == 1
+
+        with open(file_path, 'w') as f:
+            f.write('{"test": "modified"}')
+        response = test_client.get(
+            '/path/{}?action=md5'.format(path),
+            headers={"apiKey": standard_user().api_key})
+        md5 = PathMD5Schema().load(load_json_data(response)).data
+        assert md5.md5 == hashlib.md5(b'{"test": "modified"}').hexdigest()
+        assert session.query(FileChecksum).filter_by(
+            path=file_path, algorithm='md5').count() == 1
+
+    def test_delete_keeps_checksums_of_similar_paths(self, test_client,
+                                                     session):
+        user_dir = os.path.join(app.config['DATA_DIRECTORY'],
+                                standard_user().username)
+        for directory in ['dir_a', 'dirXa']:
+            os.mkdir(os.path.join(user_dir, directory))
+            with open(os.path.join(user_dir, directory, 'file.txt'),
+                      'w') as f:
+                f.write(directory)
+            test_client.get(
+                '/path/{}/{}/file.txt?action=md5'.format(
+                    standard_user().username, directory),
+                headers={"apiKey": standard_user().api_key})
+
+        response = test_client.delete(
+            '/path/{}/dir_a'.format(standard_user().username),
+            headers={"apiKey": standard_user().api_key})
+        assert response.status_code == 204
+        assert [c.path for c in session.query(FileChecksum).all()] == [
+            os.path.join(user_dir, 'dirXa', 'file.txt')
+        ]
+
+    def test_get_checksum_action_sha256(self, test_client):
+        response = test_client.get(
+            '/path/{}/file.json?action=checksum&algorithm=sha256'.format(
+                standard_user().username),
+            headers={"apiKey": standard_user().api_key})
+        checksum = PathChecksumSchema().load(load_json_data(response)).data
+        assert checksum == PathChecksum(
+            'sha256',
+            hashlib.sha256(b'{"test": "json"}').hexdigest())
+
+    def test_get_checksum_action_invalid_algorithm(self, test_client):
+        response = test_client.get(
+            '/path/{}/file.json?action=checksum&algorithm=crc'.format(
+                standard_user().username),
+            headers={"apiKey": standard_user().api_key})
+        error = error_from_response(response)
+        assert error.error_code == UNSUPPORTED_CHECKSUM_ALGORITHM.error_code
+
     # tests for PUT
     def test_put_outside_authorized_directory(self, test_client):
         response = test_client.put(
@@ -352,6 +608,148 @@ class TestPathResource():
         with open(file_path) as f:
             assert f.read() == file_content
 
+    def test_put_base64_file_md5_mismatch(self, test_client, put_file):
+        file_name = '{}/put_file.txt'.format(standard_user().username)
+        put_file.md5 = "5dcd075938007ceb7164df6e0b21032f"
+        response = test_client.put(
+            '/path/{}'.format(file_name),
+            headers={
+                "apiKey": standard_user().api_key,
+                "Content-Type": "application/carmin+json"
+            },
+            data=json.dumps(UploadDataSchema().dump(put_file).data))
+        error = error_from_response(response)
+        assert error == ErrorCodeAndMessageFormatter(
+            MD5_MISMATCH, "07aa24d4ee5d5d29fbaf360896713947", put_file.md5)
+        assert not os.path.exists(
+            os.path.join(app.config['DATA_DIRECTORY'], file_name))
+
+    def test_put_file_stream(self, test_client, session):
+        path = '{}/test_file_stream.bin'.format(standard_user().username)
+        file_content = bytes(range(256)) * 16
+        response = test_client.put(
+            '/path/{}?md5={}'.format(path,
+                                     hashlib.md5(file_content).hexdigest()),
+            headers={
+                "apiKey": standard_user().api_key,
+                "Content-Type": "application/octet-stream"
+            },
+            data=file_content)
+        assert response.status_code == 201
+
+        file_path = os.path.join(app.config['DATA_DIRECTORY'], path)
+        with open(file_path, 'rb') as f:
+            assert f.read() == file_content
+        assert session.query(FileChecksum).filter_by(
+            path=file_path,
+            checksum=hashlib.md5(file_content).hexdigest()).count() == 1
+
+    def test_put_file_stream_md5_mismatch(self, test_client):
+        path = '{}/test.txt'.format(standard_user().username)
+        file_path = os.path.join(app.config['DATA_DIRECTORY'], path)
+        with open(file_path, 'rb') as f:
+            file_content = f.read()
+
+        response = test_client.put(
+            '/path/{}?md5={}'.format(path,
+                                     hashlib.md5(b'other').hexdigest()),
+            headers={
+                "apiKey": standard_user().api_key,
+                "Content-Type": "application/octet-stream"
+            },
+            data=b'content')
+        error = error_from_response(response)
+        assert error == ErrorCodeAndMessageFormatter(
+            MD5_MISMATCH,
+            hashlib.md5(b'content').hexdigest(),
+            hashlib.md5(b'other').hexdigest())
+        with open(file_path, 'rb') as f:
+            assert f.read() == file_content
+        assert not [
+            name for name in os.listdir(os.path.dirname(file_path))
+            if name.endswith('.part')
+        ]
+
+    def test_put_file_stream_interrupted(self, test_client):
+        file_path = os.path.join(app.config['DATA_DIRECTORY'],
+                                 standard_user().username, 'test.txt')
+        with open(file_path, 'rb') as f:
+            file_content = f.read()
+
+        class DroppedStream():
+            def __init__(self):
+                self.chunks = [b'partial content']
+
+            def read(self, size):
+                if not self.chunks:
+                    raise OSError("Connection reset by peer")
+                return self.chunks.pop()
+
+        path, error = upload_stream(DroppedStream(), file_path)
+        assert error == UNEXPECTED_ERROR
+        with open(file_path, 'rb') as f:
+            assert f.read() == file_content
+        assert not [
+            name for name in os.listdir(os.path.dirname(file_path))
+            if name.endswith('.part')
+        ]
+
+    def test_put_file_stream_resumed(self, test_client):
+        path = '{}/test_file_stream.bin'.format(standard_user().username)
+        file_content = bytes(range(256)) * 16
+        headers = {
+            "apiKey": standard_user().api_key,
+            "Content-Type": "application/octet-stream"
+        }
+        response = test_client.put(
+            '/path/{}'.format(path), headers=headers, data=file_content[:1000])
+        assert response.status_code == 201
+
+        response = test_client.put(
+            '/path/{}?offset=1000&md5={}'.format(
+                path, hashlib.md5(file_content).hexdigest()),
+            headers=headers,
+            data=file_content[1000:])
+        assert response.status_code == 201
+
+        file_path = os.path.join(app.config['DATA_DIRECTORY'], path)
+        with open(file_path, 'rb') as f:
+            assert f.read() == file_content
+
+    def test_put_file_stream_invalid_offset(self, test_client):
+        path = '{}/test.txt'.format(standard_user().username)
+        response = test_client.put(
+            '/path/{}?offset=1000'.format(path),
+            headers={
+                "apiKey": standard_user().api_key,
+                "Content-Type": "application/octet-stream"
+            },
+            data=b'content')
+        error = error_from_response(response)
+        assert error == ErrorCodeAndMessageFormatter(INVALID_UPLOAD_OFFSET,
+                                                     1000, len("content"))
+
+    @pytest.mark.parametrize('offset', ['abc', '-1'])
+    def test_put_file_stream_malformed_offset(self, test_client, offset):
+        path = '{}/test.txt'.format(standard_user().username)
+        file_path = os.path.join(app.config['DATA_DIRECTORY'], path)
+        with open(file_path, 'rb') as f:
+            file_content = f.read()
+
+        response = test_client.put(
+            '/path/{}?offset={}'.format(path, offset),
+            headers={
+                "apiKey": standard_user().api_key,
+                "Content-Type": "application/octet-stream"
+            },
+            data=b'content')
+        assert response.status_code == 400
+        error = error_from_response(response)
+        assert error == ErrorCodeAndMessageFormatter(INVALID_QUERY_PARAMETER,
+                                                     offset, 'offset')
+        with open(file_path, 'rb') as f:
+            assert f.read() == file_content
+
     # tests for DELETE
     def test_delete_single_file(self, test_client):
         file_to_delete = "{}/file.json".format(standard_user().username)
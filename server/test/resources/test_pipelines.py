@@ -3,14 +3,19 @@ import os
 import json
 from server.test.utils import load_json_data
 from server.test.conftest import test_client, session
-from server.test.fakedata.users import standard_user
+from server.test.fakedata.users import admin, standard_user
 from server import app
 from server.resources.models.error_code_and_message import ErrorCodeAndMessageSchema
 from server.common.error_codes_and_messages import MISSING_PIPELINE_PROPERTY
 from server.resources.models.pipeline import PipelineSchema
 from server.test.fakedata.pipelines import (
     NameStudyOne, NameStudyTwo, PipelineOne, PipelineTwo, PipelineThree,
-    PropNameOne, PropNameTwo, PropValueOne, PropValueTwo, PropValueThree)
+    PIPELINE_FOUR, PropNameOne, PropNameTwo, PropValueOne, PropValueTwo, PropValueThree,
+    BOUTIQUES_SLEEP_ORIGINAL)
+from server.resources.helpers.pipelines import (export_all_pipelines,
+                                               get_pipeline)
+from server.resources.helpers.pipeline_catalog import PIPELINE_CATALOG
+from server.resources.helpers.pipeline_watcher import PipelineWatcher
 
 
 @pytest.fixture(scope='module', autouse=True)
@@ -111,3 +116,128 @@ class TestPipelinesResource():
         assert PipelineOne in pipeline
         assert PipelineTwo not in pipeline
         assert PipelineThree not in pipeline
+
+    def test_get_pipeline_added_after_first_listing(self, test_client):
+        test_client.get(
+            '/pipelines', headers={
+                "apiKey": standard_user().api_key
+            })
+        new_pipeline_path = os.path.join(app.config['PIPELINE_DIRECTORY'],
+                                         NameStudyTwo, 'pipeline4.json')
+        with open(new_pipeline_path, 'w') as f:
+            f.write(PipelineSchema().dumps(PIPELINE_FOUR).data)
+        try:
+            response = test_client.get(
+                '/pipelines/{}'.format(PIPELINE_FOUR.identifier),
+                headers={
+                    "apiKey": standard_user().api_key
+                })
+            pipeline = PipelineSchema().load(load_json_data(response)).data
+            assert pipeline == PIPELINE_FOUR
+        finally:
+            os.remove(new_pipeline_path)
+
+
+class TestExportPipelines():
+    def test_export_all_pipelines(self, tmpdir):
+        pipeline_directory = app.config['PIPELINE_DIRECTORY']
+        app.config['PIPELINE_DIRECTORY'] = str(tmpdir)
+        try:
+            boutiques_dir = tmpdir.mkdir('boutiques')
+            boutiques_dir.join('sleep.json').write(
+                json.dumps(BOUTIQUES_SLEEP_ORIGINAL))
+            boutiques_dir.join('invalid.json').write(json.dumps({}))
+
+            errors = export_all_pipelines()
+            assert list(errors) == [str(boutiques_dir.join('invalid.json'))]
+            exported = tmpdir.join('boutiques_sleep.json')
+            assert exported.check()
+
+            # Descriptors are not exported again unless their content changed
+            exported_mtime = exported.mtime()
+            os.utime(str(boutiques_dir.join('sleep.json')),
+                     (exported_mtime + 10, exported_mtime + 10))
+            errors = export_all_pipelines()
+            assert list(errors) == [str(boutiques_dir.join('invalid.json'))]
+            assert exported.mtime() == exported_mtime
+        finally:
+            app.config['PIPELINE_DIRECTORY'] = pipeline_directory
+
+
+@pytest.fixture
+def reload_pipeline_directory(tmpdir, session):
+    session.add(admin(encrypted=True))
+    session.commit()
+    pipeline_directory = app.config['PIPELINE_DIRECTORY']
+    app.config['PIPELINE_DIRECTORY'] = str(tmpdir)
+    tmpdir.mkdir('boutiques')
+    yield tmpdir
+    app.config['PIPELINE_DIRECTORY'] = pipeline_directory
+    PIPELINE_CATALOG.refresh(force=True)
+
+
+class TestPipelinesReloadResource():
+    def test_reload_not_admin(self, test_client, reload_pipeline_directory):
+        response = test_client.post(
+            '/pipelines/reload',
+            headers={"apiKey": standard_user().api_key})
+        assert response.status_code == 401
+
+    def test_reload(self, test_client, reload_pipeline_directory):
+        descriptor = reload_pipeline_directory.join('boutiques', 'sleep.json')
+        descriptor.write(json.dumps(BOUTIQUES_SLEEP_ORIGINAL))
+        reload_pipeline_directory.join('boutiques',
+                                       'invalid.json').write('{}')
+        response = test_client.post(
+            '/pipelines/reload', headers={"apiKey": admin().api_key})
+        assert list(load_json_data(response)) == ['boutiques/invalid.json']
+
+        response = test_client.get(
+            '/pipelines/boutiques_sleep.json',
+            headers={"apiKey": standard_user().api_key})
+        assert load_json_data(response)['name'] == 'output'
+
+        descriptor.remove()
+        test_client.post(
+            '/pipelines/reload', headers={"apiKey": admin().api_key})
+        response = test_client.get(
+            '/pipelines/boutiques_sleep.json',
+            headers={"apiKey": standard_user().api_key})
+        assert not PipelineSchema().load(load_json_data(response)).data
+
+    def test_watcher(self, reload_pipeline_directory):
+        watcher = PipelineWatcher()
+        assert watcher.check()
+        assert not watcher.check()
+
+        reload_pipeline_directory.join('boutiques', 'sleep.json').write(
+            json.dumps(BOUTIQUES_SLEEP_ORIGINAL))
+        assert watcher.check()
+        assert reload_pipeline_directory.join('boutiques_sleep.json').check()
+        assert not watcher.check()
+
+    def test_study_pipeline_does_not_shadow_root_pipeline(
+            self, test_client, reload_pipeline_directory):
+        reload_pipeline_directory.join('boutiques', 'sleep.json').write(
+            json.dumps(BOUTIQUES_SLEEP_ORIGINAL))
+        export_all_pipelines()
+        root_pipeline = get_pipeline('boutiques_sleep.json')
+        study_pipeline = json.loads(
+            reload_pipeline_directory.join('boutiques_sleep.json').read())
+        study_pipeline['name'] = 'study output'
+        # The study pipeline file is sorted before the root pipeline file
+        reload_pipeline_directory.mkdir('a_study').join('sleep.json').write(
+            json.dumps(study_pipeline))
+        PIPELINE_CATALOG.refresh(force=True)
+
+        assert get_pipeline('boutiques_sleep.json') == root_pipeline
+        response = test_client.get(
+            '/pipelines/boutiques_sleep.json',
+            headers={"apiKey": standard_user().api_key})
+        assert load_json_data(response)['name'] == root_pipeline.name
+        response = test_client.get(
+            '/pipelines?studyIdentifier=a_study',
+            headers={"apiKey": standard_user().api_key})
+        assert sorted(p['name'] for p in load_json_data(response)) == [
+            root_pipeline.name, 'study output'
+        ]
@@ -0,0 +1,202 @@
+import pytest
+import os
+import json
+import errno
+import hashlib
+from server import app
+from server.test.utils import load_json_data, error_from_response
+from server.test.conftest import test_client, session
+from server.common.error_codes_and_messages import (
+    UNAUTHORIZED, UPLOAD_SESSION_NOT_FOUND, INVALID_CONTENT_RANGE,
+    UPLOAD_INCOMPLETE, MD5_MISMATCH, UPLOAD_SESSIONS_SIZE_EXCEEDED,
+    INSUFFICIENT_STORAGE, ErrorCodeAndMessageFormatter)
+from server.database.models.upload_session import UploadSession
+from server.database.queries.upload_sessions import get_upload_session
+from server.test.fakedata.users import standard_user, admin
+
+FILE_CONTENT = bytes(range(256)) * 16
+
+
+@pytest.fixture(autouse=True)
+def test_config(tmpdir_factory, session):
+    session.add(standard_user(True))
+    session.add(admin(True))
+    session.commit()
+
+    root_directory = tmpdir_factory.mktemp('data')
+    root_directory.mkdir(standard_user().username)
+    app.config['DATA_DIRECTORY'] = str(root_directory)
+    app.config['UPLOAD_SESSIONS_DIRECTORY'] = str(
+        tmpdir_factory.mktemp('uploads'))
+
+
+def post_upload_session(test_client,
+                        md5: str = None,
+                        size: int = len(FILE_CONTENT)):
+    body = {
+        "platformPath":
+        "http://localhost/path/{}/uploaded.bin".format(
+            standard_user().username),
+        "size":
+        size
+    }
+    if md5:
+        body["md5"] = md5
+    return test_client.post('/uploads',
+                            headers={"apiKey": standard_user().api_key},
+                            data=json.dumps(body))
+
+
+def create_upload_session(test_client, md5: str = None):
+    return load_json_data(post_upload_session(test_client, md5))["identifier"]
+
+
+def put_range(test_client, identifier: str, first: int, last: int):
+    return test_client.put('/uploads/{}'.format(identifier),
+                           headers={
+                               "apiKey":
+                               standard_user().api_key,
+                               "Content-Range":
+                               "bytes {}-{}/{}".format(first, last,
+                                                       len(FILE_CONTENT))
+                           },
+                           data=FILE_CONTENT[first:last + 1])
+
+
+class TestUploadSessionsResource():
+
+    def test_post_upload_session(self, test_client):
+        identifier = create_upload_session(test_client)
+        response = test_client.get('/uploads/{}'.format(identifier),
+                                   headers={"apiKey": standard_user().api_key})
+        status = load_json_data(response)
+        assert status["size"] == len(FILE_CONTENT)
+        assert status["committedRanges"] == []
+        assert not status["isComplete"]
+
+    def test_put_ranges_out_of_order(self, test_client):
+        identifier = create_upload_session(
+            test_client,
+            hashlib.md5(FILE_CONTENT).hexdigest())
+        response = put_range(test_client, identifier, 2048, 4095)
+        assert load_json_data(response)["committedRanges"] == [[2048, 4095]]
+        response = put_range(test_client, identifier, 0, 2047)
+        status = load_json_data(response)
+        assert status["committedRanges"] == [[0, 4095]]
+        assert status["isComplete"]
+
+        response = test_client.put('/uploads/{}/finalize'.format(identifier),
+                                   headers={"apiKey": standard_user().api_key})
+        assert response.status_code == 200
+        file_path = os.path.join(app.config['DATA_DIRECTORY'],
+                                 standard_user().username, 'uploaded.bin')
+        with open(file_path, 'rb') as f:
+            assert f.read() == FILE_CONTENT
+
+        response = test_client.get('/uploads/{}'.format(identifier),
+                                   headers={"apiKey": standard_user().api_key})
+        assert error_from_response(response) == ErrorCodeAndMessageFormatter(
+            UPLOAD_SESSION_NOT_FOUND, identifier)
+
+    def test_put_range_invalid_content_range(self, test_client):
+        identifier = create_upload_session(test_client)
+        response = put_range(test_client, identifier, 4000, 4096)
+        assert error_from_response(response) == ErrorCodeAndMessageFormatter(
+            INVALID_CONTENT_RANGE, "bytes 4000-4096/4096", len(FILE_CONTENT))
+
+    def test_finalize_incomplete_upload(self, test_client):
+        identifier = create_upload_session(test_client)
+        put_range(test_client, identifier, 1000, 1999)
+        response = test_client.put('/uploads/{}/finalize'.format(identifier),
+                                   headers={"apiKey": standard_user().api_key})
+        assert error_from_response(response) == ErrorCodeAndMessageFormatter(
+            UPLOAD_INCOMPLETE, [[0, 999], [2000, 4095]])
+
+    def test_finalize_md5_mismatch(self, test_client):
+        identifier = create_upload_session(test_client, "0" * 32)
+        put_range(test_client, identifier, 0, 4095)
+        response = test_client.put('/uploads/{}/finalize'.format(identifier),
+                                   headers={"apiKey": standard_user().api_key})
+        assert error_from_response(response) == ErrorCodeAndMessageFormatter(
+            MD5_MISMATCH,
+            hashlib.md5(FILE_CONTENT).hexdigest(), "0" * 32)
+
+    def test_upload_session_of_other_user(self, test_client):
+        identifier = create_upload_session(test_client)
+        response = test_client.get('/uploads/{}'.format(identifier),
+                                   headers={"apiKey": admin().api_key})
+        assert error_from_response(response) == UNAUTHORIZED
+
+    def test_delete_upload_session(self, test_client):
+        identifier = create_upload_session(test_client)
+        response = test_client.delete(
+            '/uploads/{}'.format(identifier),
+            headers={"apiKey": standard_user().api_key})
+        assert response.status_code == 204
+        assert not os.listdir(
+            os.path.join(app.config['UPLOAD_SESSIONS_DIRECTORY'],
+                         standard_user().username))
+
+    def test_upload_session_file_not_listed(self, test_client):
+        create_upload_session(test_client)
+        response = test_client.get(
+            '/path/{}?action=list'.format(standard_user().username),
+            headers={"apiKey": standard_user().api_key})
+        assert load_json_data(response) == []
+
+    def test_finalize_across_file_systems(self, test_client, monkeypatch):
+        identifier = create_upload_session(test_client)
+        put_range(test_client, identifier, 0, 4095)
+        replace = os.replace
+
+        def replace_across_file_systems(source, destination):
+            if source.startswith(app.config['UPLOAD_SESSIONS_DIRECTORY']):
+                raise OSError(errno.EXDEV, os.strerror(errno.EXDEV))
+            replace(source, destination)
+
+        monkeypatch.setattr(os, 'replace', replace_across_file_systems)
+        response = test_client.put('/uploads/{}/finalize'.format(identifier),
+                                   headers={"apiKey": standard_user().api_key})
+        assert response.status_code == 200
+        user_dir = os.path.join(app.config['DATA_DIRECTORY'],
+                                standard_user().username)
+        assert os.listdir(user_dir) == ['uploaded.bin']
+        with open(os.path.join(user_dir, 'uploaded.bin'), 'rb') as f:
+            assert f.read() == FILE_CONTENT
+        assert not os.listdir(
+            os.path.join(app.config['UPLOAD_SESSIONS_DIRECTORY'],
+                         standard_user().username))
+
+    def test_post_upload_session_size_exceeded(self, test_client,
+                                               monkeypatch):
+        monkeypatch.setitem(app.config, 'MAX_UPLOAD_SESSIONS_SIZE',
+                            2 * len(FILE_CONTENT))
+        create_upload_session(test_client)
+
+        response = post_upload_session(test_client,
+                                       size=len(FILE_CONTENT) + 1)
+        assert error_from_response(
+            response) == ErrorCodeAndMessageFormatter(
+                UPLOAD_SESSIONS_SIZE_EXCEEDED,
+                len(FILE_CONTENT) + 1, len(FILE_CONTENT),
+                standard_user().username)
+
+    def test_post_upload_session_insufficient_storage(
+            self, test_client, session, monkeypatch):
+        monkeypatch.setitem(app.config, 'MAX_UPLOAD_SESSIONS_SIZE', 2**62)
+        response = post_upload_session(test_client, size=2**61)
+        assert error_from_response(response) == ErrorCodeAndMessageFormatter(
+            INSUFFICIENT_STORAGE, 2**61)
+        assert session.query(UploadSession).count() == 0
+
+    def test_expired_upload_session_purged(self, test_client, session):
+        expired = create_upload_session(test_client)
+        get_upload_session(expired, session).created_at = 0
+        session.commit()
+
+        create_upload_session(test_client)
+        assert not get_upload_session(expired, session)
+        assert len(
+            os.listdir(
+                os.path.join(app.config['UPLOAD_SESSIONS_DIRECTORY'],
+                             standard_user().username))) == 1
@@ -0,0 +1,54 @@
+import json
+import pytest
+from server import app
+from server.database.models.execution import ExecutionStatus
+from server.database.models.execution_job import ExecutionJob, JobState
+from server.database.queries.executions import get_execution
+from server.startup_validation import purge_executions
+from server.test.fakedata.users import standard_user
+from server.test.fakedata.executions import execution_for_db
+from server.test.conftest import session
+
+
+def add_running_execution(session, tmpdir, identifier: str, backend: str,
+                          state: JobState):
+    execution_db = execution_for_db(identifier, standard_user().username)
+    execution_db.descriptor = 'boutiques'
+    execution_db.status = ExecutionStatus.Running
+    session.add(execution_db)
+    session.add(
+        ExecutionJob(execution_identifier=identifier,
+                     backend=backend,
+                     command=json.dumps(['true']),
+                     working_directory=str(tmpdir),
+                     stdout_path=str(tmpdir.join('stdout.txt')),
+                     stderr_path=str(tmpdir.join('stderr.txt')),
+                     state=state,
+                     exit_code=0 if state == JobState.finished else None))
+    session.commit()
+
+
+@pytest.fixture
+def test_config(tmpdir, session):
+    session.add(standard_user(encrypted=True))
+    session.commit()
+    app.config['DATA_DIRECTORY'] = str(tmpdir.mkdir('data'))
+
+
+class TestPurgeExecutions():
+    def test_purge_local_execution(self, session, tmpdir, test_config):
+        add_running_execution(session, tmpdir, "local_execution", 'local',
+                              JobState.running)
+
+        purge_executions()
+        assert get_execution("local_execution",
+                             session).status == ExecutionStatus.Unknown
+
+    def test_adopt_worker_execution(self, session, tmpdir, test_config):
+        # The job completed on its worker node while the server was down
+        add_running_execution(session, tmpdir, "worker_execution", 'worker',
+                              JobState.finished)
+
+        purge_executions()
+        assert get_execution("worker_execution",
+                             session).status == ExecutionStatus.Finished
@@ -0,0 +1,131 @@
+import sys
+import json
+import pytest
+from server import app
+from server.database.models.execution import (ExecutionStatus,
+                                               current_milli_time)
+from server.database.models.execution_job import ExecutionJob, JobState
+from server.database.queries.execution_jobs import (get_execution_job,
+                                                    claim_job)
+from server.resources.models.backend.worker_agent import WorkerAgent
+from server.worker_agent import Worker, main
+from server.test.fakedata.users import standard_user
+from server.test.fakedata.executions import execution_for_db
+from server.test.conftest import session
+
+EXECUTION_IDENTIFIER = "worker_execution"
+
+
+@pytest.fixture
+def worker_job(tmpdir, session):
+    session.add(standard_user(encrypted=True))
+    execution_db = execution_for_db(EXECUTION_IDENTIFIER,
+                                    standard_user().username)
+    execution_db.descriptor = 'boutiques'
+    execution_db.status = ExecutionStatus.Running
+    session.add(execution_db)
+    session.add(
+        ExecutionJob(execution_identifier=EXECUTION_IDENTIFIER,
+                     backend='worker',
+                     command=json.dumps(['sleep', '30']),
+                     working_directory=str(tmpdir),
+                     stdout_path=str(tmpdir.join('stdout.txt')),
+                     stderr_path=str(tmpdir.join('stderr.txt'))))
+    session.commit()
+    return get_execution_job(EXECUTION_IDENTIFIER, session)
+
+
+@pytest.fixture
+def worker():
+    worker = Worker('node1', 1)
+    yield worker
+    for process in worker.processes.values():
+        process.kill()
+        process.wait()
+
+
+class TestWorkerAgent():
+    def test_claim_job(self, session, worker_job, worker):
+        worker.claim_jobs()
+
+        session.refresh(worker_job)
+        assert worker_job.state == JobState.running
+        assert worker_job.worker == 'node1'
+        assert worker_job.heartbeat is not None
+        process = worker.processes[EXECUTION_IDENTIFIER]
+        assert worker_job.job_identifier == str(process.pid)
+        assert WorkerAgent.poll(worker_job) is None
+
+    def test_claim_job_race(self, session, worker_job, worker):
+        # Both agents listed the job as queued before claiming it
+        assert claim_job(EXECUTION_IDENTIFIER, 'node1', session)
+        assert not claim_job(EXECUTION_IDENTIFIER, 'node2', session)
+
+        session.refresh(worker_job)
+        assert worker_job.worker == 'node1'
+        Worker('node2', 1).claim_jobs()
+        session.refresh(worker_job)
+        assert worker_job.worker == 'node1'
+
+    def test_heartbeat(self, session, worker_job, worker):
+        worker.claim_jobs()
+        worker_job.heartbeat = 0
+        session.commit()
+
+        worker.update_jobs()
+        session.refresh(worker_job)
+        assert worker_job.state == JobState.running
+        assert worker_job.heartbeat > 0
+
+    def test_heartbeat_timeout(self, session, worker_job):
+        assert claim_job(EXECUTION_IDENTIFIER, 'node1', session)
+        session.refresh(worker_job)
+        worker_job.heartbeat = current_milli_time() - (
+            app.config['WORKER_AGENT_HEARTBEAT_TIMEOUT'] + 1) * 1000
+        session.commit()
+
+        with pytest.raises(RuntimeError):
+            WorkerAgent.poll(worker_job)
+
+    def test_kill_running_job(self, session, worker_job, worker):
+        worker.claim_jobs()
+        process = worker.processes[EXECUTION_IDENTIFIER]
+
+        WorkerAgent.kill(worker_job)
+        worker.update_jobs()
+        process.wait()
+        worker.update_jobs()
+
+        session.refresh(worker_job)
+        assert worker_job.state == JobState.finished
+        assert worker_job.exit_code is None
+        assert WorkerAgent.poll(worker_job) == -1
+        assert not worker.processes
+
+    def test_kill_queued_job(self, session, worker_job, worker):
+        WorkerAgent.kill(worker_job)
+
+        assert WorkerAgent.poll(worker_job) == -1
+        assert worker_job.state == JobState.finished
+        worker.claim_jobs()
+        assert not worker.processes
+
+    def test_lost_job(self, session, worker_job, worker):
+        # The job was claimed by a previous run of the worker
+        assert claim_job(EXECUTION_IDENTIFIER, 'node1', session)
+
+        worker.update_jobs()
+        session.refresh(worker_job)
+        assert worker_job.state == JobState.finished
+        assert worker_job.exit_code is None
+        assert WorkerAgent.poll(worker_job) == -1
+
+    def test_main(self, monkeypatch):
+        workers = []
+        monkeypatch.setattr(sys, 'argv', ['carmin-worker', 'node2'])
+        monkeypatch.setattr(Worker, 'run_forever',
+                            lambda worker: workers.append(worker))
+
+        main()
+        assert [w.name for w in workers] == ['node2']
+        assert workers[0].max_jobs == app.config['WORKER_AGENT_MAX_JOBS']
@@ -0,0 +1,109 @@
+"""The worker agent runs the executions of the 'worker' execution backend on a
+compute node. It must be started on every compute node with the same
+`DATABASE_URI` and `DATA_DIRECTORY` as the server, the data directory being
+shared between the nodes:
+
+    carmin-worker [name]
+
+The name of the worker defaults to the hostname of the node.
+"""
+import sys
+import json
+import time
+import socket
+import logging
+from subprocess import Popen
+from server import app
+from server.database import db
+from server.database.models.execution import current_milli_time
+from server.database.models.execution_job import ExecutionJob, JobState
+from server.database.queries.execution_jobs import (get_queued_jobs,
+                                                    get_worker_jobs, claim_job)
+from server.resources.helpers.execution_kill import kill_process_tree
+
+
+class Worker():
+    """Worker claims queued jobs from the database, runs at most `max_jobs`
+    of them at the same time, and reports their state back to the database.
+    """
+
+    def __init__(self, name: str, max_jobs: int):
+        self.name = name
+        self.max_jobs = max_jobs
+        # Processes of the running jobs, by execution identifier
+        self.processes = {}
+
+    def run_forever(self):
+        while True:
+            with app.app_context():
+                try:
+                    self.update_jobs()
+                    self.claim_jobs()
+                except Exception:
+                    logger = logging.getLogger('server-error')
+                    logger.exception(
+                        "Worker '{}' failed to update its jobs".format(
+                            self.name))
+                finally:
+                    db.session.remove()
+            time.sleep(app.config['WORKER_AGENT_POLL_INTERVAL'])
+
+    def update_jobs(self):
+        """update_jobs kills the jobs whose kill was requested, reports the
+        completed jobs and refreshes the heartbeat of the running ones."""
+        for job in get_worker_jobs(self.name, db.session):
+            process = self.processes.get(job.execution_identifier)
+            if not process:
+                # The job was lost, most probably by a previous run of the
+                # worker
+                job.state = JobState.finished
+                continue
+            if job.kill_requested and process.poll() is None:
+                kill_process_tree(process.pid)
+            exit_code = process.poll()
+            if exit_code is None:
+                job.heartbeat = current_milli_time()
+            else:
+                job.state = JobState.finished
+                # kill_process_tree reaps the killed process, whose exit code
+                # is then lost
+                job.exit_code = None if job.kill_requested else exit_code
+                del self.processes[job.execution_identifier]
+        db.session.commit()
+
+    def claim_jobs(self):
+        free_slots = self.max_jobs - len(self.processes)
+        if free_slots <= 0:
+            return
+        for job in get_queued_jobs('worker', free_slots, db.session):
+            if claim_job(job.execution_identifier, self.name, db.session):
+                db.session.refresh(job)
+                self.start(job)
+
+    def start(self, job: ExecutionJob):
+        try:
+            with open(job.stdout_path, 'w') as file_stdout, open(
+                    job.stderr_path, 'w') as file_stderr:
+                process = Popen(json.loads(job.command),
+                                stdout=file_stdout,
+                                stderr=file_stderr,
+                                cwd=job.working_directory)
+        except Exception:
+            logger = logging.getLogger('server-error')
+            logger.exception("Worker '{}' could not start job {}".format(
+                self.name, job.execution_identifier))
+            job.state = JobState.finished
+            db.session.commit()
+            return
+        self.processes[job.execution_identifier] = process
+        job.job_identifier = str(process.pid)
+        db.session.commit()
+
+
+def main():
+    name = sys.argv[1] if len(sys.argv) > 1 else socket.gethostname()
+    Worker(name, app.config['WORKER_AGENT_MAX_JOBS']).run_forever()
+
+
+if __name__ == '__main__':
+    main()
@@ -43,6 +43,15 @@ setup(
     tests_require=["pytest"],
     setup_requires=DEPS,
     install_requires=DEPS,
-    entry_points={"console_scripts": ["server=server.__main__:main"]},
+    extras_require={
+        "zstd": ["zstandard>=0.9,<1.0"],
+        "xxhash": ["xxhash>=1.0,<2.0"]
+    },
+    entry_points={
+        "console_scripts": [
+            "server=server.__main__:main",
+            "carmin-worker=server.worker_agent:main"
+        ]
+    },
     data_files=[],
     zip_safe=False)